@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+End-to-end throughput run of script.py against mock_pool.py and fake_cracker.py, offline.
+
+Every scenario gets a fresh mock pool and a scratch copy of the scripts with its own
+settings.json. The copy points api_url at the mock and program_path at the fake cracker.
+script.py then runs until the mock answers "All blocks are solved", or until --timeout.
+The report shows blocks/hour and the per-block orchestration overhead: fetch-to-fetch
+cycle time minus the time the crackers ran. It also lists the requests and faults the mock
+counted, and the pool_api and http sections of the run's status.json.
+
+    python3 bench_e2e.py                                  # healthy, flaky and outage scenarios
+    python3 bench_e2e.py --scenarios healthy,slow --blocks 10 --seconds 3
+    python3 bench_e2e.py --scenarios flaky --set submit_concurrency=4 --set async_submit=true
+    python3 bench_e2e.py --scenarios custom --fail-rate 0.3 --status 502 --json run.json
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import mock_pool
+
+# Mock pool options per scenario; "custom" takes them from the command line.
+SCENARIOS = {
+    "healthy": {},
+    "slow": {"latency_ms": 800, "jitter_ms": 400},
+    "flaky": {"fail_rate": 0.25, "status": 503},
+    "rate-limited": {"fail_rate": 0.15, "status": 429, "retry_after": 5},
+    "outage": {"outage": (8.0, 20.0)},
+    "incompatible": {"incompatible_rate": 0.2},
+    "custom": None,
+}
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def _settings(pool_url, args):
+    with open(os.path.join(BASE_DIR, "settings.json"), "r", encoding="utf-8") as f:
+        s = json.load(f)
+    s.update({
+        "api_url": pool_url + "/api/block",
+        "user_token": "mock-token",
+        "worker_name": "e2e",
+        "additional_addresses": [],
+        "program_name": "VanitySearch" if args.format == "vanity" else "VanitySearch-V3" if args.format == "v2" else "cuBitCrack",
+        "program_path": "./fake_cracker.py",
+        "program_arguments": f"--pool {pool_url} --seconds {args.seconds:g} --format {args.format}",
+        "gpu_index_map": {},
+        "oneshot": False,
+        "post_block_delay_enabled": False,
+        "telegram_share": False,
+    })
+    for item in args.set:
+        k, _, v = item.partition("=")
+        try:
+            s[k.strip()] = json.loads(v)
+        except ValueError:
+            s[k.strip()] = v
+    return s
+
+def run_scenario(name, args):
+    opts = SCENARIOS[name]
+    if opts is None:
+        pool = mock_pool.pool_from_args(args)
+    else:
+        pool = mock_pool.MockPool(blocks=args.blocks, addresses=args.addresses, seed=args.seed, **opts)
+    server = mock_pool.serve(pool, "127.0.0.1", 0)
+    pool_url = "http://127.0.0.1:%d" % server.server_address[1]
+    work = tempfile.mkdtemp(prefix=f"e2e-{name}-")
+    for path in glob.glob(os.path.join(BASE_DIR, "*.py")):
+        shutil.copy2(path, work)
+    os.chmod(os.path.join(work, "fake_cracker.py"), 0o755)
+    with open(os.path.join(work, "settings.json"), "w", encoding="utf-8") as f:
+        json.dump(_settings(pool_url, args), f, indent=4)
+    env = dict(os.environ, FAKE_CRACKER_GPUS=str(args.gpus), PYTHONUNBUFFERED="1")
+    t0 = time.time()
+    with open(os.path.join(work, "miner.log"), "w", encoding="utf-8") as log:
+        proc = subprocess.Popen([sys.executable, "script.py"], cwd=work, env=env, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            code = proc.wait(timeout=args.timeout)
+        except subprocess.TimeoutExpired:
+            proc.terminate()
+            try:
+                code = proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                code = proc.wait()
+            code = f"timeout after {args.timeout}s (exit {code})"
+    wall = time.time() - t0
+    server.shutdown()
+    status = {}
+    try:
+        with open(os.path.join(work, "status.json"), "r", encoding="utf-8") as f:
+            status = json.load(f)
+    except (OSError, ValueError):
+        pass
+    result = {
+        "scenario": name,
+        "mock": opts if opts is not None else "custom",
+        "script_exit": code,
+        "wall_s": round(wall, 1),
+        "workdir": work,
+        "stats": pool.stats(),
+        "pool_api": status.get("pool_api"),
+        "http": status.get("http"),
+    }
+    if not args.keep:
+        shutil.rmtree(work, ignore_errors=True)
+        result["workdir"] = None
+    return result, pool.summary()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run script.py end to end against the mock pool and report throughput.")
+    ap.add_argument("--scenarios", default="healthy,flaky,outage", help="comma list of " + ", ".join(SCENARIOS))
+    ap.add_argument("--seconds", type=float, default=5.0, help="fake cracker run time per block")
+    ap.add_argument("--gpus", type=int, default=1, help="fake GPUs listed by the cracker (used when nvidia-smi is missing)")
+    ap.add_argument("--format", choices=("vanity", "v2", "bitcrack"), default="vanity", help="cracker output format")
+    ap.add_argument("--timeout", type=float, default=600, help="seconds before a scenario's script.py is stopped")
+    ap.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="settings.json override (JSON value), repeatable")
+    ap.add_argument("--keep", action="store_true", help="keep each scenario's scratch directory (miner.log, status.json)")
+    ap.add_argument("--json", help="write the results to this file")
+    mock_pool.add_fault_arguments(ap)
+    args = ap.parse_args(argv)
+
+    names = [n.strip() for n in args.scenarios.split(",") if n.strip()]
+    for n in names:
+        if n not in SCENARIOS:
+            ap.error(f"unknown scenario '{n}'")
+    results = []
+    for n in names:
+        print(f"== {n}: {args.blocks} blocks, {args.seconds:g}s per block, {args.gpus} GPU(s)", flush=True)
+        result, summary = run_scenario(n, args)
+        results.append(result)
+        print(summary)
+        print(f"script.py exit {result['script_exit']} after {result['wall_s']}s", flush=True)
+        if result["pool_api"]:
+            print(f"pool_api: opened {result['pool_api'].get('opened_total', 0)} time(s), last error '{result['pool_api'].get('last_error', '')}'")
+        if result["workdir"]:
+            print(f"scratch dir: {result['workdir']}")
+    if len(results) > 1:
+        print(f"\n{'scenario':<14} {'solved':>7} {'blocks/h':>9} {'cycle s':>8} {'overhead s':>11} {'p95 s':>7} {'overhead %':>11}")
+        for r in results:
+            st = r["stats"]
+            print(f"{r['scenario']:<14} {st['blocks_solved']:>3}/{st['blocks_leased']:<3} {st['blocks_per_hour']:>9} "
+                  f"{st['cycle_s_mean'] or '-':>8} {st['overhead_s_mean'] or '-':>11} {st['overhead_s_p95'] or '-':>7} {st['overhead_pct'] or '-':>11}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0 if all(r["stats"]["blocks_solved"] == r["stats"]["blocks_leased"] for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark and uniformity check for filler_keys.generate_fillers.
+
+The benchmark times the batched generator against the previous one-key-at-a-time loop
+(32 random bytes and a modulo per candidate). --check draws many keys from several ranges
+and runs a chi-square test on how they fall into equal-width bins. The failure threshold is
+p < 0.001. The run is also checked for duplicates, keys outside [start, end) and excluded keys.
+
+    python3 bench_fillers.py
+    python3 bench_fillers.py --counts 30,1K,100K --repeat 5
+    python3 bench_fillers.py --check --samples 200K --bins 64
+"""
+import argparse
+import math
+import secrets
+import sys
+import time
+
+from filler_keys import generate_fillers
+from key_queue import KeyQueue
+
+# (label, start, end): a small odd span, a non-power-of-two span just above a power of two
+# (worst case for rejection), a typical pool block and the upper half of the key space.
+RANGES = [
+    ("span 1000", 0x1000, 0x1000 + 1000),
+    ("span 2^40+1", 1 << 70, (1 << 70) + (1 << 40) + 1),
+    ("block 2^44", 0x4000000000000000, 0x4000100000000000),
+    ("span 2^255", 1 << 255, (1 << 256) - 1),
+]
+
+def _count(text):
+    t = text.strip().upper()
+    mult = {"K": 10**3, "M": 10**6}.get(t[-1:], 1)
+    return int(float(t[:-1] if mult > 1 else t) * mult)
+
+def legacy_fillers(count, start, end, exclude=None):
+    """The generator filler_keys replaced, kept here as the baseline."""
+    excluded = exclude if isinstance(exclude, KeyQueue) else KeyQueue(exclude or [])
+    span = end - start
+    out = []
+    seen = set()
+    attempts = 0
+    while len(out) < count and attempts < count * 100:
+        h = "%064X" % (start + int.from_bytes(secrets.token_bytes(32), "big") % span)
+        if h not in excluded and h not in seen:
+            seen.add(h)
+            out.append(h)
+        attempts += 1
+    return out
+
+GENERATORS = {
+    "batched": generate_fillers,
+    "legacy": legacy_fillers,
+}
+
+def chi2_sf(x, k):
+    """Upper tail of the chi-square distribution with k degrees of freedom (Wilson-Hilferty)."""
+    z = ((x / k) ** (1.0 / 3) - (1 - 2.0 / (9 * k))) / math.sqrt(2.0 / (9 * k))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+def check_range(label, start, end, samples, bins):
+    """Return (ok, line) for one range."""
+    span = end - start
+    bins = min(bins, span)
+    exclude = KeyQueue("%064X" % (start + i) for i in range(0, min(span, 64), 2))
+    counts = [0] * bins
+    # Repeats across batches are only unexpected when the span dwarfs the sample.
+    track = span > samples * 1000
+    seen = set()
+    problems = []
+    drawn = 0
+    while drawn < samples:
+        # Moderate batches keep duplicates (which the generator drops) from skewing small spans.
+        batch = generate_fillers(min(samples - drawn, max(1, span // 8), 50000), start, end, exclude)
+        if not batch:
+            problems.append("no keys returned")
+            break
+        for h in batch:
+            v = int(h, 16)
+            if not start <= v < end:
+                problems.append(f"out of range {h}")
+            if h in exclude:
+                problems.append(f"excluded key {h}")
+            if track:
+                seen.add(v)
+            counts[(v - start) * bins // span] += 1
+        drawn += len(batch)
+    if track and len(seen) != drawn:
+        problems.append(f"{drawn - len(seen)} duplicate(s) across batches")
+    # Bins over a small span differ in size by one value, and excluded values are never drawn.
+    allowed = [0] * bins
+    for b in range(bins):
+        lo = -(-b * span // bins)
+        hi = -(-(b + 1) * span // bins)
+        allowed[b] = hi - lo - sum(1 for k in exclude if lo <= int(k, 16) - start < hi)
+    total = sum(allowed)
+    chi2 = sum((c - drawn * a / total) ** 2 / (drawn * a / total) for c, a in zip(counts, allowed) if a)
+    p = chi2_sf(chi2, bins - 1)
+    ok = p >= 0.001 and not problems
+    line = f"{'ok  ' if ok else 'FAIL'} {label:<12} {drawn:>8} keys {bins:>4} bins  chi2 {chi2:>9.1f}  p {p:.3f}"
+    if problems:
+        line += "  " + "; ".join(problems[:3])
+    return ok, line
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark filler key generation and check it is uniform.")
+    ap.add_argument("--counts", default="30,1K,10K,100K", help="keys per call, e.g. 30,1K,100K")
+    ap.add_argument("--generators", default="batched,legacy", help="comma list of " + ", ".join(GENERATORS))
+    ap.add_argument("--repeat", type=int, default=3, help="timed runs per case (best is kept)")
+    ap.add_argument("--check", action="store_true", help="run the uniformity check instead of the benchmark")
+    ap.add_argument("--samples", default="100K", help="keys drawn per range by --check")
+    ap.add_argument("--bins", type=int, default=64, help="chi-square bins for --check")
+    args = ap.parse_args(argv)
+
+    if args.check:
+        failures = 0
+        for label, start, end in RANGES:
+            ok, line = check_range(label, start, end, _count(args.samples), args.bins)
+            failures += 0 if ok else 1
+            print(line, flush=True)
+        print(f"{failures} failure(s)")
+        return 1 if failures else 0
+
+    names = [g.strip() for g in args.generators.split(",") if g.strip()]
+    for n in names:
+        if n not in GENERATORS:
+            ap.error(f"unknown generator '{n}'")
+    label, start, end = RANGES[2]
+    exclude = KeyQueue("%064X" % (start + 7 * i) for i in range(30))
+    print(f"range {label}, {len(exclude)} excluded keys")
+    print(f"{'generator':<10} {'keys':>8} {'seconds':>10} {'keys/s':>12}")
+    for count in [_count(c) for c in args.counts.split(",") if c.strip()]:
+        base = None
+        for name in names:
+            best = None
+            for _ in range(max(1, args.repeat)):
+                t0 = time.perf_counter()
+                keys = GENERATORS[name](count, start, end, exclude)
+                dt = time.perf_counter() - t0
+                best = dt if best is None else min(best, dt)
+            line = f"{name:<10} {len(keys):>8} {best:>10.5f} {len(keys) / best if best > 0 else 0:>12,.0f}"
+            if base is None:
+                base = best
+            elif best > 0:
+                line += f"  x{best / base:.2f} slower than {names[0]}"
+            print(line, flush=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
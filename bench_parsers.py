@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark for output_parsers: generates synthetic VanitySearch, VanitySearch-V2
+(wrapped hex) and BitCrack output files in memory, times each parser on them and
+reports lines/s and peak memory. Results can be written as JSON and compared with
+an earlier run.
+
+    python3 bench_parsers.py
+    python3 bench_parsers.py --sizes 1K,100K,10M --ratios 0.01,1 --json after.json --compare before.json
+    python3 bench_parsers.py --check
+
+--check compares every parser with parse_out_reference instead of timing them. Besides the
+generated files it covers CRLF line endings, invalid UTF-8 and chunk or window boundaries
+that split records, lines and multi-byte characters.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from output_parsers import parse_out, parse_out_file, parse_out_reference, StreamParser
+
+FORMATS = {
+    "vanity": "vanitysearch",
+    "v2": "vanitysearch-v2",
+    "bitcrack": "bitcrack",
+}
+EXTRA_ADDRESS = "1BenchExtraTargetAddressXXXXXXXXXX"
+STREAM_CHUNK = 65536
+_B58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+def _count(text):
+    t = text.strip().upper()
+    mult = {"K": 10**3, "M": 10**6}.get(t[-1:], 1)
+    return int(float(t[:-1] if mult > 1 else t) * mult)
+
+def _address(rng):
+    return "1" + "".join(rng.choice(_B58) for _ in range(33))
+
+def _hex(rng):
+    return "%064X" % rng.getrandbits(256)
+
+def _record(fmt, rng, addr):
+    """Lines a binary writes for one found key."""
+    priv = _hex(rng)
+    if fmt == "bitcrack":
+        return [f"{addr} {priv} 02{_hex(rng)}"]
+    wif = "p2pkh:K" + "".join(rng.choice(_B58) for _ in range(51))
+    if fmt == "v2":
+        cut = rng.randrange(20, 60)
+        return [f"PubAddress: {addr}", f"Priv (WIF): {wif}", f"Priv (HEX): 0x{priv[:cut]}", priv[cut:], ""]
+    return [f"PubAddress: {addr}", f"Priv (WIF): {wif}", f"Priv (HEX): 0x{priv}", ""]
+
+def _noise(rng):
+    return rng.choice([
+        "",
+        f"[{rng.uniform(100, 9000):.2f} Mkey/s][GPU {rng.uniform(100, 9000):.2f} Mkey/s][Total 2^{rng.uniform(30, 45):.2f}][Prob 0.0%][50% in 00:00:{rng.randrange(60):02d}][Found {rng.randrange(1000)}]",
+        f"GPU #0 NVIDIA GeForce RTX 4090 (128x128 cores) Grid({rng.randrange(512, 2048)}x256)",
+        "Search: 1 addresses (Lookup size 1,[1,1]) [Compressed]",
+    ])
+
+def generate(fmt, lines, hit_ratio, seed):
+    """Return (text, line_count, records) with about hit_ratio of the lines belonging to found keys."""
+    rng = random.Random(f"{seed}-{fmt}-{lines}-{hit_ratio}")
+    addresses = [_address(rng) for _ in range(256)]
+    out = []
+    records = 0
+    per_record = len(_record(fmt, rng, addresses[0]))
+    record_every = max(1.0, per_record / hit_ratio) if hit_ratio > 0 else float("inf")
+    next_record = 0.0
+    while len(out) < lines:
+        if len(out) >= next_record:
+            addr = EXTRA_ADDRESS if records == 0 else addresses[records % len(addresses)]
+            out.extend(_record(fmt, rng, addr))
+            records += 1
+            next_record += record_every
+        else:
+            out.append(_noise(rng))
+    del out[lines:]
+    return "\n".join(out) + "\n", len(out), records
+
+def _run_stream(text, kind, extras):
+    parser = StreamParser(kind, extras)
+    keys, found = [], []
+    for i in range(0, len(text), STREAM_CHUNK):
+        k, f = parser.feed(text[i:i + STREAM_CHUNK])
+        keys += k
+        found += f
+    k, f = parser.close()
+    return keys + k, found + f
+
+def _run_file(text, kind, extras):
+    # The text is written to BENCH_FILE by main() before this parser runs.
+    return parse_out_file(BENCH_FILE, kind, extras)
+
+BENCH_FILE = os.path.join(tempfile.gettempdir(), "bench_parsers_out.txt")
+
+PARSERS = {
+    "parse_out": parse_out,
+    "stream": _run_stream,
+    "file": _run_file,
+    "reference": parse_out_reference,
+}
+
+def _write_bench_file(text):
+    with open(BENCH_FILE, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+
+def _remove_bench_file():
+    try:
+        os.remove(BENCH_FILE)
+    except OSError:
+        pass
+
+def measure(name, text, kind, extras, repeat):
+    fn = PARSERS[name]
+    best = None
+    result = None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        result = fn(text, kind, extras)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    fn(text, kind, extras)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, result
+
+# Chunk sizes for the boundary checks: single characters/bytes, odd sizes and one near a page.
+EDGE_CHUNKS = (1, 2, 7, 61, 4093)
+
+def _edge_variants(text, rng):
+    """The same output as a binary may leave it on disk: LF, CRLF and with invalid UTF-8 bytes."""
+    raw = text.encode("utf-8")
+    yield "lf", raw
+    yield "crlf", raw.replace(b"\n", b"\r\n")
+    lines = raw.split(b"\n")
+    for i in range(0, len(lines), 5):
+        lines.insert(i, rng.choice([b"\xff\xfe garbage", b"GPU \xc3\x28 \xe2\x82", b"\xf0\x9f\x94\x91 key"]))
+    # A record with a stray byte and a multi-byte sequence cut off at the end of the file.
+    yield "bad-utf8", b"\n".join(lines).replace(b"PubAddress: ", b"PubAddress:\x80 ", 1) + b"\xe2\x82"
+
+def _stream_split(text, kind, extras, sizes):
+    parser = StreamParser(kind, extras)
+    keys, found = [], []
+    pos = 0
+    for n in sizes:
+        if pos >= len(text):
+            break
+        k, f = parser.feed(text[pos:pos + n])
+        keys += k
+        found += f
+        pos += n
+    k, f = parser.feed(text[pos:])
+    keys += k
+    found += f
+    k, f = parser.close()
+    return keys + k, found + f
+
+def check_edge_cases(formats, seed, extras):
+    """
+    Differential check on inputs that stress boundaries: each parser must return exactly what
+    parse_out_reference returns for the same output decoded as script.py decodes it.
+    Returns the number of mismatches.
+    """
+    mismatches = 0
+    rng = random.Random(f"{seed}-edge")
+    for fmt in formats:
+        kind = FORMATS[fmt]
+        text, _n, _records = generate(fmt, 300, 0.5, seed)
+        for variant, raw in _edge_variants(text, rng):
+            decoded = raw.decode("utf-8", errors="replace")
+            expected = tuple(parse_out_reference(decoded, kind, extras))
+            with open(BENCH_FILE, "wb") as f:
+                f.write(raw)
+            runs = [("parse_out", lambda: parse_out(decoded, kind, extras))]
+            runs += [(f"stream chunk {n}", lambda n=n: _stream_split(decoded, kind, extras, [n] * len(decoded))) for n in EDGE_CHUNKS]
+            runs.append(("stream random", lambda: _stream_split(decoded, kind, extras, [rng.randrange(1, 200) for _ in decoded])))
+            runs += [(f"file window {n}", lambda n=n: parse_out_file(BENCH_FILE, kind, extras, window=n)) for n in EDGE_CHUNKS]
+            for how, run in runs:
+                ok = tuple(run()) == expected
+                mismatches += 0 if ok else 1
+                print(f"{'ok  ' if ok else 'FAIL'} {fmt:<8} {variant:<9} {how}")
+    return mismatches
+
+def _key(row):
+    return (row["format"], row["lines"], row["hit_ratio"], row["parser"])
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark output_parsers on synthetic binary output.")
+    ap.add_argument("--formats", default="vanity,v2,bitcrack", help="comma list of vanity, v2, bitcrack")
+    ap.add_argument("--sizes", default="1K,10K,100K,1M", help="line counts, e.g. 1K,10K,1M,10M")
+    ap.add_argument("--ratios", default="0.01,0.1,1", help="fraction of lines that belong to found keys")
+    ap.add_argument("--parsers", default="parse_out,stream,file", help="comma list of " + ", ".join(PARSERS))
+    ap.add_argument("--repeat", type=int, default=3, help="timed runs per case (best is kept)")
+    ap.add_argument("--seed", default="1")
+    ap.add_argument("--json", dest="json_path", help="write results to this file")
+    ap.add_argument("--compare", help="earlier --json output to compare against")
+    ap.add_argument("--check", action="store_true", help="only verify every parser against parse_out_reference")
+    args = ap.parse_args(argv)
+
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    sizes = [_count(s) for s in args.sizes.split(",") if s.strip()]
+    ratios = [float(r) for r in args.ratios.split(",") if r.strip()]
+    parsers = [p.strip() for p in args.parsers.split(",") if p.strip()]
+    for f in formats:
+        if f not in FORMATS:
+            ap.error(f"unknown format '{f}'")
+    for p in parsers:
+        if p not in PARSERS:
+            ap.error(f"unknown parser '{p}'")
+    extras = [EXTRA_ADDRESS]
+
+    if args.check:
+        mismatches = 0
+        for fmt in formats:
+            for size in sizes:
+                for ratio in ratios:
+                    text, n, _records = generate(fmt, size, ratio, args.seed)
+                    _write_bench_file(text)
+                    expected = tuple(parse_out_reference(text, FORMATS[fmt], extras))
+                    for name in PARSERS:
+                        if name == "reference":
+                            continue
+                        ok = tuple(PARSERS[name](text, FORMATS[fmt], extras)) == expected
+                        mismatches += 0 if ok else 1
+                        print(f"{'ok  ' if ok else 'FAIL'} {fmt:<8} {n:>9} lines  ratio {ratio:<5} {name}")
+        mismatches += check_edge_cases(formats, args.seed, extras)
+        print(f"{mismatches} mismatch(es)")
+        _remove_bench_file()
+        return 1 if mismatches else 0
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = {_key(r): r for r in json.load(f).get("results", [])}
+
+    rows = []
+    print(f"{'format':<8} {'lines':>9} {'ratio':>6} {'parser':<10} {'keys':>8} {'seconds':>9} {'lines/s':>12} {'MB/s':>8} {'peak MB':>8}" + ("  vs base" if baseline else ""))
+    for fmt in formats:
+        for size in sizes:
+            for ratio in ratios:
+                text, n, _records = generate(fmt, size, ratio, args.seed)
+                if "file" in parsers:
+                    _write_bench_file(text)
+                mb = len(text.encode("utf-8")) / 1e6
+                for name in parsers:
+                    seconds, peak, (keys, found) = measure(name, text, FORMATS[fmt], extras, args.repeat)
+                    row = {
+                        "format": fmt,
+                        "lines": n,
+                        "hit_ratio": ratio,
+                        "parser": name,
+                        "bytes": len(text.encode("utf-8")),
+                        "keys": len(keys),
+                        "found": len(found),
+                        "seconds": round(seconds, 6),
+                        "lines_per_sec": round(n / seconds) if seconds > 0 else None,
+                        "mb_per_sec": round(mb / seconds, 2) if seconds > 0 else None,
+                        "peak_bytes": peak,
+                    }
+                    rows.append(row)
+                    line = f"{fmt:<8} {n:>9} {ratio:>6} {name:<10} {len(keys):>8} {seconds:>9.4f} {row['lines_per_sec'] or 0:>12,} {row['mb_per_sec'] or 0:>8.1f} {peak / 1e6:>8.1f}"
+                    base = baseline.get(_key(row))
+                    if base and base.get("seconds"):
+                        line += f"  x{base['seconds'] / seconds:.2f}"
+                    print(line, flush=True)
+                del text
+
+    _remove_bench_file()
+    if args.json_path:
+        data = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "seed": args.seed,
+                "repeat": args.repeat,
+            },
+            "results": rows,
+        }
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        print(f"Results written to {args.json_path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,7 @@ import sys
 import time
 import json
 import requests
+import http_client
 import subprocess
 import atexit
 import signal
@@ -40,6 +41,19 @@ def _apply_settings(s):
     if not name:
         name = os.environ.get("COMPUTERNAME") or os.environ.get("HOSTNAME") or ""
     SERVER_NAME = str(name or "").strip()
+    # Same limits as script.py, so both processes honour http_pool_size and http_connect_timeout.
+    try:
+        pool_size = min(100, max(1, int(s.get("http_pool_size", 10))))
+    except Exception:
+        pool_size = 10
+    try:
+        connect_timeout = max(1.0, float(s.get("http_connect_timeout", 5)))
+    except Exception:
+        connect_timeout = 5.0
+    try:
+        http_client.configure_http(pool_size, connect_timeout)
+    except Exception:
+        pass
 
 def _send(chat_id, text):
     try:
@@ -48,7 +62,7 @@ def _send(chat_id, text):
         url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
         payload = {"chat_id": str(chat_id), "text": text, "parse_mode": "HTML", "disable_web_page_preview": True}
         try:
-            requests.post(url, data=payload, timeout=10)
+            http_client.post(url, data=payload, timeout=10)
         except requests.RequestException:
             pass
     except Exception:
@@ -286,9 +300,34 @@ SETTINGS_DESCRIPTIONS = {
     "program_path": "Executable path for the cracking program",
     "program_arguments": "CLI arguments passed to the program",
     "block_length": "Keyspace block length (e.g., 1T)",
+    "block_target_minutes": "Target minutes per block; 0 uses block_length",
+    "block_length_min": "Smallest adaptive block length (e.g., 100B)",
+    "block_length_max": "Largest adaptive block length (e.g., 100T)",
     "oneshot": "Run a single block and exit (true/false)",
     "post_block_delay_enabled": "Enable delay between blocks",
     "post_block_delay_minutes": "Delay minutes between blocks",
+    "prefetch_next_block": "Lease the next block while GPUs run (true/false)",
+    "prefetch_at_percent": "Block completion % that triggers the prefetch",
+    "lease_ahead": "Blocks kept leased ahead in a local queue (0 = off)",
+    "lease_max_age_minutes": "Drop queued leases older than this many minutes (0 = keep)",
+    "async_submit": "Post keys in the background while GPUs run (true/false)",
+    "submit_retry_seconds": "Seconds between failed background posts",
+    "submit_max_attempts": "Failed posts (spread over at least retry seconds x (attempts - 1)) before a block's keys are dropped",
+    "submit_concurrency": "Batches posted in parallel per block (1 = sequential)",
+    "chunk_scheduling": "Split blocks into chunks pulled by each GPU (true/false)",
+    "chunk_length": "Chunk size for chunk scheduling (e.g., 100B)",
+    "chunks_per_gpu": "Chunks per GPU when chunk_length is empty",
+    "auto_share": "Split keyspace by measured GPU speed (true/false)",
+    "gpu_loop_mode": "rig (one shared block) or independent (loop per GPU group)",
+    "gpu_groups": "GPU index groups for independent mode (JSON list)",
+    "block_journal": "Resume an interrupted block after a restart (true/false)",
+    "live_parse": "Parse GPU output while the binary runs (true/false)",
+    "early_abort": "Stop all GPUs as soon as an additional-address key is found (true/false)",
+    "detect_output_format": "Detect each binary's output format and override a wrong program_name (true/false)",
+    "verify_keys": "Check found keys against the block's checkwork addresses before posting (true/false)",
+    "key_spool": "Keep found keys in key_spool.db and retry unposted ones later (true/false)",
+    "http_pool_size": "Keep-alive connections kept per host for pool and Telegram calls",
+    "http_connect_timeout": "Seconds to wait for a new HTTP connection",
     "additional_addresses": "List of extra target addresses",
     "telegram_share": "Enable Telegram status sharing",
     "telegram_accesstoken": "Telegram bot token",
@@ -332,7 +371,7 @@ def _get_updates(offset, timeout):
     if offset is not None:
         params["offset"] = int(offset)
     try:
-        r = requests.get(url, params=params, timeout=timeout + 5)
+        r = http_client.get(url, params=params, timeout=timeout + 5)
         if r.status_code == 200:
             js = {}
             try:
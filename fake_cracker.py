@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stand-in for VanitySearch/BitCrack that works with mock_pool.py, so script.py can run end
+to end on a machine without GPUs.
+
+It takes the arguments script.py passes to a real binary (-i, -o, --keyspace, -gpuId, -l).
+It asks the mock pool which checkwork keys lie in its keyspace and keeps only those whose
+address is in the -i file. While it "runs" for --seconds it prints progress lines like a
+real binary and writes the keys to -o one by one, spread over the run.
+
+Options meant for program_arguments:
+    --pool URL        mock pool base URL (default http://127.0.0.1:8787)
+    --seconds S       run time per call (default 10)
+    --speed MKS       Mkeys/s shown in progress lines (default 2500)
+    --format F        vanity, v2 or bitcrack output (default vanity)
+-l lists FAKE_CRACKER_GPUS (default 1) fake GPUs, which is how script.py counts GPUs when
+nvidia-smi is missing.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+def _get(pool, path, params):
+    with urlopen(f"{pool.rstrip('/')}{path}?{urlencode(params)}", timeout=10) as r:
+        return json.loads(r.read().decode("utf-8"))
+
+def _record(fmt, address, key):
+    if fmt == "bitcrack":
+        return f"{address} {key} 02{'0' * 64}\n"
+    if fmt == "v2":
+        return f"PubAddress: {address}\nPriv (WIF): p2pkh:KFAKE\nPriv (HEX): 0x{key[:32]}\n{key[32:]}\n\n"
+    return f"PubAddress: {address}\nPriv (WIF): p2pkh:KFAKE\nPriv (HEX): 0x{key}\n\n"
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Fake cracker for mock_pool.py end-to-end runs.")
+    ap.add_argument("-l", action="store_true", help="list GPUs and exit")
+    ap.add_argument("-i", dest="in_file")
+    ap.add_argument("-o", dest="out_file")
+    ap.add_argument("--keyspace", default="")
+    ap.add_argument("-gpuId", dest="gpu_id", default="0")
+    ap.add_argument("--pool", default="http://127.0.0.1:8787")
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--speed", type=float, default=2500.0)
+    ap.add_argument("--format", choices=("vanity", "v2", "bitcrack"), default="vanity")
+    args, _unknown = ap.parse_known_args(argv)
+
+    if args.l:
+        for g in range(max(1, int(os.environ.get("FAKE_CRACKER_GPUS", "1") or 1))):
+            print(f"GPU #{g} Fake GPU {g} (0x0 cores)")
+        return 0
+    if not (args.in_file and args.out_file and ":" in args.keyspace):
+        ap.error("-i, -o and --keyspace START:END are required")
+
+    start_hex, _, end_hex = args.keyspace.partition(":")
+    try:
+        with open(args.in_file, "r", encoding="utf-8") as f:
+            wanted = set(ln.strip() for ln in f if ln.strip())
+    except OSError:
+        wanted = set()
+    try:
+        found = [k for k in _get(args.pool, "/_mock/keys", {"start": start_hex, "end": end_hex})["keys"]
+                 if k["address"] in wanted]
+    except Exception as e:
+        print(f"Cannot reach mock pool at {args.pool}: {e}", file=sys.stderr)
+        found = []
+    random.shuffle(found)
+
+    t0 = time.time()
+    deadline = t0 + max(0.0, args.seconds)
+    # Each key is written at a random point of the run, as a real search finds them.
+    due = sorted(t0 + random.uniform(0.05, 0.95) * args.seconds for _ in found)
+    with open(args.out_file, "a", encoding="utf-8") as out:
+        next_progress = t0
+        while True:
+            now = time.time()
+            while due and due[0] <= now:
+                due.pop(0)
+                k = found.pop()
+                out.write(_record(args.format, k["address"], k["key"]))
+                out.flush()
+            if now >= next_progress:
+                speed = args.speed * random.uniform(0.97, 1.03)
+                pct = 100.0 * (now - t0) / args.seconds if args.seconds > 0 else 100.0
+                print(f"{speed:.2f} MK/s (GPU {speed:.2f} MK/s) (2^{40 + pct / 100:.2f}) [{pct:.1f}%]", flush=True)
+                next_progress = now + 1.0
+            if now >= deadline and not found:
+                break
+            time.sleep(min(0.1, max(0.0, deadline - now)) or 0.01)
+    try:
+        _get(args.pool, "/_mock/done", {"start": start_hex, "end": end_hex})
+    except Exception:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
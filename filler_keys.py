@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Random filler keys for topping up a short batch: uniform over [start, end), distinct and
+not in an exclusion set.
+
+Randomness is read from the OS in one large buffer per call (refilled only when it runs
+out) instead of once per key. Each candidate takes just the bytes the range needs, masked
+to the bit length of the span; values >= span are rejected rather than reduced with a
+modulo, so no part of the range is favoured.
+"""
+import secrets
+
+# Candidates read per key still wanted; rejection discards under half of them, usually far fewer.
+_OVERDRAW = 2.2
+
+def _excluded_offsets(exclude, start, span):
+    """Offsets from start of the excluded keys that fall inside the range, as a set of ints."""
+    out = set()
+    for k in (exclude or ()):
+        try:
+            off = int(str(k).strip().replace("0x", ""), 16) - start
+        except ValueError:
+            continue
+        if 0 <= off < span:
+            out.add(off)
+    return out
+
+def random_offsets(count, span, token_bytes=secrets.token_bytes):
+    """count independent uniform integers in [0, span), read from one random buffer."""
+    if span <= 0 or count <= 0:
+        return []
+    nbytes = max(1, ((span - 1).bit_length() + 7) // 8)
+    mask = (1 << max(1, (span - 1).bit_length())) - 1
+    out = []
+    while len(out) < count:
+        need = count - len(out)
+        buf = token_bytes(nbytes * max(16, int(need * _OVERDRAW)))
+        from_bytes = int.from_bytes
+        for i in range(0, len(buf), nbytes):
+            v = from_bytes(buf[i:i + nbytes], "big") & mask
+            if v < span:
+                out.append(v)
+                if len(out) == count:
+                    break
+    return out
+
+def generate_fillers(count, start, end, exclude=None, token_bytes=secrets.token_bytes):
+    """
+    Up to count distinct keys (upper-case 64-digit hex) drawn uniformly from [start, end),
+    skipping keys in exclude (a KeyQueue or any iterable of hex keys).
+    start and end are ints or hex strings. Fewer keys are returned only when the range
+    does not have enough free values.
+    """
+    if not isinstance(start, int):
+        start = int(str(start), 16)
+    if not isinstance(end, int):
+        end = int(str(end), 16)
+    span = end - start
+    if span <= 0 or count <= 0:
+        return []
+    # Excluded and already chosen offsets share one set, so a candidate costs a single lookup.
+    taken = _excluded_offsets(exclude, start, span)
+    out = []
+    # Stop after a bounded number of draws so a nearly exhausted range cannot spin forever.
+    budget = count * 100
+    while len(out) < count and budget > 0:
+        want = min(budget, count - len(out))
+        budget -= want
+        for off in random_offsets(want, span, token_bytes):
+            if off not in taken:
+                taken.add(off)
+                out.append("%064X" % (start + off))
+    return out
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Shared HTTP client for the pool API and Telegram.
+
+One requests.Session with a connection pool per host keeps connections alive between
+calls, so fetching, posting and status edits reuse an open TCP/TLS connection instead of
+doing a new handshake each time (expensive through tunnels such as ngrok). The pool size and
+connect timeout are configurable. Every request and every new connection is counted per
+host, which shows how many handshakes were saved.
+
+get() and post() take the same arguments as requests.get/post and raise the same
+requests exceptions. A numeric timeout is the read timeout; the connect timeout comes from
+configure_http().
+"""
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 5.0
+
+class HttpClient:
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT):
+        self.pool_size = max(1, int(pool_size))
+        self.connect_timeout = float(connect_timeout)
+        self._lock = threading.Lock()
+        self._hosts = {}
+        self.session = self._new_session()
+
+    def _host(self, host):
+        h = self._hosts.get(host)
+        if h is None:
+            h = self._hosts[host] = {"requests": 0, "connections": 0, "errors": 0, "seconds": 0.0}
+        return h
+
+    def _count_connection(self, host):
+        with self._lock:
+            self._host(host)["connections"] += 1
+
+    def _new_session(self):
+        client = self
+
+        class _CountingHTTPPool(HTTPConnectionPool):
+            def _new_conn(self):
+                client._count_connection(self.host)
+                return super()._new_conn()
+
+        class _CountingHTTPSPool(HTTPSConnectionPool):
+            def _new_conn(self):
+                client._count_connection(self.host)
+                return super()._new_conn()
+
+        class _CountingAdapter(HTTPAdapter):
+            def init_poolmanager(self, *args, **kwargs):
+                super().init_poolmanager(*args, **kwargs)
+                self.poolmanager.pool_classes_by_scheme = {"http": _CountingHTTPPool, "https": _CountingHTTPSPool}
+
+        session = requests.Session()
+        # pool_connections = hosts kept, pool_maxsize = idle connections kept per host.
+        adapter = _CountingAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def configure(self, pool_size=None, connect_timeout=None):
+        """Change the settings; a new pool size replaces the session (open connections are closed)."""
+        if connect_timeout is not None:
+            self.connect_timeout = float(connect_timeout)
+        if pool_size is not None and max(1, int(pool_size)) != self.pool_size:
+            self.pool_size = max(1, int(pool_size))
+            old, self.session = self.session, self._new_session()
+            try:
+                old.close()
+            except Exception:
+                pass
+
+    def request(self, method, url, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = 30
+        if not isinstance(timeout, tuple):
+            timeout = (min(self.connect_timeout, timeout), timeout)
+        host = urlsplit(url).hostname or ""
+        t0 = time.perf_counter()
+        try:
+            return self.session.request(method, url, timeout=timeout, **kwargs)
+        except requests.RequestException:
+            with self._lock:
+                self._host(host)["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                h = self._host(host)
+                h["requests"] += 1
+                h["seconds"] += time.perf_counter() - t0
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def stats(self):
+        """Totals and per-host counts; reused = requests that did not open a new connection."""
+        with self._lock:
+            hosts = {h: dict(v) for h, v in self._hosts.items()}
+        out = {"requests": 0, "connections": 0, "errors": 0, "hosts": {}}
+        for host, v in hosts.items():
+            reused = max(0, v["requests"] - v["connections"])
+            out["hosts"][host] = {
+                "requests": v["requests"],
+                "connections": v["connections"],
+                "reused": reused,
+                "errors": v["errors"],
+                "avg_ms": round(v["seconds"] * 1000 / v["requests"], 1) if v["requests"] else 0,
+            }
+            for k in ("requests", "connections", "errors"):
+                out[k] += v[k]
+        out["reused"] = max(0, out["requests"] - out["connections"])
+        out["reuse_pct"] = round(100.0 * out["reused"] / out["requests"], 1) if out["requests"] else 0.0
+        return out
+
+    def close(self):
+        self.session.close()
+
+_CLIENT = HttpClient()
+
+def configure_http(pool_size=None, connect_timeout=None):
+    _CLIENT.configure(pool_size, connect_timeout)
+
+def get(url, **kwargs):
+    return _CLIENT.get(url, **kwargs)
+
+def post(url, **kwargs):
+    return _CLIENT.post(url, **kwargs)
+
+def http_stats():
+    return _CLIENT.stats()
@@ -0,0 +1,287 @@
+"""
+KeyQueue: ordered, duplicate-free queue of private keys waiting to be posted.
+
+Keys are kept as 32 raw bytes (about half the memory of 64-character strings) in a deque
+for order plus a set for membership, so adding a key, checking for it and taking a batch
+off the front do not depend on how many keys are queued. Keys go in as hex strings (any
+case, optional 0x) and come out as upper-case hex, the form posted to the pool.
+
+KeyJournal persists one queue: a JSON snapshot plus an append-only log of the changes
+made since, so saving after each posted batch costs one short append instead of a rewrite.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import deque
+from itertools import islice
+
+class KeyQueue:
+    __slots__ = ("_order", "_members", "_lock", "_journal")
+
+    def __init__(self, keys=None):
+        self._order = deque()
+        self._members = set()
+        self._lock = threading.RLock()
+        self._journal = None
+        if keys:
+            self.extend(keys)
+
+    @staticmethod
+    def raw(key):
+        """32-byte form of a key, or None when it is not 64 hex digits."""
+        if isinstance(key, (bytes, bytearray)):
+            return bytes(key) if len(key) == 32 else None
+        t = str(key).strip()
+        if t[:2] in ("0x", "0X"):
+            t = t[2:]
+        if len(t) != 64:
+            return None
+        try:
+            b = bytes.fromhex(t)
+        except ValueError:
+            return None
+        return b if len(b) == 32 else None
+
+    @staticmethod
+    def hex(raw):
+        return raw.hex().upper()
+
+    def add(self, key):
+        """Append key unless it is malformed or already queued; True when it was added."""
+        b = self.raw(key)
+        if b is None:
+            return False
+        with self._lock:
+            if b in self._members:
+                return False
+            self._members.add(b)
+            self._order.append(b)
+            if self._journal is not None:
+                self._journal.record(self, "+", [b])
+        return True
+
+    def extend(self, keys):
+        """Append every new key in order; returns how many were added."""
+        new = []
+        with self._lock:
+            for key in keys:
+                b = self.raw(key)
+                if b is not None and b not in self._members:
+                    self._members.add(b)
+                    self._order.append(b)
+                    new.append(b)
+            if new and self._journal is not None:
+                self._journal.record(self, "+", new)
+        return len(new)
+
+    def peek(self, n):
+        """The first n keys, left in the queue."""
+        with self._lock:
+            return [self.hex(b) for b in islice(self._order, max(0, n))]
+
+    def pop(self, n):
+        """Remove and return the first n keys."""
+        out = []
+        with self._lock:
+            for _ in range(min(n, len(self._order))):
+                b = self._order.popleft()
+                self._members.discard(b)
+                out.append(b)
+            if out and self._journal is not None:
+                self._journal.record(self, "-", out)
+        return [self.hex(b) for b in out]
+
+    def remove(self, keys):
+        """Drop the given keys wherever they are queued; returns how many were removed."""
+        gone = set(b for b in (self.raw(k) for k in keys) if b is not None)
+        with self._lock:
+            gone &= self._members
+            if gone:
+                self._members -= gone
+                self._order = deque(b for b in self._order if b not in gone)
+                if self._journal is not None:
+                    self._journal.record(self, "-", gone)
+        return len(gone)
+
+    def clear(self):
+        with self._lock:
+            had = bool(self._order)
+            self._order.clear()
+            self._members.clear()
+            if had and self._journal is not None:
+                self._journal.record(self, "*", [])
+
+    def to_list(self):
+        with self._lock:
+            return [self.hex(b) for b in self._order]
+
+    def __contains__(self, key):
+        b = self.raw(key)
+        return b is not None and b in self._members
+
+    def __len__(self):
+        return len(self._order)
+
+    def __bool__(self):
+        return bool(self._order)
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __repr__(self):
+        return f"KeyQueue({len(self)} keys)"
+
+class KeyJournal:
+    """
+    Crash-safe persistence for the KeyQueue it is attached to.
+
+    snapshot_path holds a JSON list of keys, always replaced atomically. log_path starts
+    with the SHA-1 of the snapshot it extends, followed by one record per line: "+KEY"
+    (queued), "-KEY" (posted or dropped) and "*" (cleared). Every change made by one queue
+    call is written and fsynced together. Once the log outgrows the queue it is compacted
+    into a new snapshot. On load a torn last line is ignored, and a log whose header does
+    not match the snapshot (a crash during compaction) is discarded, since the snapshot
+    already contains it. A failed append is cut off the log and the next change compacts
+    instead, so later records never follow a torn line. attach, compact and record share
+    one lock, always taken after the queue's own.
+    """
+
+    COMPACT_MIN_RECORDS = 1000
+
+    def __init__(self, snapshot_path, log_path):
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path
+        self.queue = None
+        self.records = 0
+        self._fh = None
+        self._lock = threading.RLock()
+        # Set when an append failed: the log no longer matches the queue until it is compacted.
+        self._stale = False
+
+    @staticmethod
+    def _digest(data):
+        return hashlib.sha1(data).hexdigest()
+
+    def load(self):
+        """Rebuild the queue from snapshot + log; the journal is not attached yet."""
+        q = KeyQueue()
+        data = b"[]"
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                data = f.read()
+            keys = json.loads(data.decode("utf-8"))
+            if isinstance(keys, list):
+                q.extend(keys)
+        except FileNotFoundError:
+            data = b"[]"
+        except Exception:
+            pass
+        try:
+            with open(self.log_path, "rb") as f:
+                lines = f.read().split(b"\n")
+        except FileNotFoundError:
+            return q
+        # The last element is b"" after a complete line, or a torn record otherwise.
+        if len(lines) < 2 or lines[0].decode("ascii", "replace") != self._digest(data):
+            return q
+        # Consecutive records of one kind are applied together (remove() is O(n) per call).
+        run_op, run = None, []
+        for line in lines[1:-1] + [b"."]:
+            op = line[:1]
+            if op != run_op or op == b"*":
+                if run_op == b"+":
+                    q.extend(run)
+                elif run_op == b"-":
+                    q.remove(run)
+                elif run_op == b"*":
+                    q.clear()
+                run_op, run = op, []
+            run.append(line[1:].decode("ascii", "replace"))
+        return q
+
+    def attach(self, queue):
+        """Persist queue from now on (replacing the queue attached before) and compact."""
+        with queue._lock, self._lock:
+            old = self.queue
+            if old is not None and old is not queue:
+                old._journal = None
+            self.queue = queue
+            queue._journal = self
+            self.compact()
+
+    def compact(self):
+        q = self.queue
+        if q is None:
+            return
+        with q._lock, self._lock:
+            if q is not self.queue:
+                return
+            data = json.dumps(q.to_list()).encode("utf-8")
+            tmp = self.snapshot_path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.snapshot_path)
+            self._close()
+            tmp = self.log_path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write((self._digest(data) + "\n").encode("ascii"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.log_path)
+            self.records = 0
+            self._stale = False
+
+    def record(self, queue, op, raws):
+        """Append the records of one queue change; called by KeyQueue with its lock held."""
+        with self._lock:
+            if queue is not self.queue:
+                return
+            if self._stale:
+                self._compact_quietly()
+                return
+            if op == "*":
+                body = b"*\n"
+            else:
+                prefix = op.encode("ascii")
+                body = b"".join(prefix + KeyQueue.hex(b).encode("ascii") + b"\n" for b in raws)
+            good = None
+            try:
+                if self._fh is None:
+                    self._fh = open(self.log_path, "ab")
+                good = self._fh.tell()
+                self._fh.write(body)
+                self._fh.flush()
+                os.fsync(self._fh.fileno())
+                self.records += 1 if op == "*" else len(raws)
+            except (OSError, ValueError):
+                # Keep the in-memory queue working: cut the partial record off the log and
+                # rewrite everything with the next change (or now, if the disk allows).
+                self._close()
+                self._stale = True
+                if good is not None:
+                    try:
+                        os.truncate(self.log_path, good)
+                    except OSError:
+                        pass
+                self._compact_quietly()
+                return
+            if self.records > max(self.COMPACT_MIN_RECORDS, 2 * len(queue)):
+                self._compact_quietly()
+
+    def _compact_quietly(self):
+        try:
+            self.compact()
+        except (OSError, ValueError):
+            self._close()
+            self._stale = True
+
+    def _close(self):
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            except OSError:
+                pass
+            self._fh = None
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+KeySpool: SQLite record of every key the GPUs found, tagged with the block it belongs to
+(id and range), the GPU that found it, when it was found and whether it was posted.
+
+Keys a block could not post stay "pending" instead of being lost, so they can be retried
+against their own block later or audited. The database also answers throughput questions
+(keys found/posted per hour, per GPU). Uses only the sqlite3 module of the standard library.
+
+    python3 key_spool.py                  # totals and last 24 h throughput
+    python3 key_spool.py --blocks 20      # also the 20 most recent blocks
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+# Key states. Only "pending" keys are picked up for retries.
+PENDING = "pending"
+POSTED = "posted"
+REJECTED = "rejected"          # the pool answered "incompatible" for the key's block
+QUARANTINED = "quarantined"    # failed range or address validation, never posted
+EXPIRED = "expired"            # still unposted after max_attempts retries
+STATES = (PENDING, POSTED, REJECTED, QUARANTINED, EXPIRED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS keys (
+    key         TEXT NOT NULL,
+    block_id    TEXT,
+    range_start TEXT NOT NULL,
+    range_end   TEXT NOT NULL,
+    addr_count  INTEGER,
+    gpu         TEXT,
+    found_at    REAL NOT NULL,
+    state       TEXT NOT NULL DEFAULT 'pending',
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    updated_at  REAL NOT NULL,
+    PRIMARY KEY (key, range_start, range_end)
+);
+CREATE INDEX IF NOT EXISTS keys_state ON keys (state, found_at);
+CREATE INDEX IF NOT EXISTS keys_block ON keys (range_start, range_end);
+"""
+
+class KeySpool:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _write(self, sql, rows):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                cur = self._db.executemany(sql, rows)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            return cur.rowcount
+
+    @staticmethod
+    def _norm(key):
+        return str(key).strip().replace("0x", "").upper()
+
+    def add(self, keys, block, gpu=None):
+        """Record new keys of block (dict with id, start, end, addr_count); known keys are left alone."""
+        now = time.time()
+        start = str(block.get("start") or "").upper()
+        end = str(block.get("end") or "").upper()
+        bid = block.get("id")
+        addr_count = block.get("addr_count")
+        gpu = None if gpu is None else str(gpu)
+        rows = [(self._norm(k), bid, start, end, addr_count, gpu, now, now) for k in keys]
+        if not rows:
+            return 0
+        return self._write(
+            "INSERT OR IGNORE INTO keys (key, block_id, range_start, range_end, addr_count, gpu, found_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def mark(self, keys, state, block=None):
+        """Set the state of keys, within block's range when one is given (otherwise in every block)."""
+        now = time.time()
+        keys = [self._norm(k) for k in keys]
+        if not keys:
+            return 0
+        if block is None:
+            return self._write("UPDATE keys SET state = ?, updated_at = ? WHERE key = ? AND state = 'pending'",
+                               [(state, now, k) for k in keys])
+        start = str(block.get("start") or "").upper()
+        end = str(block.get("end") or "").upper()
+        return self._write("UPDATE keys SET state = ?, updated_at = ? WHERE key = ? AND range_start = ? AND range_end = ?",
+                           [(state, now, k, start, end) for k in keys])
+
+    def pending_blocks(self, exclude=(), limit=3, max_attempts=3):
+        """
+        Oldest blocks that still have pending keys, excluding (start, end) ranges in exclude.
+        Each is a dict like the ones the main loop posts from, with "keys" a list.
+        Every block returned counts one attempt; keys past max_attempts become expired.
+        """
+        exclude = set((str(s).upper(), str(e).upper()) for s, e in exclude)
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE keys SET state = ?, updated_at = ? WHERE state = 'pending' AND attempts >= ?",
+                             (EXPIRED, now, max_attempts))
+            groups = self._db.execute(
+                "SELECT range_start, range_end, MAX(block_id), MAX(addr_count), MIN(found_at) FROM keys "
+                "WHERE state = 'pending' GROUP BY range_start, range_end ORDER BY MIN(found_at)").fetchall()
+            out = []
+            for start, end, bid, addr_count, first in groups:
+                if (start, end) in exclude:
+                    continue
+                keys = [r[0] for r in self._db.execute(
+                    "SELECT key FROM keys WHERE state = 'pending' AND range_start = ? AND range_end = ? ORDER BY found_at",
+                    (start, end))]
+                self._db.execute("UPDATE keys SET attempts = attempts + 1, updated_at = ? WHERE state = 'pending' AND range_start = ? AND range_end = ?",
+                                 (now, start, end))
+                out.append({"id": bid, "start": start, "end": end, "addr_count": addr_count or 10, "keys": keys, "found_at": first})
+                if len(out) >= limit:
+                    break
+            return out
+
+    def stats(self, hours=24):
+        """Totals by state, found/posted counts and rates over the last `hours`, and keys per GPU."""
+        since = time.time() - hours * 3600
+        with self._lock:
+            by_state = dict(self._db.execute("SELECT state, COUNT(*) FROM keys GROUP BY state").fetchall())
+            found = self._db.execute("SELECT COUNT(*) FROM keys WHERE found_at >= ?", (since,)).fetchone()[0]
+            posted = self._db.execute("SELECT COUNT(*) FROM keys WHERE state = 'posted' AND updated_at >= ?", (since,)).fetchone()[0]
+            blocks = self._db.execute("SELECT COUNT(DISTINCT range_start || ':' || range_end) FROM keys WHERE found_at >= ?", (since,)).fetchone()[0]
+            by_gpu = dict(self._db.execute(
+                "SELECT COALESCE(gpu, '-'), COUNT(*) FROM keys WHERE found_at >= ? GROUP BY gpu", (since,)).fetchall())
+        return {
+            "states": {s: int(by_state.get(s, 0)) for s in STATES},
+            "window_hours": hours,
+            "found": found,
+            "posted": posted,
+            "blocks": blocks,
+            "found_per_hour": round(found / hours, 1) if hours else 0,
+            "posted_per_hour": round(posted / hours, 1) if hours else 0,
+            "by_gpu": by_gpu,
+        }
+
+    def blocks(self, limit=20):
+        """Per-block audit rows (newest first): id, range, first/last find and counts by state."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT MAX(block_id), range_start, range_end, MIN(found_at), MAX(found_at), COUNT(*), "
+                "SUM(state = 'posted'), SUM(state = 'pending'), SUM(state NOT IN ('posted', 'pending')) "
+                "FROM keys GROUP BY range_start, range_end ORDER BY MAX(found_at) DESC LIMIT ?", (limit,)).fetchall()
+        return [{"id": r[0], "start": r[1], "end": r[2], "first": r[3], "last": r[4], "keys": r[5],
+                 "posted": r[6], "pending": r[7], "dropped": r[8]} for r in rows]
+
+    def prune(self, days):
+        """Delete posted, rejected and expired keys last touched more than `days` ago."""
+        cutoff = time.time() - days * 86400
+        with self._lock:
+            cur = self._db.execute("DELETE FROM keys WHERE state != 'pending' AND updated_at < ?", (cutoff,))
+            return cur.rowcount
+
+def _ts(t):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t)) if t else "-"
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Show throughput and per-block state of the key spool.")
+    ap.add_argument("--db", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "key_spool.db"))
+    ap.add_argument("--hours", type=float, default=24, help="throughput window")
+    ap.add_argument("--blocks", type=int, default=0, help="also list this many recent blocks")
+    args = ap.parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"No spool at {args.db}")
+        return 1
+    spool = KeySpool(args.db)
+    st = spool.stats(args.hours)
+    print("Keys by state: " + ", ".join(f"{s} {n}" for s, n in st["states"].items()))
+    print(f"Last {args.hours:g} h: {st['found']} found ({st['found_per_hour']}/h), {st['posted']} posted ({st['posted_per_hour']}/h) in {st['blocks']} block(s)")
+    if st["by_gpu"]:
+        print("Found by GPU: " + ", ".join(f"{g} {n}" for g, n in sorted(st["by_gpu"].items())))
+    if args.blocks > 0:
+        print(f"{'block':<14} {'range':<40} {'first found':<20} {'keys':>6} {'posted':>7} {'pending':>8} {'dropped':>8}")
+        for b in spool.blocks(args.blocks):
+            rng = f"{b['start'][-16:]}:{b['end'][-16:]}"
+            print(f"{str(b['id'] or '-')[:14]:<14} {rng:<40} {_ts(b['first']):<20} {b['keys']:>6} {b['posted']:>7} {b['pending']:>8} {b['dropped']:>8}")
+    spool.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
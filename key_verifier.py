@@ -0,0 +1,222 @@
+"""
+Local check of found private keys: derive each key's public key on secp256k1 and compare
+its P2PKH hash160 (compressed and uncompressed) with the block's checkwork addresses.
+
+Pure Python. Base-point multiples come from a table of affine points built once (32
+windows of 8 bits), so a key costs at most 32 mixed Jacobian additions. The Jacobian
+results of a whole batch are converted to affine with a single modular inversion.
+"""
+import hashlib
+
+P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
+N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+GX = 0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798
+GY = 0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8
+
+WINDOW_BITS = 8
+_B58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_B58_INDEX = {c: i for i, c in enumerate(_B58)}
+
+# ----------------------------------------------------------------------------------------------
+#  Curve arithmetic (a = 0). Points are Jacobian (X, Y, Z) with Z == 0 for infinity.
+# ----------------------------------------------------------------------------------------------
+
+def _jac_double(X, Y, Z):
+    if not Y or not Z:
+        return 0, 1, 0
+    YY = Y * Y % P
+    S = 4 * X * YY % P
+    M = 3 * X * X % P
+    X3 = (M * M - 2 * S) % P
+    Y3 = (M * (S - X3) - 8 * YY * YY) % P
+    return X3, Y3, 2 * Y * Z % P
+
+def _jac_add_affine(X1, Y1, Z1, x2, y2):
+    """(X1:Y1:Z1) + (x2, y2), the second point affine."""
+    if not Z1:
+        return x2, y2, 1
+    Z1Z1 = Z1 * Z1 % P
+    H = (x2 * Z1Z1 - X1) % P
+    R = (y2 * Z1 * Z1Z1 - Y1) % P
+    if not H:
+        return _jac_double(X1, Y1, Z1) if not R else (0, 1, 0)
+    HH = H * H % P
+    HHH = H * HH % P
+    V = X1 * HH % P
+    X3 = (R * R - HHH - 2 * V) % P
+    Y3 = (R * (V - X3) - Y1 * HHH) % P
+    return X3, Y3, Z1 * H % P
+
+def _batch_inverse(values):
+    """Inverses mod P of non-zero values with one pow() (Montgomery's trick)."""
+    prefix = []
+    acc = 1
+    for v in values:
+        prefix.append(acc)
+        acc = acc * v % P
+    inv = pow(acc, P - 2, P)
+    out = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        out[i] = inv * prefix[i] % P
+        inv = inv * values[i] % P
+    return out
+
+def _to_affine(points):
+    """Affine (x, y) for Jacobian points, none of them infinity."""
+    out = []
+    for (X, Y, _Z), zi in zip(points, _batch_inverse([Z for (_X, _Y, Z) in points])):
+        zi2 = zi * zi % P
+        out.append((X * zi2 % P, Y * zi2 * zi % P))
+    return out
+
+_G_TABLE = None
+
+def _g_table():
+    """_G_TABLE[i][d - 1] = d * 2^(8i) * G, affine."""
+    global _G_TABLE
+    if _G_TABLE is None:
+        table = []
+        bx, by = GX, GY
+        for _ in range(256 // WINDOW_BITS):
+            row = [(bx, by, 1)]
+            for _d in range(2, 1 << WINDOW_BITS):
+                row.append(_jac_add_affine(*row[-1], bx, by))
+            row.append(_jac_add_affine(*row[-1], bx, by))
+            affine = _to_affine(row)
+            table.append(affine[:-1])
+            bx, by = affine[-1]
+        _G_TABLE = table
+    return _G_TABLE
+
+def _mul_g(k):
+    table = _g_table()
+    mask = (1 << WINDOW_BITS) - 1
+    X, Y, Z = 0, 1, 0
+    i = 0
+    while k:
+        d = k & mask
+        if d:
+            X, Y, Z = _jac_add_affine(X, Y, Z, *table[i][d - 1])
+        k >>= WINDOW_BITS
+        i += 1
+    return X, Y, Z
+
+def public_keys(privs):
+    """Affine public keys for private key integers in [1, N - 1]."""
+    return _to_affine([_mul_g(k) for k in privs])
+
+# ----------------------------------------------------------------------------------------------
+#  Hashing and addresses
+# ----------------------------------------------------------------------------------------------
+
+_RMD_R1 = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,
+           7, 4, 13, 1, 10, 6, 15, 3, 12, 0, 9, 5, 2, 14, 11, 8,
+           3, 10, 14, 4, 9, 15, 8, 1, 2, 7, 0, 6, 13, 11, 5, 12,
+           1, 9, 11, 10, 0, 8, 12, 4, 13, 3, 7, 15, 14, 5, 6, 2,
+           4, 0, 5, 9, 7, 12, 2, 10, 14, 1, 3, 8, 11, 6, 15, 13]
+_RMD_R2 = [5, 14, 7, 0, 9, 2, 11, 4, 13, 6, 15, 8, 1, 10, 3, 12,
+           6, 11, 3, 7, 0, 13, 5, 10, 14, 15, 8, 12, 4, 9, 1, 2,
+           15, 5, 1, 3, 7, 14, 6, 9, 11, 8, 12, 2, 10, 0, 4, 13,
+           8, 6, 4, 1, 3, 11, 15, 0, 5, 12, 2, 13, 9, 7, 10, 14,
+           12, 15, 10, 4, 1, 5, 8, 7, 6, 2, 13, 14, 0, 3, 9, 11]
+_RMD_S1 = [11, 14, 15, 12, 5, 8, 7, 9, 11, 13, 14, 15, 6, 7, 9, 8,
+           7, 6, 8, 13, 11, 9, 7, 15, 7, 12, 15, 9, 11, 7, 13, 12,
+           11, 13, 6, 7, 14, 9, 13, 15, 14, 8, 13, 6, 5, 12, 7, 5,
+           11, 12, 14, 15, 14, 15, 9, 8, 9, 14, 5, 6, 8, 6, 5, 12,
+           9, 15, 5, 11, 6, 8, 13, 12, 5, 12, 13, 14, 11, 8, 5, 6]
+_RMD_S2 = [8, 9, 9, 11, 13, 15, 15, 5, 7, 7, 8, 11, 14, 14, 12, 6,
+           9, 13, 15, 7, 12, 8, 9, 11, 7, 7, 12, 7, 6, 15, 13, 11,
+           9, 7, 15, 11, 8, 6, 6, 14, 12, 13, 5, 14, 13, 13, 7, 5,
+           15, 5, 8, 11, 14, 14, 6, 14, 6, 9, 12, 9, 12, 5, 15, 8,
+           8, 5, 12, 9, 12, 5, 14, 6, 8, 13, 6, 5, 15, 13, 11, 11]
+_RMD_K1 = [0x00000000, 0x5A827999, 0x6ED9EBA1, 0x8F1BBCDC, 0xA953FD4E]
+_RMD_K2 = [0x50A28BE6, 0x5C4DD124, 0x6D703EF3, 0x7A6D76E9, 0x00000000]
+_M32 = 0xFFFFFFFF
+
+def _rmd_f(j, x, y, z):
+    if j == 0:
+        return x ^ y ^ z
+    if j == 1:
+        return (x & y) | (~x & z)
+    if j == 2:
+        return (x | ~y) ^ z
+    if j == 3:
+        return (x & z) | (y & ~z)
+    return x ^ (y | ~z)
+
+def _rol(x, n):
+    x &= _M32
+    return ((x << n) | (x >> (32 - n))) & _M32
+
+def _ripemd160_py(data):
+    """RIPEMD-160 for OpenSSL builds that no longer ship it."""
+    h = [0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0]
+    msg = bytes(data) + b"\x80" + b"\x00" * ((55 - len(data)) % 64) + (8 * len(data)).to_bytes(8, "little")
+    for off in range(0, len(msg), 64):
+        X = [int.from_bytes(msg[off + 4 * i:off + 4 * i + 4], "little") for i in range(16)]
+        al, bl, cl, dl, el = h
+        ar, br, cr, dr, er = h
+        for j in range(80):
+            rnd = j >> 4
+            t = (_rol(al + _rmd_f(rnd, bl, cl, dl) + X[_RMD_R1[j]] + _RMD_K1[rnd], _RMD_S1[j]) + el) & _M32
+            al, el, dl, cl, bl = el, dl, _rol(cl, 10), bl, t
+            t = (_rol(ar + _rmd_f(4 - rnd, br, cr, dr) + X[_RMD_R2[j]] + _RMD_K2[rnd], _RMD_S2[j]) + er) & _M32
+            ar, er, dr, cr, br = er, dr, _rol(cr, 10), br, t
+        h = [(h[1] + cl + dr) & _M32, (h[2] + dl + er) & _M32, (h[3] + el + ar) & _M32,
+             (h[4] + al + br) & _M32, (h[0] + bl + cr) & _M32]
+    return b"".join(v.to_bytes(4, "little") for v in h)
+
+def _ripemd160(data):
+    try:
+        return hashlib.new("ripemd160", data).digest()
+    except ValueError:
+        return _ripemd160_py(data)
+
+def hash160(data):
+    return _ripemd160(hashlib.sha256(data).digest())
+
+def address_hash160(address):
+    """hash160 inside a base58check P2PKH address, or None for anything else."""
+    try:
+        n = 0
+        for c in str(address).strip():
+            n = n * 58 + _B58_INDEX[c]
+        raw = n.to_bytes(25, "big")
+    except (KeyError, OverflowError):
+        return None
+    if raw[0] != 0 or hashlib.sha256(hashlib.sha256(raw[:21]).digest()).digest()[:4] != raw[21:]:
+        return None
+    return raw[1:21]
+
+def address_targets(addresses):
+    """Set of hash160s for the P2PKH addresses in a list; others are skipped."""
+    return set(h for h in (address_hash160(a) for a in (addresses or [])) if h)
+
+def verify_keys(keys, targets):
+    """
+    Split hex private keys into (matched, unmatched). A key matches when the compressed
+    or uncompressed P2PKH hash160 of its public key is in targets (see address_targets).
+    """
+    matched = []
+    unmatched = []
+    privs = []
+    valid = []
+    for k in keys:
+        try:
+            n = int(str(k).strip().replace("0x", ""), 16)
+        except ValueError:
+            n = 0
+        if 0 < n < N:
+            privs.append(n)
+            valid.append(k)
+        else:
+            unmatched.append(k)
+    if not privs:
+        return matched, unmatched
+    for k, (x, y) in zip(valid, public_keys(privs)):
+        xb = x.to_bytes(32, "big")
+        if hash160((b"\x03" if y & 1 else b"\x02") + xb) in targets or hash160(b"\x04" + xb + y.to_bytes(32, "big")) in targets:
+            matched.append(k)
+        else:
+            unmatched.append(k)
+    return matched, unmatched
@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for the pool API, for running script.py end to end without the real pool.
+
+It implements the same contract as the pool:
+- GET <path> leases a block: {"blockId", "range": {"start", "end"}, "checkwork_addresses"}.
+  The addresses belong to random private keys inside the range, so real keys exist for them.
+- After --blocks blocks it answers 409 {"error": "All blocks are solved"}, which makes
+  script.py shut down.
+- POST <path>/submit takes {"privateKeys", "blockId"}. Malformed keys and keys outside the
+  block's range are answered 400 "Not all private keys are correct", an unknown block
+  400 "No target block found". A block counts as solved once all its checkwork keys have
+  been posted.
+
+Faults can be injected: 5xx answers (optionally with Retry-After), added latency, random
+incompatible answers and a full outage window. The mock also serves two endpoints for the
+harness. /_mock/keys?start=&end= returns the checkwork keys inside a keyspace; it is what
+fake_cracker.py "finds". /_mock/stats returns blocks/hour and per-block timings. The
+orchestration overhead of a block is its fetch-to-fetch cycle time minus the time the
+crackers ran on it; the first cycle starts at the first API call.
+
+    python3 mock_pool.py --port 8787 --blocks 20
+    python3 mock_pool.py --fail-rate 0.2 --latency-ms 300 --jitter-ms 200
+    python3 mock_pool.py --outage 60:45 --status 503 --retry-after 20
+"""
+import argparse
+import hashlib
+import json
+import random
+import signal
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from key_verifier import hash160, public_keys
+
+_B58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+def p2pkh_address(priv):
+    """Compressed P2PKH address of a private key integer."""
+    (x, y), = public_keys([priv])
+    payload = b"\x00" + hash160((b"\x03" if y & 1 else b"\x02") + x.to_bytes(32, "big"))
+    raw = payload + hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4]
+    n = int.from_bytes(raw, "big")
+    out = ""
+    while n:
+        n, r = divmod(n, 58)
+        out = _B58[r] + out
+    return "1" * (len(raw) - len(raw.lstrip(b"\x00"))) + out
+
+def _pct(values, q):
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[min(len(s) - 1, int(q * len(s)))]
+
+class MockPool:
+    def __init__(self, blocks=10, addresses=10, block_bits=40, fail_rate=0.0, status=503, retry_after=None,
+                 latency_ms=0, jitter_ms=0, incompatible_rate=0.0, outage=None, no_block_id=False, seed=None):
+        self.total_blocks = blocks
+        self.addresses = max(1, addresses)
+        self.block_bits = max(8, block_bits)
+        self.fail_rate = fail_rate
+        self.status = status
+        self.retry_after = retry_after
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.incompatible_rate = incompatible_rate
+        self.outage = outage           # (start, duration) in seconds after start
+        self.no_block_id = no_block_id
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.first_call = None
+        self.blocks = {}               # id -> block dict
+        self.order = []
+        self.counts = {"fetch": 0, "submit": 0, "accepted": 0, "incompatible": 0, "faults": 0, "outage": 0, "solved_answers": 0}
+
+    # ------------------------------------------------------------------------------------------
+    #  Blocks
+    # ------------------------------------------------------------------------------------------
+
+    def _new_block(self):
+        span = 1 << self.block_bits
+        # Somewhere in the 71-bit puzzle space, aligned to the block size like pool ranges.
+        start = ((1 << 70) + self._rng.randrange(1 << (70 - self.block_bits)) * span)
+        keys = set()
+        while len(keys) < self.addresses:
+            keys.add(start + self._rng.randrange(span))
+        keys = sorted(keys)
+        bid = f"mock-{len(self.order) + 1:04d}"
+        block = {
+            "id": bid,
+            "start": start,
+            "end": start + span,
+            "keys": {"%064X" % k: p2pkh_address(k) for k in keys},
+            "posted": set(),
+            "fetched_at": time.time(),
+            "solved_at": None,
+            "crack_first": None,
+            "crack_last": None,
+            "crack_runs": 0,
+        }
+        self.blocks[bid] = block
+        self.order.append(bid)
+        return block
+
+    def lease(self):
+        """(status, body) for a block request."""
+        with self._lock:
+            self.counts["fetch"] += 1
+            if len(self.order) >= self.total_blocks:
+                self.counts["solved_answers"] += 1
+                return 409, {"error": "All blocks are solved"}
+            block = self._new_block()
+        body = {
+            "range": {"start": "0x%x" % block["start"], "end": "0x%x" % block["end"]},
+            "checkwork_addresses": list(block["keys"].values()),
+        }
+        if not self.no_block_id:
+            body["blockId"] = block["id"]
+        return 200, body
+
+    def _block_for(self, bid):
+        if bid:
+            return self.blocks.get(str(bid))
+        # Without an id the pool checks against the worker's active (latest) block.
+        return self.blocks.get(self.order[-1]) if self.order else None
+
+    def submit(self, data):
+        """(status, body) for a key submission."""
+        with self._lock:
+            self.counts["submit"] += 1
+            keys = data.get("privateKeys") if isinstance(data, dict) else None
+            block = self._block_for(data.get("blockId") if isinstance(data, dict) else None)
+            if block is None:
+                self.counts["incompatible"] += 1
+                return 400, {"error": "No target block found"}
+            if not isinstance(keys, list) or not 1 <= len(keys) <= 30:
+                self.counts["incompatible"] += 1
+                return 400, {"error": "Incompatible privatekeys"}
+            norm = []
+            for k in keys:
+                t = str(k).strip().replace("0x", "").upper()
+                try:
+                    v = int(t, 16)
+                except ValueError:
+                    v = -1
+                if len(t) != 64 or not block["start"] <= v < block["end"]:
+                    self.counts["incompatible"] += 1
+                    return 400, {"error": "Not all private keys are correct"}
+                norm.append(t)
+            if self.incompatible_rate and self._rng.random() < self.incompatible_rate:
+                self.counts["incompatible"] += 1
+                return 400, {"error": "Incompatible privatekeys"}
+            self.counts["accepted"] += 1
+            block["posted"].update(k for k in norm if k in block["keys"])
+            if block["solved_at"] is None and len(block["posted"]) == len(block["keys"]):
+                block["solved_at"] = time.time()
+            return 200, {"success": True, "accepted": len(norm)}
+
+    def keys_in(self, start, end):
+        """Checkwork keys (with their addresses) inside [start, end); marks the cracker run on its block."""
+        now = time.time()
+        out = []
+        with self._lock:
+            for block in self.blocks.values():
+                if block["end"] <= start or block["start"] >= end:
+                    continue
+                block["crack_runs"] += 1
+                if block["crack_first"] is None:
+                    block["crack_first"] = now
+                out += [{"key": k, "address": a} for k, a in block["keys"].items() if start <= int(k, 16) < end]
+        return out
+
+    def crack_done(self, start, end):
+        now = time.time()
+        with self._lock:
+            for block in self.blocks.values():
+                if block["start"] < end and block["end"] > start:
+                    block["crack_last"] = max(block["crack_last"] or 0, now)
+
+    # ------------------------------------------------------------------------------------------
+    #  Faults
+    # ------------------------------------------------------------------------------------------
+
+    def fault(self):
+        """(status, headers, body) to answer instead of the real response, or None. Called once per API call."""
+        if self.first_call is None:
+            self.first_call = time.time()
+        delay = self.latency_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        headers = {}
+        if self.retry_after is not None:
+            headers["Retry-After"] = str(self.retry_after)
+        if self.outage:
+            t = time.time() - self.started
+            if self.outage[0] <= t < self.outage[0] + self.outage[1]:
+                with self._lock:
+                    self.counts["outage"] += 1
+                return 503, headers, {"error": "Service unavailable (mock outage)"}
+        if self.fail_rate and self._rng.random() < self.fail_rate:
+            with self._lock:
+                self.counts["faults"] += 1
+            return self.status, headers, {"error": f"Injected HTTP {self.status}"}
+        return None
+
+    # ------------------------------------------------------------------------------------------
+    #  Stats
+    # ------------------------------------------------------------------------------------------
+
+    def stats(self):
+        with self._lock:
+            now = time.time()
+            blocks = [self.blocks[b] for b in self.order]
+            counts = dict(self.counts)
+        rows = []
+        cycles, cracks, overheads = [], [], []
+        # Block i's cycle runs from its fetch to the next block's fetch, so failed fetches and
+        # backoff waits count against the block before them. The first cycle starts at the
+        # first API call and the last one ends when that block is solved.
+        for i, b in enumerate(blocks):
+            begin = (self.first_call or b["fetched_at"]) if i == 0 else b["fetched_at"]
+            end = blocks[i + 1]["fetched_at"] if i + 1 < len(blocks) else b["solved_at"]
+            crack = (b["crack_last"] - b["crack_first"]) if b["crack_first"] and b["crack_last"] else None
+            cycle = (end - begin) if end else None
+            row = {
+                "id": b["id"],
+                "solved": b["solved_at"] is not None,
+                "posted_keys": len(b["posted"]),
+                "cycle_s": round(cycle, 2) if cycle is not None else None,
+                "crack_s": round(crack, 2) if crack is not None else None,
+                "overhead_s": round(cycle - crack, 2) if cycle is not None and crack is not None else None,
+                "submit_s": round(b["solved_at"] - b["fetched_at"], 2) if b["solved_at"] else None,
+            }
+            rows.append(row)
+            if row["cycle_s"] is not None and row["crack_s"] is not None:
+                cycles.append(cycle)
+                cracks.append(crack)
+                overheads.append(cycle - crack)
+        solved = sum(1 for r in rows if r["solved"])
+        last = max([b["solved_at"] for b in blocks if b["solved_at"]] or [now])
+        window = max(1e-9, (last if solved == len(blocks) and blocks else now) - (self.first_call or now))
+        return {
+            "elapsed_s": round(now - self.started, 1),
+            "window_s": round(window, 1),
+            "blocks_leased": len(blocks),
+            "blocks_solved": solved,
+            "blocks_per_hour": round(solved * 3600.0 / window, 1),
+            "cycle_s_mean": round(sum(cycles) / len(cycles), 2) if cycles else None,
+            "crack_s_mean": round(sum(cracks) / len(cracks), 2) if cracks else None,
+            "overhead_s_mean": round(sum(overheads) / len(overheads), 2) if overheads else None,
+            "overhead_s_p95": round(_pct(overheads, 0.95), 2) if overheads else None,
+            "overhead_pct": round(100.0 * sum(overheads) / sum(cycles), 1) if cycles and sum(cycles) > 0 else None,
+            "requests": counts,
+            "blocks": rows,
+        }
+
+    def summary(self):
+        st = {k: ("-" if v is None else v) for k, v in self.stats().items()}
+        lines = [
+            f"Blocks solved {st['blocks_solved']}/{st['blocks_leased']} in {st['window_s']}s from the first API call ({st['blocks_per_hour']} blocks/hour)",
+            f"Per block: cycle {st['cycle_s_mean']}s, crack {st['crack_s_mean']}s, "
+            f"overhead {st['overhead_s_mean']}s mean / {st['overhead_s_p95']}s p95 ({st['overhead_pct']}% of cycle)",
+            "Requests: " + ", ".join(f"{k} {v}" for k, v in st["requests"].items()),
+        ]
+        return "\n".join(lines)
+
+# ----------------------------------------------------------------------------------------------
+#  HTTP server
+# ----------------------------------------------------------------------------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    pool = None
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            sys.stderr.write("[mock_pool] " + (fmt % args) + "\n")
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        n = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(n) if n > 0 else b""
+        try:
+            return json.loads(raw.decode("utf-8") or "{}")
+        except ValueError:
+            return None
+
+    def _harness(self, url):
+        q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if url.path == "/_mock/stats":
+            return self._send(200, self.pool.stats())
+        try:
+            start = int(q.get("start", "0").replace("0x", ""), 16)
+            end = int(q.get("end", "0").replace("0x", ""), 16)
+        except ValueError:
+            return self._send(400, {"error": "start and end must be hex"})
+        if url.path == "/_mock/keys":
+            return self._send(200, {"keys": self.pool.keys_in(start, end)})
+        if url.path == "/_mock/done":
+            self.pool.crack_done(start, end)
+            return self._send(200, {"ok": True})
+        return self._send(404, {"error": "unknown mock endpoint"})
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.startswith("/_mock/"):
+            return self._harness(url)
+        if not self.headers.get("pool-token"):
+            return self._send(401, {"error": "Missing pool-token"})
+        fault = self.pool.fault()
+        if fault:
+            return self._send(fault[0], fault[2], fault[1])
+        status, body = self.pool.lease()
+        self._send(status, body)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        data = self._read_json()
+        if url.path.startswith("/_mock/"):
+            return self._harness(url)
+        if not url.path.rstrip("/").endswith("/submit"):
+            return self._send(404, {"error": "Not found"})
+        fault = self.pool.fault()
+        if fault:
+            return self._send(fault[0], fault[2], fault[1])
+        if data is None:
+            return self._send(400, {"error": "Invalid JSON"})
+        status, body = self.pool.submit(data)
+        self._send(status, body)
+
+def serve(pool, host="127.0.0.1", port=8787, verbose=False):
+    """Start the mock on a background thread; returns the server (server.server_address has the port)."""
+    handler = type("MockPoolHandler", (_Handler,), {"pool": pool})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.verbose = verbose
+    threading.Thread(target=server.serve_forever, name="mock-pool", daemon=True).start()
+    return server
+
+def add_fault_arguments(ap):
+    """Pool and fault options shared by mock_pool.py and bench_e2e.py."""
+    ap.add_argument("--blocks", type=int, default=10, help="blocks to hand out before answering 409 all blocks are solved")
+    ap.add_argument("--addresses", type=int, default=10, help="checkwork addresses per block")
+    ap.add_argument("--block-bits", type=int, default=40, help="block size as a power of two")
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="fraction of API calls answered with --status")
+    ap.add_argument("--status", type=int, default=503, help="HTTP status of injected failures (500, 502, 503, 429, ...)")
+    ap.add_argument("--retry-after", type=int, default=None, help="send Retry-After with injected failures and outages")
+    ap.add_argument("--latency-ms", type=float, default=0, help="delay added to every API call")
+    ap.add_argument("--jitter-ms", type=float, default=0, help="random extra delay up to this much")
+    ap.add_argument("--incompatible-rate", type=float, default=0.0, help="fraction of valid submissions answered incompatible")
+    ap.add_argument("--outage", default="", help="START:DURATION seconds after start during which every API call gets 503")
+    ap.add_argument("--no-block-id", action="store_true", help="do not send blockId with blocks")
+    ap.add_argument("--seed", type=int, default=None)
+
+def pool_from_args(args):
+    outage = None
+    if args.outage:
+        s, _, d = args.outage.partition(":")
+        outage = (float(s), float(d or 0))
+    return MockPool(blocks=args.blocks, addresses=args.addresses, block_bits=args.block_bits,
+                    fail_rate=args.fail_rate, status=args.status, retry_after=args.retry_after,
+                    latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, incompatible_rate=args.incompatible_rate,
+                    outage=outage, no_block_id=args.no_block_id, seed=args.seed)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Local mock of the pool API with fault injection.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8787)
+    ap.add_argument("--verbose", action="store_true", help="log every request")
+    add_fault_arguments(ap)
+    args = ap.parse_args(argv)
+    pool = pool_from_args(args)
+    server = serve(pool, args.host, args.port, args.verbose)
+    host, port = server.server_address[:2]
+    print(f"Mock pool on http://{host}:{port}/api/block ({args.blocks} blocks, {args.addresses} addresses each)", flush=True)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *a: stop.set())
+    try:
+        while not stop.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    server.shutdown()
+    print(pool.summary())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
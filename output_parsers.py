@@ -1,4 +1,7 @@
 import re
+import os
+import mmap
+import codecs
 
 def _is_hex64(s):
     try:
@@ -15,7 +18,312 @@ def _norm_hex(s):
         return t.upper()
     return None
 
+# ----------------------------------------------------------------------------------------------
+#  Single-pass engine: one small state machine per output format, shared by the batch parsers
+#  and StreamParser. Lines that cannot carry an address or a key are rejected with one or two
+#  substring/length checks, and hex tokens are validated with a precompiled pattern.
+# ----------------------------------------------------------------------------------------------
+
+_HEX64_RE = re.compile("[0-9a-fA-F]{64}")
+_NON_HEX_RE = re.compile("[^0-9a-fA-F]+")
+_HEX_RE = re.compile("[0-9a-fA-F]+")
+
+def _parser_kind(kind):
+    k = (kind or "").lower()
+    if k in FORMATS:
+        return k
+    if "bitcrack" in k:
+        return "bitcrack"
+    if "vanitysearch-v2" in k or "vanitysearch-v3" in k or k == "v2":
+        return "v2"
+    return "vanity"
+
+def _has_address(line):
+    return "Pub" in line and ("Pub Addr:" in line or "PubAddress:" in line or "Public Addr:" in line or "Public Address:" in line)
+
+def _address_of(line):
+    for token in ("Pub Addr:", "PubAddress:", "Public Addr:", "Public Address:"):
+        if token in line:
+            return line.split(token, 1)[1].strip()
+    return None
+
+def _hex_token(tok):
+    """_norm_hex for a single whitespace-free token."""
+    if len(tok) == 64:
+        return tok.upper() if _HEX64_RE.fullmatch(tok) else None
+    if "0x" in tok:
+        t = tok.replace("0x", "")
+        if len(t) == 64 and _HEX64_RE.fullmatch(t):
+            return t.upper()
+    return None
+
+def _priv_hex(tail):
+    """_norm_hex for the text after "Priv (HEX):"."""
+    t = tail.strip().replace(" ", "").replace("0x", "")
+    if len(t) == 64 and _HEX64_RE.fullmatch(t):
+        return t.upper()
+    return None
+
+class StreamParser:
+    """
+    Incremental parse_out: feed output text as the binary writes it and get back the
+    keys and additional-address hits completed so far. Only whole lines are parsed;
+    close() handles the trailing partial line and any wrapped key cut off at EOF.
+    The concatenated results of feed()/close() match parse_out() on the whole text.
+    """
+
+    def __init__(self, kind, extras):
+        self.kind = _parser_kind(kind)
+        self.extras_set = set([a for a in (extras or []) if isinstance(a, str)])
+        self.partial = ""
+        self.current_address = None
+        # vanitysearch-v2 may wrap a private key over several lines; those lines are held until 64 hex chars arrive.
+        self.wrap_buf = None
+        self.held = []
+        self.keys = []
+        self.found = []
+
+    def feed(self, text):
+        data = self.partial + (text or "")
+        cut = data.rfind("\n")
+        if cut < 0:
+            self.partial = data
+            return [], []
+        self.partial = data[cut + 1:]
+        self._run(data[:cut + 1].splitlines())
+        return self._drain()
+
+    def close(self):
+        if self.partial:
+            self._run(self.partial.splitlines())
+            self.partial = ""
+        # A wrapped key that never completed does not consume the lines after it.
+        while self.wrap_buf is not None:
+            held = self.held
+            self.wrap_buf = None
+            self.held = []
+            self._run(held)
+        return self._drain()
+
+    def _drain(self):
+        keys, found = self.keys, self.found
+        self.keys = []
+        self.found = []
+        return keys, found
+
+    def _run(self, lines):
+        FORMATS[self.kind]["run"](self, lines)
+
+    def _run_vanity(self, lines):
+        extras, keys, found = self.extras_set, self.keys, self.found
+        current = self.current_address
+        for line in lines:
+            if _has_address(line):
+                current = _address_of(line)
+            elif "Priv (HEX):" in line:
+                hx = _priv_hex(line.split("Priv (HEX):", 1)[1])
+                if hx and current:
+                    if current in extras:
+                        found.append((current, hx))
+                    else:
+                        keys.append(hx)
+                    current = None
+            elif len(line) >= 64:
+                parts = line.split(None, 2)
+                if len(parts) >= 2:
+                    hx = _hex_token(parts[1])
+                    if hx:
+                        if parts[0] in extras:
+                            found.append((parts[0], hx))
+                        else:
+                            keys.append(hx)
+                elif parts:
+                    hx = _hex_token(parts[0])
+                    if hx:
+                        keys.append(hx)
+        self.current_address = current
+
+    def _run_bitcrack(self, lines):
+        extras, keys, found = self.extras_set, self.keys, self.found
+        for line in lines:
+            if len(line) < 64:
+                continue
+            parts = line.split(None, 2)
+            if len(parts) >= 2:
+                hx = _hex_token(parts[1])
+                if hx:
+                    if parts[0] in extras:
+                        found.append((parts[0], hx))
+                    else:
+                        keys.append(hx)
+            elif parts:
+                hx = _hex_token(parts[0])
+                if hx:
+                    keys.append(hx)
+
+    def _run_v2(self, lines):
+        extras, keys, found = self.extras_set, self.keys, self.found
+        current = self.current_address
+        wrap, held = self.wrap_buf, self.held
+        for line in lines:
+            if wrap is not None:
+                held.append(line)
+                wrap += _NON_HEX_RE.sub("", line)
+                if len(wrap) < 64:
+                    continue
+                hx = wrap[:64].upper()
+                wrap = None
+                held = []
+                if current:
+                    if current in extras:
+                        found.append((current, hx))
+                    else:
+                        keys.append(hx)
+                    current = None
+            elif _has_address(line):
+                current = _address_of(line)
+            elif "Priv (HEX):" in line:
+                seg = line.split("Priv (HEX):", 1)[1].strip()
+                if len(seg) == 66 and seg.startswith("0x") and _HEX64_RE.fullmatch(seg, 2):
+                    buf = seg[2:]
+                else:
+                    buf = _NON_HEX_RE.sub("", seg.replace("0x", ""))
+                if len(buf) < 64:
+                    wrap = buf
+                    held = []
+                    continue
+                if current:
+                    hx = buf[:64].upper()
+                    if current in extras:
+                        found.append((current, hx))
+                    else:
+                        keys.append(hx)
+                    current = None
+            elif len(line) >= 64:
+                parts = line.split(None, 2)
+                if len(parts) >= 2:
+                    hx = _hex_token(parts[1])
+                    if hx:
+                        if parts[0] in extras:
+                            found.append((parts[0], hx))
+                        else:
+                            keys.append(hx)
+        self.current_address = current
+        self.wrap_buf, self.held = wrap, held
+
+# ----------------------------------------------------------------------------------------------
+#  Format registry: every output format names its StreamParser routine, the other formats that
+#  routine also reads correctly, and a probe that recognises a line only that format writes.
+#  detect_format() runs the probes over the first lines of an output file.
+# ----------------------------------------------------------------------------------------------
+
+FORMATS = {}
+# How much of an output file detect_format looks at.
+SNIFF_LINES = 200
+SNIFF_BYTES = 1 << 16
+
+def register_format(name, probe, run, reads=()):
+    """
+    Add (or replace) an output format. probe(line) returns True for a line that identifies
+    the format; run(parser, lines) consumes lines into parser.keys / parser.found, keeping any
+    state between calls on the StreamParser. reads names formats run parses just as well.
+    """
+    FORMATS[name] = {"probe": probe, "run": run, "reads": tuple(reads)}
+
+def _probe_vanity(line):
+    # "Priv (HEX): 0x<64 hex>" on one line.
+    return "Priv (HEX):" in line and _priv_hex(line.split("Priv (HEX):", 1)[1]) is not None
+
+def _probe_v2(line):
+    # VanitySearch-V2/V3 wraps the key: the "Priv (HEX):" line carries fewer than 64 digits.
+    if "Priv (HEX):" not in line:
+        return False
+    seg = line.split("Priv (HEX):", 1)[1].replace("0x", "")
+    return len(_NON_HEX_RE.sub("", seg)) < 64
+
+def _probe_bitcrack(line):
+    # "<address> <private key> <public key>" with a 33 or 65 byte public key.
+    parts = line.split()
+    return (len(parts) == 3 and len(parts[2]) in (66, 130) and _HEX_RE.fullmatch(parts[2]) is not None
+            and _hex_token(parts[1]) is not None)
+
+register_format("vanity", _probe_vanity, StreamParser._run_vanity, reads=("bitcrack",))
+register_format("v2", _probe_v2, StreamParser._run_v2, reads=("vanity", "bitcrack"))
+register_format("bitcrack", _probe_bitcrack, StreamParser._run_bitcrack)
+
+def detect_format(text, final=False):
+    """
+    Name of the registered format whose probe matches first in the first SNIFF_LINES
+    lines of text, or None. A trailing line without a newline is ignored unless final.
+    """
+    if not final:
+        text = text[:text.rfind("\n") + 1]
+    for line in text.splitlines()[:SNIFF_LINES]:
+        for name, fmt in FORMATS.items():
+            if fmt["probe"](line):
+                return name
+    return None
+
+def detect_format_file(path):
+    """detect_format over the first SNIFF_BYTES of a file."""
+    with open(path, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+        final = len(head) < SNIFF_BYTES
+    return detect_format(head.decode("utf-8", errors="replace"), final=final)
+
+def format_reads(kind, detected):
+    """True when the parser for kind handles output of the detected format."""
+    name = _parser_kind(kind)
+    return detected == name or detected in FORMATS[name]["reads"]
+
 def parse_vanity(text, extras):
+    return parse_out(text, "vanity", extras)
+
+def parse_vanity_v2(text, extras):
+    return parse_out(text, "v2", extras)
+
+def parse_bitcrack(text, extras):
+    return parse_out(text, "bitcrack", extras)
+
+def parse_out(text, kind, extras):
+    parser = StreamParser(kind, extras)
+    parser._run(text.splitlines())
+    return parser.close()
+
+# Bytes decoded and parsed at a time by parse_out_file.
+PARSE_WINDOW = 1 << 20
+
+def parse_out_file(path, kind, extras, window=PARSE_WINDOW):
+    """
+    parse_out over a file without loading it: the file is mmap'd and decoded one window
+    at a time, so memory stays flat however large the output grows.
+    """
+    parser = StreamParser(kind, extras)
+    keys = []
+    found = []
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = 0
+                while pos < size:
+                    end = min(size, pos + max(1, int(window)))
+                    k, fd = parser.feed(decoder.decode(mm[pos:end]))
+                    keys += k
+                    found += fd
+                    pos = end
+            k, fd = parser.feed(decoder.decode(b"", final=True))
+            keys += k
+            found += fd
+    k, fd = parser.close()
+    return keys + k, found + fd
+
+# ----------------------------------------------------------------------------------------------
+#  Reference parsers: the original line-by-line implementations.
+# ----------------------------------------------------------------------------------------------
+
+def _ref_parse_vanity(text, extras):
     extras_set = set([a for a in (extras or []) if isinstance(a, str)])
     keys_to_post = []
     found_pairs = []
@@ -60,7 +368,7 @@ def parse_vanity(text, extras):
                 keys_to_post.append(hx)
     return keys_to_post, found_pairs
 
-def parse_vanity_v2(text, extras):
+def _ref_parse_vanity_v2(text, extras):
     extras_set = set([a for a in (extras or []) if isinstance(a, str)])
     keys_to_post = []
     found_pairs = []
@@ -118,7 +426,7 @@ def parse_vanity_v2(text, extras):
         i += 1
     return keys_to_post, found_pairs
 
-def parse_bitcrack(text, extras):
+def _ref_parse_bitcrack(text, extras):
     extras_set = set([a for a in (extras or []) if isinstance(a, str)])
     keys_to_post = []
     found_pairs = []
@@ -138,10 +446,11 @@ def parse_bitcrack(text, extras):
                 keys_to_post.append(hx)
     return keys_to_post, found_pairs
 
-def parse_out(text, kind, extras):
+def parse_out_reference(text, kind, extras):
+    """Line-by-line reference implementation of parse_out, kept for differential checks."""
     k = (kind or "").lower()
     if "bitcrack" in k:
-        return parse_bitcrack(text, extras)
+        return _ref_parse_bitcrack(text, extras)
     if "vanitysearch-v2" in k or k == "v2":
-        return parse_vanity_v2(text, extras)
-    return parse_vanity(text, extras)
+        return _ref_parse_vanity_v2(text, extras)
+    return _ref_parse_vanity(text, extras)
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+PoolGuard: one retry policy shared by every call to the pool API.
+
+- Backoff: waits after failures double from `base` up to the caller's cap. Each wait is
+  randomised between half and all of that value, so rigs that failed together do not
+  retry together.
+- Circuit breaker: after `threshold` consecutive failures the circuit opens and calls
+  are refused without touching the network. After a cooldown (which also doubles, with
+  jitter, each time it reopens) it half-opens and lets `probes` requests through. A
+  success closes it; a failed probe opens it again. A probe slot that is never reported
+  back is released after `probe_timeout` seconds.
+- Retry-After: a 429/503 answer carrying Retry-After opens the circuit until that time,
+  whatever the failure count.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+def parse_retry_after(value, now=None):
+    """Seconds from now given by a Retry-After header (delta-seconds or HTTP date), or None."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    if not text:
+        return None
+    try:
+        return max(0.0, float(text))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(text).timestamp() - (now if now is not None else time.time()))
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+class PoolGuard:
+    def __init__(self, threshold=3, cooldown=15.0, max_cooldown=600.0, base=2.0, probes=1,
+                 max_retry_after=3600.0, probe_timeout=60.0, clock=time.time, rng=None):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.base = base
+        self.probes = probes
+        self.max_retry_after = max_retry_after
+        self.probe_timeout = probe_timeout
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0          # consecutive failed calls
+        self.opens = 0             # times opened since the last success
+        self.opened_total = 0
+        self.open_until = 0.0
+        self.in_flight_probes = 0
+        self.probe_started = 0.0
+        self.retry_after_until = 0.0
+        self.last_error = ""
+
+    def _jitter(self, value):
+        return value * self._rng.uniform(0.5, 1.0)
+
+    def _refresh(self, now):
+        if self.state == OPEN and now >= self.open_until:
+            self.state = HALF_OPEN
+            self.in_flight_probes = 0
+        elif self.state == HALF_OPEN and self.in_flight_probes and now - self.probe_started > self.probe_timeout:
+            self.in_flight_probes = 0
+
+    def _open(self, now, seconds):
+        self.state = OPEN
+        self.opens += 1
+        self.opened_total += 1
+        self.open_until = now + seconds
+        self.in_flight_probes = 0
+
+    def allow(self):
+        """True when a call may go out now; in half-open state this takes one of the probe slots."""
+        with self._lock:
+            now = self._clock()
+            self._refresh(now)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and self.in_flight_probes < self.probes:
+                self.in_flight_probes += 1
+                self.probe_started = now
+                return True
+            return False
+
+    def wait_time(self):
+        """Seconds until allow() can succeed (0 when it can now)."""
+        with self._lock:
+            now = self._clock()
+            self._refresh(now)
+            if self.state == OPEN:
+                return max(0.0, self.open_until - now)
+            if self.state == HALF_OPEN and self.in_flight_probes >= self.probes:
+                # A probe is out; its answer decides. Check back shortly.
+                return 1.0
+            return 0.0
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.opens = 0
+            self.in_flight_probes = 0
+            self.last_error = ""
+
+    def record_failure(self, error="", retry_after=None):
+        """Count a failed call (network error, 5xx, 429). retry_after is in seconds."""
+        with self._lock:
+            now = self._clock()
+            self._refresh(now)
+            self.failures += 1
+            self.last_error = str(error or "")[:120]
+            if retry_after is not None:
+                seconds = min(self.max_retry_after, max(0.0, float(retry_after)))
+                self.retry_after_until = now + seconds
+                self._open(now, seconds)
+            elif self.state == HALF_OPEN or self.failures >= self.threshold:
+                self._open(now, self._jitter(min(self.max_cooldown, self.cooldown * 2 ** self.opens)))
+
+    def backoff(self, cap):
+        """Jittered wait before retrying: doubles from base with each consecutive failure, never above cap."""
+        with self._lock:
+            n = self.failures
+        if n <= 0:
+            return self._jitter(cap)
+        return self._jitter(min(cap, self.base * 2 ** (n - 1)))
+
+    def retry_delay(self, cap):
+        """
+        Seconds to wait before the next call, at most cap: until the circuit lets a probe
+        through when it is open, else backoff(cap). Callers that wake before the circuit
+        half-opens are refused by allow() without a request being sent.
+        """
+        w = self.wait_time()
+        if w > 0:
+            return min(cap, w + self._rng.uniform(0.0, 1.0))
+        return self.backoff(cap)
+
+    def snapshot(self):
+        with self._lock:
+            now = self._clock()
+            self._refresh(now)
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "opened_total": self.opened_total,
+                "retry_in": round(max(0.0, self.open_until - now), 1) if self.state == OPEN else 0,
+                "retry_after": round(max(0.0, self.retry_after_until - now), 1),
+                "last_error": self.last_error,
+            }
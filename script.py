@@ -16,7 +16,17 @@ import re
 import uuid
 import hashlib
 import threading
-from output_parsers import parse_out
+import queue
+import codecs
+import concurrent.futures
+import multiprocessing
+import key_verifier
+import key_spool
+import filler_keys
+import http_client
+import pool_guard
+from key_queue import KeyJournal, KeyQueue
+from output_parsers import parse_out_file, StreamParser, PARSE_WINDOW, SNIFF_BYTES, detect_format, detect_format_file, format_reads
 from telegram_status import (
     configure_telegram,
     update_status as _tg_update_status,
@@ -54,6 +64,31 @@ SEND_ADDITIONAL_KEYS_TO_API = False
 ONE_SHOT = False
 POST_BLOCK_DELAY_SECONDS = 10
 POST_BLOCK_DELAY_ENABLED = True
+PREFETCH_ENABLED = False
+PREFETCH_AT_PERCENT = 90.0
+ASYNC_SUBMIT = False
+SUBMIT_RETRY_SECONDS = 30
+SUBMIT_MAX_ATTEMPTS = 3
+SUBMIT_CONCURRENCY = 1
+CHUNK_SCHEDULING = False
+CHUNK_LENGTH = ""
+CHUNKS_PER_GPU = 8
+AUTO_SHARE = True
+BLOCK_TARGET_SECONDS = 0
+BLOCK_LENGTH_MIN = ""
+BLOCK_LENGTH_MAX = ""
+GPU_LOOP_MODE = "rig"
+GPU_GROUPS = []
+BLOCK_JOURNAL_ENABLED = True
+LEASE_AHEAD = 0
+LEASE_MAX_AGE_SECONDS = 3600
+LIVE_PARSE = True
+EARLY_ABORT = True
+DETECT_OUTPUT_FORMAT = True
+VERIFY_KEYS = False
+KEY_SPOOL = False
+HTTP_POOL_SIZE = 10
+HTTP_CONNECT_TIMEOUT = 5.0
 
 TELEGRAM_STATE_FILE = "telegram_state.json"
 STATUS_MESSAGE_ID = None
@@ -63,6 +98,12 @@ def _apply_settings(s):
     global TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, API_URL, POOL_TOKEN, ADDITIONAL_ADDRESSES, BLOCK_LENGTH
     global APP_PATH, APP_ARGS, PROGRAM_KIND, WORKER_NAME, ONE_SHOT, GPU_INDEX_MAP
     global POST_BLOCK_DELAY_SECONDS, POST_BLOCK_DELAY_ENABLED, TELEGRAM_SHARE
+    global PREFETCH_ENABLED, PREFETCH_AT_PERCENT, ASYNC_SUBMIT, SUBMIT_RETRY_SECONDS, SUBMIT_MAX_ATTEMPTS
+    global SUBMIT_CONCURRENCY
+    global CHUNK_SCHEDULING, CHUNK_LENGTH, CHUNKS_PER_GPU, AUTO_SHARE
+    global BLOCK_TARGET_SECONDS, BLOCK_LENGTH_MIN, BLOCK_LENGTH_MAX, GPU_LOOP_MODE, GPU_GROUPS
+    global BLOCK_JOURNAL_ENABLED, LEASE_AHEAD, LEASE_MAX_AGE_SECONDS, LIVE_PARSE, EARLY_ABORT, DETECT_OUTPUT_FORMAT, VERIFY_KEYS
+    global KEY_SPOOL, HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT
     TELEGRAM_SHARE = bool(s.get("telegram_share", True))
     TELEGRAM_BOT_TOKEN = s.get("telegram_accesstoken", "")
     TELEGRAM_CHAT_ID = str(s.get("telegram_chatid", ""))
@@ -127,6 +168,64 @@ def _apply_settings(s):
             POST_BLOCK_DELAY_SECONDS = 10
     else:
         POST_BLOCK_DELAY_SECONDS = 0
+    PREFETCH_ENABLED = bool(s.get("prefetch_next_block", False))
+    try:
+        pct = float(s.get("prefetch_at_percent", 90))
+        PREFETCH_AT_PERCENT = min(100.0, max(0.0, pct))
+    except Exception:
+        PREFETCH_AT_PERCENT = 90.0
+    ASYNC_SUBMIT = bool(s.get("async_submit", False))
+    try:
+        SUBMIT_RETRY_SECONDS = max(1, int(s.get("submit_retry_seconds", 30)))
+    except Exception:
+        SUBMIT_RETRY_SECONDS = 30
+    try:
+        SUBMIT_MAX_ATTEMPTS = max(1, int(s.get("submit_max_attempts", 3)))
+    except Exception:
+        SUBMIT_MAX_ATTEMPTS = 3
+    try:
+        SUBMIT_CONCURRENCY = min(16, max(1, int(s.get("submit_concurrency", 1))))
+    except Exception:
+        SUBMIT_CONCURRENCY = 1
+    CHUNK_SCHEDULING = bool(s.get("chunk_scheduling", False))
+    CHUNK_LENGTH = str(s.get("chunk_length", "") or "")
+    try:
+        CHUNKS_PER_GPU = max(1, int(s.get("chunks_per_gpu", 8)))
+    except Exception:
+        CHUNKS_PER_GPU = 8
+    AUTO_SHARE = bool(s.get("auto_share", True))
+    try:
+        BLOCK_TARGET_SECONDS = max(0, int(float(s.get("block_target_minutes", 0) or 0) * 60))
+    except Exception:
+        BLOCK_TARGET_SECONDS = 0
+    BLOCK_LENGTH_MIN = str(s.get("block_length_min", "") or "")
+    BLOCK_LENGTH_MAX = str(s.get("block_length_max", "") or "")
+    GPU_LOOP_MODE = str(s.get("gpu_loop_mode", "rig") or "rig").strip().lower()
+    groups = s.get("gpu_groups", [])
+    GPU_GROUPS = groups if isinstance(groups, list) else []
+    BLOCK_JOURNAL_ENABLED = bool(s.get("block_journal", True))
+    LIVE_PARSE = bool(s.get("live_parse", True))
+    EARLY_ABORT = bool(s.get("early_abort", True))
+    DETECT_OUTPUT_FORMAT = bool(s.get("detect_output_format", True))
+    VERIFY_KEYS = bool(s.get("verify_keys", False))
+    KEY_SPOOL = bool(s.get("key_spool", False))
+    try:
+        HTTP_POOL_SIZE = min(100, max(1, int(s.get("http_pool_size", 10))))
+    except Exception:
+        HTTP_POOL_SIZE = 10
+    try:
+        HTTP_CONNECT_TIMEOUT = max(1.0, float(s.get("http_connect_timeout", 5)))
+    except Exception:
+        HTTP_CONNECT_TIMEOUT = 5.0
+    http_client.configure_http(HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT)
+    try:
+        LEASE_AHEAD = min(20, max(0, int(s.get("lease_ahead", 0))))
+    except Exception:
+        LEASE_AHEAD = 0
+    try:
+        LEASE_MAX_AGE_SECONDS = max(0, int(float(s.get("lease_max_age_minutes", 60)) * 60))
+    except Exception:
+        LEASE_MAX_AGE_SECONDS = 3600
 
 def refresh_settings():
     s = _load_settings()
@@ -147,16 +246,30 @@ except Exception:
 # Initialize colorama
 init(autoreset=True)
 
-PENDING_KEYS = []
+PENDING_KEYS = KeyQueue()
 previous_keyspace = None
 CURRENT_ADDR_COUNT = 10
 CURRENT_RANGE_START = None
 CURRENT_RANGE_END = None
+CURRENT_ADDRESSES = []
+CURRENT_BLOCK_ID = None
 PENDING_KEYS_FILE = "pending_keys.json"
+PENDING_KEYS_LOG = "pending_keys.log"
+QUARANTINE_FILE = "quarantined_keys.jsonl"
+KEY_SPOOL_FILE = "key_spool.db"
+SPOOL_RETRY_BLOCKS = 3
+SPOOL_MAX_ATTEMPTS = 3
+SPOOL_KEEP_DAYS = 30
 STATUS_FILE = "status.json"
+BLOCK_JOURNAL_FILE = "block_journal.json"
+BLOCK_QUEUE_FILE = "block_queue.json"
+SUBMIT_QUEUE_FILE = "submit_queue.json"
+SPEED_PROFILE_FILE = "gpu_speed_profile.json"
+SPEED_PROFILE_ALPHA = 0.3
 TELEGRAM_SHARE = True
 LAST_POST_ATTEMPT = 0
 ALL_BLOCKS_SOLVED = False
+ASYNC_SUBMIT_NO_ID_WARNED = False
 PROCESSED_ONE_BLOCK = False
 NEED_NEW_BLOCK_FETCH = False
 LAST_RUN_OK = False
@@ -436,21 +549,42 @@ STATUS = {
 }
 
 _SPEED_WRITE_TS = 0.0
+GPU_SPEEDS = {}
+GPU_SPEED_SAMPLES = {}
 
+# Matches: "2957.17 MK/s (...)" — number followed by G/M/K then K/s
+_PROGRESS_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([GMK])K/s", re.IGNORECASE)
 
-def _ingest_speed(value, unit):
-    """Parse a speed reading into Mkeys/s and throttle-write to status.json."""
+
+def _ingest_speed(value, unit, gid=None):
+    """Parse a speed reading into Mkeys/s and throttle-write to status.json.
+
+    With a gid the reading is stored per GPU and the status speed becomes the rig total.
+    """
     global _SPEED_WRITE_TS
     u = (unit or "M").upper()
     mk = value * 1000 if u == "G" else value / 1000 if u == "K" else value
-    STATUS["speed"] = round(mk, 2)
+    if gid is None:
+        STATUS["speed"] = round(mk, 2)
+    else:
+        # The first reading of a run is taken while the kernels ramp up; keep it out of the average.
+        if gid in GPU_SPEEDS:
+            acc = GPU_SPEED_SAMPLES.setdefault(gid, [0.0, 0])
+            acc[0] += mk
+            acc[1] += 1
+        GPU_SPEEDS[gid] = mk
+        STATUS["speed"] = round(sum(GPU_SPEEDS.values()), 2)
     now = time.time()
     if now - _SPEED_WRITE_TS >= 2.0:
         _SPEED_WRITE_TS = now
         _write_status_file()
+    return mk
 
 ERROR_COUNTS = {}
 
+def _on_main_thread():
+    return threading.current_thread() is threading.main_thread()
+
 def _record_error(category):
     try:
         c = int(ERROR_COUNTS.get(category, 0)) + 1
@@ -481,41 +615,63 @@ def notify_error(category, message, api_offline=False, sleep_seconds=0, rate_lim
             send_telegram_notification(f"❌ Error threshold reached in '{category}'. Resetting state.")
         except Exception:
             pass
-        try:
-            globals()["PENDING_KEYS"] = []
-            _save_pending_keys()
-        except Exception:
-            pass
-        try:
-            if os.path.exists(PENDING_KEYS_FILE):
-                os.remove(PENDING_KEYS_FILE)
-        except Exception:
-            pass
-        try:
-            clean_io_files()
-        except Exception:
-            pass
-        try:
-            globals()["NEED_NEW_BLOCK_FETCH"] = True
-        except Exception:
-            pass
+        _request_state_reset()
         return
 
+# A reset asked for on a background thread (a parallel post, the submission stage) is only
+# recorded there; the thread that owns the keys applies it once, see _take_reset_request().
+_RESET_REQUEST = threading.local()
+
+def _reset_pending_state():
+    """Drop the pending keys and the block's I/O files, and fetch a new block. Main thread only."""
+    try:
+        globals()["PENDING_KEYS"] = KeyQueue()
+        _save_pending_keys()
+    except Exception:
+        pass
+    try:
+        if os.path.exists(PENDING_KEYS_FILE):
+            os.remove(PENDING_KEYS_FILE)
+    except Exception:
+        pass
+    try:
+        clean_io_files()
+    except Exception:
+        pass
+    try:
+        globals()["NEED_NEW_BLOCK_FETCH"] = True
+    except Exception:
+        pass
+
+def _request_state_reset():
+    if _on_main_thread():
+        _reset_pending_state()
+    else:
+        _RESET_REQUEST.pending = True
+
+def _take_reset_request():
+    """True (once) if a post on this thread hit an error threshold since the last call."""
+    pending = getattr(_RESET_REQUEST, "pending", False)
+    _RESET_REQUEST.pending = False
+    return pending
+
+# pending_keys.json is a snapshot and pending_keys.log records every change made since, so
+# queueing or posting keys appends a few lines instead of rewriting the whole list.
+_PENDING_JOURNAL = KeyJournal(PENDING_KEYS_FILE, PENDING_KEYS_LOG)
+
 def _load_pending_keys():
     global PENDING_KEYS
     try:
-        if os.path.exists(PENDING_KEYS_FILE):
-            with open(PENDING_KEYS_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    PENDING_KEYS = data
+        PENDING_KEYS = _PENDING_JOURNAL.load()
+        _PENDING_JOURNAL.attach(PENDING_KEYS)
     except Exception:
         pass
 
 def _save_pending_keys():
+    """Changes to PENDING_KEYS are journaled as they happen; this only follows a rebinding."""
     try:
-        with open(PENDING_KEYS_FILE, "w", encoding="utf-8") as f:
-            json.dump(PENDING_KEYS, f)
+        if _PENDING_JOURNAL.queue is not PENDING_KEYS:
+            _PENDING_JOURNAL.attach(PENDING_KEYS)
     except Exception:
         pass
 
@@ -523,18 +679,22 @@ def _retry_pending_keys_now():
     global PENDING_KEYS, NEED_NEW_BLOCK_FETCH
     posted = False
     required = max(10, min(30, int(CURRENT_ADDR_COUNT or 10)))
+    _screen_block_keys(PENDING_KEYS, CURRENT_RANGE_START, CURRENT_RANGE_END, CURRENT_BLOCK_ID)
+    _verify_block_keys(PENDING_KEYS, CURRENT_ADDRESSES, CURRENT_BLOCK_ID)
     while len(PENDING_KEYS) >= required:
-        batch = PENDING_KEYS[:required]
+        batch = PENDING_KEYS.peek(required)
         _res = post_private_keys(batch)
         _ok = _res[0] if isinstance(_res, tuple) else bool(_res)
         _incomp = _res[1] if isinstance(_res, tuple) else False
         if _ok:
-            PENDING_KEYS = PENDING_KEYS[required:]
+            PENDING_KEYS.pop(required)
+            _spool_mark(batch, key_spool.POSTED, _current_block())
             posted = True
             _save_pending_keys()
         else:
             if _incomp:
-                PENDING_KEYS = []
+                _spool_mark(PENDING_KEYS.to_list(), key_spool.REJECTED, _current_block())
+                PENDING_KEYS = KeyQueue()
                 _save_pending_keys()
                 NEED_NEW_BLOCK_FETCH = True
                 break
@@ -544,17 +704,19 @@ def _retry_pending_keys_now():
     # If we have some keys but fewer than required, try filling with randoms in current range
     if not posted and LAST_RUN_OK and 0 < len(PENDING_KEYS) < required and CURRENT_RANGE_START and CURRENT_RANGE_END:
         fillers = _generate_filler_keys(required - len(PENDING_KEYS), CURRENT_RANGE_START, CURRENT_RANGE_END, exclude=PENDING_KEYS)
-        batch = PENDING_KEYS + fillers
+        batch = PENDING_KEYS.to_list() + fillers
         if len(batch) == required:
             _res = post_private_keys(batch)
             _ok = _res[0] if isinstance(_res, tuple) else bool(_res)
             _incomp = _res[1] if isinstance(_res, tuple) else False
             if _ok:
-                PENDING_KEYS = []
+                _spool_mark(PENDING_KEYS.to_list(), key_spool.POSTED, _current_block())
+                PENDING_KEYS = KeyQueue()
                 posted = True
                 _save_pending_keys()
             elif _incomp:
-                PENDING_KEYS = []
+                _spool_mark(PENDING_KEYS.to_list(), key_spool.REJECTED, _current_block())
+                PENDING_KEYS = KeyQueue()
                 _save_pending_keys()
                 NEED_NEW_BLOCK_FETCH = True
     return posted
@@ -571,58 +733,561 @@ def _scheduled_pending_post_retry():
         else:
             logger("Warning", "API unavailable. Keeping keys and retrying in 30s.")
 
-def flush_pending_keys_blocking():
-    global PENDING_KEYS, NEED_NEW_BLOCK_FETCH
+def _current_block():
+    """Snapshot of the block the main loop is working on, with PENDING_KEYS as its key list."""
+    return {
+        "id": CURRENT_BLOCK_ID,
+        "start": CURRENT_RANGE_START,
+        "end": CURRENT_RANGE_END,
+        "addr_count": CURRENT_ADDR_COUNT,
+        "addresses": CURRENT_ADDRESSES,
+        "run_ok": LAST_RUN_OK,
+        "keys": PENDING_KEYS,
+    }
+
+# ----------------------------------------------------------------------------------------------
+#  Key spool: with key_spool on, every found key is recorded in KEY_SPOOL_FILE with its block,
+#  GPU and submission state. Keys a block could not post are retried later instead of lost.
+# ----------------------------------------------------------------------------------------------
+
+_SPOOL = {"db": None, "failed": False}
+_SPOOL_LOCK = threading.Lock()
+_SPOOL_RETRY_LOCK = threading.Lock()
+# (start, end) of blocks a loop is still working on; their pending keys are not retried.
+_SPOOL_ACTIVE = set()
+
+def _spool():
+    if not KEY_SPOOL or _SPOOL["failed"]:
+        return None
+    with _SPOOL_LOCK:
+        if _SPOOL["db"] is None:
+            try:
+                base_dir = os.path.dirname(os.path.abspath(__file__))
+                db = key_spool.KeySpool(os.path.join(base_dir, KEY_SPOOL_FILE))
+                pruned = db.prune(SPOOL_KEEP_DAYS)
+                if pruned:
+                    logger("Info", f"Key spool: removed {pruned} settled key(s) older than {SPOOL_KEEP_DAYS} days.")
+                _SPOOL["db"] = db
+            except Exception as e:
+                _SPOOL["failed"] = True
+                logger("Error", f"Cannot open key spool '{KEY_SPOOL_FILE}': {e}. Continuing without it.")
+                return None
+        return _SPOOL["db"]
+
+def _spool_add(keys, block=None, path=None):
+    """Record newly found keys of block (the rig-wide block by default); path gives the GPU."""
+    db = _spool()
+    if db is None or not keys:
+        return
+    block = block or _current_block()
+    if not block.get("start"):
+        return
+    gid = _OUT_PATH_GPU.get(os.path.abspath(path)) if path else None
+    try:
+        db.add(keys, block, gid)
+    except Exception as e:
+        logger("Error", f"Key spool write failed: {e}")
+
+def _spool_mark(keys, state, block=None):
+    db = _spool()
+    if db is None or not keys:
+        return
+    try:
+        db.mark(list(keys), state, block if block and block.get("start") else None)
+    except Exception as e:
+        logger("Error", f"Key spool update failed: {e}")
+
+def _spool_status():
+    db = _spool()
+    if db is None:
+        return
+    try:
+        st = db.stats(1)
+        STATUS["key_spool"] = {
+            "pending": st["states"][key_spool.PENDING],
+            "posted": st["states"][key_spool.POSTED],
+            "found_last_hour": st["found"],
+            "posted_last_hour": st["posted"],
+        }
+    except Exception:
+        pass
+
+def _spool_discard_note():
+    return " They stay in the key spool and are retried later." if _spool() is not None else ""
+
+def _retry_spooled_blocks():
+    """
+    Post the pending keys of up to SPOOL_RETRY_BLOCKS earlier blocks, each against its own
+    range and id. Blocks still running are skipped, and blocks the pool gave no id are
+    expired rather than posted; keys still unposted after
+    SPOOL_MAX_ATTEMPTS retries expire. Returns the number of blocks tried.
+    """
+    db = _spool()
+    if db is None or _POOL_GUARD.wait_time() > 0 or not _SPOOL_RETRY_LOCK.acquire(blocking=False):
+        # While the breaker holds pool calls back a retry would only use up the keys' attempts.
+        return 0
+    try:
+        exclude = set(_SPOOL_ACTIVE)
+        if PENDING_KEYS and CURRENT_RANGE_START and CURRENT_RANGE_END:
+            exclude.add((CURRENT_RANGE_START, CURRENT_RANGE_END))
+        # Blocks waiting in the submission stage are posted there.
+        with _SUBMIT_SAVED_LOCK:
+            exclude.update((b.get("start"), b.get("end")) for b in _SUBMIT_SAVED)
+        try:
+            blocks = db.pending_blocks(exclude, SPOOL_RETRY_BLOCKS, SPOOL_MAX_ATTEMPTS)
+        except Exception as e:
+            logger("Error", f"Key spool read failed: {e}")
+            return 0
+        for b in blocks:
+            if not b.get("id"):
+                # Posted without an id the keys would be checked against whatever block is active now.
+                db.mark(b["keys"], key_spool.EXPIRED, b)
+                logger("Warning", f"Spooled block {b['start']}:{b['end']} has no block id; its {len(b['keys'])} key(s) cannot be retried and were expired.")
+                continue
+            b["keys"] = KeyQueue(b["keys"])
+            # Verified (or quarantined) before the first post; fillers are not added to old blocks.
+            b["addresses"] = None
+            b["run_ok"] = False
+            n = len(b["keys"])
+            logger("Info", f"Retrying {n} spooled key(s) from block {b['start']}:{b['end']}.")
+            posted, dropped = _flush_block_keys(b, 5, 1)
+            if posted and not dropped:
+                logger("Success", f"Posted {n - len(b['keys'])} spooled key(s) from block {b['start']}:{b['end']}.")
+        _spool_status()
+        return len(blocks)
+    finally:
+        _SPOOL_RETRY_LOCK.release()
+
+# ----------------------------------------------------------------------------------------------
+#  Key validation: keys outside the range that produced them are quarantined instead of posted,
+#  so one bad line does not turn a whole batch into an "incompatible privatekeys" rejection.
+# ----------------------------------------------------------------------------------------------
+
+_KEY_HEX_RE = re.compile(r"[0-9a-fA-F]{64}")
+_QUARANTINE_LOCK = threading.Lock()
+
+def _check_keys(keys, ranges, reason):
+    """Split keys into (good, bad); bad holds (key, reason). ranges are inclusive (start, end) ints."""
+    good = []
+    bad = []
+    for k in keys:
+        t = str(k).strip().replace("0x", "")
+        if not _KEY_HEX_RE.fullmatch(t):
+            bad.append((k, "malformed"))
+            continue
+        n = int(t, 16)
+        if any(s <= n <= e for s, e in ranges):
+            good.append(k)
+        else:
+            bad.append((k, reason))
+    return good, bad
+
+def _quarantine_keys(bad, context):
+    """Append rejected keys to QUARANTINE_FILE (one JSON object per line) and count them in status.json."""
+    if not bad:
+        return
+    now = datetime.now().isoformat(timespec="seconds")
+    try:
+        with _QUARANTINE_LOCK:
+            with open(QUARANTINE_FILE, "a", encoding="utf-8") as f:
+                for key, reason in bad:
+                    f.write(json.dumps(dict(context, ts=now, key=str(key), reason=reason)) + "\n")
+    except Exception as e:
+        logger("Error", f"Failed to write '{QUARANTINE_FILE}': {e}")
+    STATUS["quarantined_keys"] = int(STATUS.get("quarantined_keys", 0)) + len(bad)
+    _spool_mark([k for k, _r in bad], key_spool.QUARANTINED)
+    reasons = ", ".join(sorted(set(r for _k, r in bad)))
+    logger("Warning", f"Quarantined {len(bad)} key(s) from {context.get('source')} ({reasons}); see '{QUARANTINE_FILE}'.")
+    update_status_rl({"last_error": f"Quarantined {len(bad)} key(s): {reasons}"}, "keys_quarantined", 300)
+
+def _screen_output_keys(keys, path):
+    """Keys from one output file that lie in a segment its GPU was given this block; the rest are quarantined."""
+    segs = _OUT_PATH_SEGMENTS.get(os.path.abspath(path))
+    if not keys or not segs:
+        return keys
+    good, bad = _check_keys(keys, segs, "outside GPU segment")
+    _quarantine_keys(bad, {"source": _out_path_label(path), "file": os.path.basename(path)})
+    return good
+
+def _screen_block_keys(keys, start_hex, end_hex, block_id=None):
+    """Quarantine malformed keys and keys outside [start, end] before they are posted; keys is edited in place."""
+    try:
+        ranges = [(int(str(start_hex), 16), int(str(end_hex), 16))]
+    except Exception:
+        return
+    _good, bad = _check_keys(list(keys), ranges, "outside block")
+    if not bad:
+        return
+    keys.remove([k for k, _r in bad])
+    _quarantine_keys(bad, {"source": f"block {start_hex}:{end_hex}", "block_id": block_id})
+    _save_pending_keys()
+
+# Keys that already passed verification; posts are retried, the check is not.
+_VERIFIED_KEYS = set()
+
+def _verify_block_keys(keys, addresses, block_id=None):
+    """
+    With verify_keys, derive the address of every key and quarantine keys whose address is not
+    one of the block's checkwork addresses; keys is edited in place. Returns the number verified.
+    """
+    if not VERIFY_KEYS:
+        return 0
+    todo = [k for k in keys if k not in _VERIFIED_KEYS]
+    if not todo:
+        return 0
+    targets = key_verifier.address_targets(addresses)
+    if not targets:
+        logger("Warning", "verify_keys: block has no P2PKH checkwork addresses; keys not verified.")
+        return 0
+    t0 = time.time()
+    try:
+        matched, unmatched = key_verifier.verify_keys(todo, targets)
+    except Exception as e:
+        logger("Error", f"Key verification failed: {e}")
+        return 0
+    if unmatched:
+        keys.remove(unmatched)
+        _quarantine_keys([(k, "address mismatch") for k in unmatched], {"source": "verifier", "block_id": block_id})
+        _save_pending_keys()
+    if len(_VERIFIED_KEYS) > 100000:
+        _VERIFIED_KEYS.clear()
+    _VERIFIED_KEYS.update(matched)
+    STATUS["verified_keys"] = int(STATUS.get("verified_keys", 0)) + len(matched)
+    logger("Info", f"Verified {len(matched)}/{len(matched) + len(unmatched)} keys against checkwork addresses in {(time.time() - t0) * 1000:.0f} ms.")
+    return len(matched)
+
+# ----------------------------------------------------------------------------------------------
+#  Batch posting: per-batch latency, and concurrent posting of a block's batches.
+# ----------------------------------------------------------------------------------------------
+
+_BATCH_LATENCIES = []
+_BATCH_LATENCY_LOCK = threading.Lock()
+
+class _SubmitRetry:
+    """
+    Retry budget of one batch. Retrying stops once max_failures posts have failed and the
+    first failure is at least retry_seconds * (max_failures - 1) old, the time the fixed
+    waits used to take (60 s with the defaults), however short the backoff waits are.
+    Posts held back by the circuit breaker are not failures, and the budget never runs out
+    while the breaker is open or half-open: an outage keeps the keys until the pool is back.
+    """
+    def __init__(self, retry_seconds, max_failures):
+        self.max_failures = max(1, int(max_failures))
+        self.window = max(0.0, float(retry_seconds) * (self.max_failures - 1))
+        self.failures = 0
+        self.first_failure = None
+
+    def gave_up(self, refused=False):
+        """Count one unsuccessful post (refused = never sent); True when the batch should be dropped."""
+        if not refused:
+            self.failures += 1
+            if self.first_failure is None:
+                self.first_failure = time.time()
+        if _POOL_GUARD.snapshot()["state"] != pool_guard.CLOSED:
+            return False
+        return (self.failures >= self.max_failures
+                and time.time() - self.first_failure >= self.window)
+
+def _timed_post(batch, block_id):
+    """
+    post_private_keys() for one batch; returns (ok, incompatible, ms) and records the latency.
+    ms is None when the circuit breaker held the request back.
+    """
+    t0 = time.time()
+    _res = post_private_keys(batch, block_id)
+    if _res is None:
+        return False, False, None
+    ms = (time.time() - t0) * 1000
+    with _BATCH_LATENCY_LOCK:
+        _BATCH_LATENCIES.append(ms)
+        del _BATCH_LATENCIES[:-200]
+        recent = sorted(_BATCH_LATENCIES)
+    STATUS["batch_latency_ms"] = {
+        "last": round(ms),
+        "avg": round(sum(recent) / len(recent)),
+        "p95": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))]),
+    }
+    _ok = _res[0] if isinstance(_res, tuple) else bool(_res)
+    _incomp = _res[1] if isinstance(_res, tuple) else False
+    return _ok, _incomp, ms
+
+def _post_batch_with_retries(state, block, retry_seconds, max_failures):
+    """Post one batch until it is accepted, rejected as incompatible or its retry budget runs out."""
+    retry = _SubmitRetry(retry_seconds, max_failures)
+    while True:
+        ok, incomp, ms = _timed_post(state["keys"], block.get("id"))
+        if ms is not None:
+            state["attempts"] += 1
+            state["latencies"].append(ms)
+        if _take_reset_request():
+            # Handed back to the thread that called _post_batches_concurrently.
+            state["reset"] = True
+        if ok:
+            state["result"] = "posted"
+            return state
+        if incomp:
+            state["result"] = "incompatible"
+            return state
+        if state.get("reset") or retry.gave_up(ms is None) or NEED_NEW_BLOCK_FETCH:
+            state["result"] = "failed"
+            return state
+        time.sleep(_pool_retry_delay(retry_seconds))
+
+def _post_batches_concurrently(block, keys, required, retry_seconds, max_failures):
+    """
+    Post every full batch of keys with up to SUBMIT_CONCURRENCY requests in flight. Each batch
+    keeps its own retry budget; posted and incompatible batches leave keys together once all
+    requests are done. Returns (posted, dropped) like _flush_block_keys, where dropped means
+    some batch was rejected or gave up (the rest of keys is then discarded). An error-threshold
+    reset raised by any batch is applied once, on the calling thread.
+    """
+    pending = keys.peek(len(keys))
+    batches = [{"keys": pending[i:i + required], "attempts": 0, "latencies": [], "result": None}
+               for i in range(0, len(pending) - required + 1, required)]
+    workers = min(SUBMIT_CONCURRENCY, len(batches))
+    logger("Info", f"Posting {len(batches)} batches of {required} keys with {workers} parallel requests.")
+    t0 = time.time()
+    done = {"posted": 0, "incompatible": 0, "failed": 0}
+    settled = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = [ex.submit(_post_batch_with_retries, b, block, retry_seconds, max_failures) for b in batches]
+        for fut in concurrent.futures.as_completed(futures):
+            try:
+                b = fut.result()
+            except Exception as e:
+                logger("Error", f"Batch post error: {e}")
+                done["failed"] += 1
+                continue
+            done[b["result"]] += 1
+            if b["result"] == "posted":
+                settled.extend(b["keys"])
+                _spool_mark(b["keys"], key_spool.POSTED, block)
+            elif b["result"] == "incompatible":
+                settled.extend(b["keys"])
+                _spool_mark(b["keys"], key_spool.REJECTED, block)
+                logger("Warning", f"Dropped an incompatible batch of {len(b['keys'])} keys; other batches continue.")
+    if settled:
+        keys.remove(settled)
+        _persist_block_keys(block)
+    if any(b.get("reset") for b in batches):
+        _request_state_reset()
+    lat = sorted(ms for b in batches for ms in b["latencies"])
+    elapsed = time.time() - t0
+    if lat:
+        logger("Info", (f"Posted {done['posted']}/{len(batches)} batches in {elapsed:.1f}s "
+                        f"({done['incompatible']} incompatible, {done['failed']} failed); "
+                        f"latency avg {sum(lat) / len(lat):.0f} ms, max {lat[-1]:.0f} ms."))
+    STATUS["submit_last_batches"] = dict(done, batches=len(batches), seconds=round(elapsed, 1), concurrency=workers)
+    if done["posted"] and _on_main_thread():
+        try:
+            _clean_gpu_out_files()
+        except Exception:
+            pass
+    if done["failed"]:
+        logger("Warning", f"{done['failed']} batch(es) still failing after {_SubmitRetry(retry_seconds, max_failures).window:.0f}s. Clearing pending keys and moving on.{_spool_discard_note()}")
+    return done["posted"] > 0, bool(done["incompatible"] or done["failed"])
+
+def _flush_block_keys(block, retry_seconds=30, max_failures=3):
+    """
+    Post every batch of block["keys"] against that block's range and id.
+    The key list is consumed in place. Returns (posted, dropped); dropped means
+    the block's remaining keys were discarded (incompatible or too many failures).
+    """
+    keys = block["keys"]
     posted = False
-    required = max(10, min(30, int(CURRENT_ADDR_COUNT or 10)))
-    fail_count = 0
-    while len(PENDING_KEYS) >= required:
-        batch = PENDING_KEYS[:required]
-        _res = post_private_keys(batch)
-        _ok = _res[0] if isinstance(_res, tuple) else bool(_res)
-        _incomp = _res[1] if isinstance(_res, tuple) else False
+    required = max(10, min(30, int(block.get("addr_count") or 10)))
+    start_hex = block.get("start")
+    end_hex = block.get("end")
+    retry = _SubmitRetry(retry_seconds, max_failures)
+    # Only a reset raised by this block's own posts counts.
+    _take_reset_request()
+    _screen_block_keys(keys, start_hex, end_hex, block.get("id"))
+    if block.get("addresses") is not None:
+        _verify_block_keys(keys, block.get("addresses"), block.get("id"))
+    _persist_block_keys(block)
+    if SUBMIT_CONCURRENCY > 1 and len(keys) >= 2 * required:
+        posted, dropped = _post_batches_concurrently(block, keys, required, retry_seconds, max_failures)
+        if dropped or _take_reset_request():
+            keys.clear()
+            _persist_block_keys(block)
+            return posted, True
+    while len(keys) >= required:
+        batch = keys.peek(required)
+        _ok, _incomp, _ms = _timed_post(batch, block.get("id"))
+        if _take_reset_request():
+            # Error threshold on the submission stage: drop this block's keys, not the active block's.
+            keys.clear()
+            _persist_block_keys(block)
+            return posted, True
         if _ok:
-            PENDING_KEYS = PENDING_KEYS[required:]
+            keys.pop(required)
+            _spool_mark(batch, key_spool.POSTED, block)
             posted = True
-            fail_count = 0
-            _save_pending_keys()
+            retry = _SubmitRetry(retry_seconds, max_failures)
+            _persist_block_keys(block)
         else:
-            fail_count += 1
-            if _incomp or fail_count >= 3:
-                if not _incomp:
-                    logger("Warning", f"Post failed {fail_count} consecutive times. Clearing pending keys and moving on.")
-                PENDING_KEYS = []
-                _save_pending_keys()
-                NEED_NEW_BLOCK_FETCH = True
-                break
-            _save_pending_keys()
+            if _incomp or retry.gave_up(_ms is None):
+                if _incomp:
+                    _spool_mark(keys.to_list(), key_spool.REJECTED, block)
+                else:
+                    logger("Warning", f"Post failed {retry.failures} times over {retry.window:.0f}s. Clearing pending keys and moving on.{_spool_discard_note()}")
+                keys.clear()
+                _persist_block_keys(block)
+                return posted, True
             if NEED_NEW_BLOCK_FETCH:
                 break
-            time.sleep(30)
+            time.sleep(_pool_retry_delay(retry_seconds))
     # Try a final post with fillers if we have some keys but fewer than required
-    if not posted and LAST_RUN_OK and 0 < len(PENDING_KEYS) < required and CURRENT_RANGE_START and CURRENT_RANGE_END:
-        fillers = _generate_filler_keys(required - len(PENDING_KEYS), CURRENT_RANGE_START, CURRENT_RANGE_END, exclude=PENDING_KEYS)
-        batch = PENDING_KEYS + fillers
-        if len(batch) == required:
-            _res = post_private_keys(batch)
-            _ok = _res[0] if isinstance(_res, tuple) else bool(_res)
-            _incomp = _res[1] if isinstance(_res, tuple) else False
+    if not posted and block.get("run_ok") and 0 < len(keys) < required and start_hex and end_hex:
+        fillers = _generate_filler_keys(required - len(keys), start_hex, end_hex, exclude=keys)
+        batch = keys.to_list() + fillers
+        while len(batch) == required:
+            _ok, _incomp, _ms = _timed_post(batch, block.get("id"))
             if _ok:
-                PENDING_KEYS = []
+                _spool_mark(keys.to_list(), key_spool.POSTED, block)
+                keys.clear()
                 posted = True
-                _save_pending_keys()
-            else:
-                if _incomp:
-                    PENDING_KEYS = []
-                    _save_pending_keys()
-                    NEED_NEW_BLOCK_FETCH = True
-                else:
-                    if 'NEED_NEW_BLOCK_FETCH' in globals() and NEED_NEW_BLOCK_FETCH:
-                        pass
-                    else:
-                        time.sleep(30)
+                _persist_block_keys(block)
+                break
+            if _incomp:
+                _spool_mark(keys.to_list(), key_spool.REJECTED, block)
+                keys.clear()
+                _persist_block_keys(block)
+                return posted, True
+            if NEED_NEW_BLOCK_FETCH or retry.gave_up(_ms is None):
+                break
+            time.sleep(_pool_retry_delay(retry_seconds))
+    return posted, False
+
+def flush_pending_keys_blocking():
+    global NEED_NEW_BLOCK_FETCH
+    posted, dropped = _flush_block_keys(_current_block())
+    if dropped:
+        NEED_NEW_BLOCK_FETCH = True
     return posted
 
+# ----------------------------------------------------------------------------------------------
+#  Background submission stage: posts finished blocks' keys while the GPUs run the next block.
+# ----------------------------------------------------------------------------------------------
+
+_SUBMIT_QUEUE = queue.Queue()
+_SUBMIT_STATE = {"thread": None, "busy": False, "oldest_ts": None}
+# Blocks handed to the stage and not yet settled, mirrored to SUBMIT_QUEUE_FILE so a restart
+# does not lose their keys (the queue itself only lives in memory).
+_SUBMIT_SAVED = []
+_SUBMIT_SAVED_LOCK = threading.Lock()
+
+def _submit_queue_save_locked():
+    try:
+        data = {"blocks": [{
+            "id": b.get("id"), "start": b.get("start"), "end": b.get("end"),
+            "addr_count": b.get("addr_count"), "addresses": b.get("addresses"),
+            "run_ok": b.get("run_ok"), "finished_ts": b.get("finished_ts"),
+            "keys": b["keys"].to_list(),
+        } for b in _SUBMIT_SAVED]}
+        tmp = SUBMIT_QUEUE_FILE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, SUBMIT_QUEUE_FILE)
+    except Exception:
+        pass
+
+def _persist_block_keys(block):
+    """
+    Record what is left of a block's keys after a post: blocks owned by the submission stage are
+    mirrored to SUBMIT_QUEUE_FILE, the active block's keys are journaled with PENDING_KEYS.
+    """
+    if block.get("queued"):
+        with _SUBMIT_SAVED_LOCK:
+            if block in _SUBMIT_SAVED:
+                _submit_queue_save_locked()
+    else:
+        _save_pending_keys()
+
+def _submit_queue_load():
+    """Queue again the blocks a previous run had not finished submitting."""
+    try:
+        if not os.path.exists(SUBMIT_QUEUE_FILE):
+            return
+        with open(SUBMIT_QUEUE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        blocks = [b for b in (data.get("blocks") or []) if isinstance(b, dict) and b.get("keys")]
+    except Exception:
+        return
+    for b in blocks:
+        # The mirror is rewritten after every posted batch, so only keys the pool has not accepted are left.
+        b["keys"] = KeyQueue(b["keys"])
+        _enqueue_submission(b, b.get("finished_ts"))
+    if blocks:
+        logger("Info", f"Re-queued {len(blocks)} block(s) from '{SUBMIT_QUEUE_FILE}' for submission.")
+
+def _submit_status_fields():
+    depth = _SUBMIT_QUEUE.qsize() + (1 if _SUBMIT_STATE["busy"] else 0)
+    lag = 0
+    if _SUBMIT_STATE["oldest_ts"]:
+        lag = int(max(0, time.time() - _SUBMIT_STATE["oldest_ts"]))
+    return {"submit_queue_depth": depth, "submit_lag": lag}
+
+def _submission_worker():
+    while True:
+        block = _SUBMIT_QUEUE.get()
+        _SUBMIT_STATE["busy"] = True
+        _SUBMIT_STATE["oldest_ts"] = block.get("finished_ts") or time.time()
+        try:
+            # Each block carries its own KeyQueue; PENDING_KEYS stays with the block on the GPUs.
+            update_status(dict(_submit_status_fields(), pending_keys=len(PENDING_KEYS) + len(block["keys"])))
+            posted, dropped = _flush_block_keys(block, SUBMIT_RETRY_SECONDS, SUBMIT_MAX_ATTEMPTS)
+            lag = time.time() - _SUBMIT_STATE["oldest_ts"]
+            if dropped:
+                logger("Warning", f"Block {block.get('start')}:{block.get('end')} keys dropped after submission errors.")
+            elif block["keys"]:
+                logger("Warning", f"Discarding {len(block['keys'])} unposted keys from block {block.get('start')}:{block.get('end')}.{_spool_discard_note()}")
+                block["keys"].clear()
+            elif posted:
+                logger("Success", f"Block {block.get('start')}:{block.get('end')} submitted {lag:.1f}s after it finished.")
+            STATUS["submit_last_lag"] = round(lag, 1)
+            _spool_status()
+        except Exception as e:
+            logger("Error", f"Submission stage error: {e}")
+        finally:
+            with _SUBMIT_SAVED_LOCK:
+                if block in _SUBMIT_SAVED:
+                    _SUBMIT_SAVED.remove(block)
+                _submit_queue_save_locked()
+            _SUBMIT_STATE["busy"] = False
+            _SUBMIT_STATE["oldest_ts"] = None
+            _SUBMIT_QUEUE.task_done()
+            try:
+                update_status(dict(_submit_status_fields(), pending_keys=len(PENDING_KEYS)))
+            except Exception:
+                pass
+
+def _submission_idle():
+    return not _SUBMIT_STATE["busy"] and _SUBMIT_QUEUE.empty()
+
+def _enqueue_submission(block, finished_ts=None):
+    """Hand a finished block (with its own key list) to the background submission stage."""
+    if _SUBMIT_STATE["thread"] is None:
+        t = threading.Thread(target=_submission_worker, daemon=True)
+        _SUBMIT_STATE["thread"] = t
+        t.start()
+    block["finished_ts"] = finished_ts or time.time()
+    block["queued"] = True
+    with _SUBMIT_SAVED_LOCK:
+        _SUBMIT_SAVED.append(block)
+        _submit_queue_save_locked()
+    _SUBMIT_QUEUE.put(block)
+    update_status(_submit_status_fields())
+
+def _drain_submissions():
+    if _SUBMIT_STATE["thread"] is None:
+        return
+    if not _submission_idle():
+        logger("Info", "Waiting for queued key submissions to finish...")
+    _SUBMIT_QUEUE.join()
+
 def handle_next_block_immediately():
     refresh_settings()
     data = fetch_block_data()
@@ -637,10 +1302,12 @@ def handle_next_block_immediately():
     previous_keyspace = keyspace
     # Track current dynamic requirements
     try:
-        global CURRENT_ADDR_COUNT, CURRENT_RANGE_START, CURRENT_RANGE_END
+        global CURRENT_ADDR_COUNT, CURRENT_RANGE_START, CURRENT_RANGE_END, CURRENT_BLOCK_ID, CURRENT_ADDRESSES
         CURRENT_ADDR_COUNT = int(len(addresses) or 10)
+        CURRENT_ADDRESSES = list(addresses)
         CURRENT_RANGE_START = start_hex
         CURRENT_RANGE_END = end_hex
+        CURRENT_BLOCK_ID = _block_id_of(data)
     except Exception:
         pass
     save_addresses_to_in_file(addresses, ADDITIONAL_ADDRESSES)
@@ -711,7 +1378,7 @@ def _ensure_status_message(initial_text):
                 "disable_web_page_preview": True,
             }
             try:
-                r = requests.post(telegram_url, data=payload, timeout=10)
+                r = http_client.post(telegram_url, data=payload, timeout=10)
                 if r.status_code == 200:
                     js = {}
                     try:
@@ -737,7 +1404,7 @@ def _ensure_status_message(initial_text):
                     logger("Error", f"Error creating Telegram status message: {r.status_code} {snip}")
                     try:
                         plain = re.sub(r"<[^>]+>", "", initial_text)
-                        r2 = requests.post(telegram_url, data={
+                        r2 = http_client.post(telegram_url, data={
                             "chat_id": str(TELEGRAM_CHAT_ID),
                             "text": plain,
                             "disable_web_page_preview": True,
@@ -795,7 +1462,7 @@ def edit_telegram_status(message):
         "disable_web_page_preview": True,
     }
     try:
-        r = requests.post(edit_url, data=payload, timeout=10)
+        r = http_client.post(edit_url, data=payload, timeout=10)
         if r.status_code == 200:
             try:
                 st[f"{key}::last_hash"] = new_hash
@@ -870,16 +1537,29 @@ def _format_duration(seconds):
         parts.append(f"{s} sec" + ("s" if s != 1 else ""))
     return " ".join(parts)
 
+_STATUS_FILE_LOCK = threading.Lock()
+
 def _write_status_file():
     try:
         data = dict(STATUS)
         data["updated_at"] = datetime.now().isoformat()
         data["telegram_share"] = TELEGRAM_SHARE
-        with open(STATUS_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, default=str)
+        data["http"] = _http_status()
+        data["pool_api"] = _POOL_GUARD.snapshot()
+        with _STATUS_FILE_LOCK:
+            with open(STATUS_FILE, "w", encoding="utf-8") as f:
+                json.dump(data, f, default=str)
     except Exception:
         pass
 
+def _http_status():
+    """Connection reuse of the shared HTTP client, for status.json."""
+    try:
+        st = http_client.http_stats()
+        return {k: st[k] for k in ("requests", "connections", "reused", "reuse_pct", "errors")}
+    except Exception:
+        return {}
+
 def update_status(fields=None):
     _tg_update_status(STATUS, fields or {}, gpu_fallback="-")
     _write_status_file()
@@ -900,16 +1580,62 @@ LAST_TELEGRAM_TS = {}
 def send_telegram_notification_rl(message, category, min_interval):
     _tg_send_rl(message, category, min_interval)
 
-def fetch_block_data():
+# ----------------------------------------------------------------------------------------------
+#  Pool API resilience: every fetch and submit goes through one backoff / circuit breaker policy.
+# ----------------------------------------------------------------------------------------------
+
+_POOL_GUARD = pool_guard.PoolGuard()
+
+def _pool_allowed(what):
+    """False (after a rate-limited log line) while the circuit breaker holds pool calls back."""
+    if _POOL_GUARD.allow():
+        return True
+    wait = _POOL_GUARD.wait_time()
+    update_status_rl({"last_error": f"Pool API paused ({_POOL_GUARD.state}), retry in {wait:.0f}s"}, "pool_circuit_open", 60)
+    logger("Warning", f"Pool API circuit {_POOL_GUARD.state}; skipping {what}. Next attempt in {wait:.0f}s.")
+    return False
+
+def _pool_record(response=None, error=None):
+    """Feed the outcome of a pool call to the breaker: network errors, 5xx and 429 count as failures."""
+    if error is not None:
+        _POOL_GUARD.record_failure(type(error).__name__)
+        return
+    code = response.status_code
+    if code == 429 or code >= 500:
+        retry_after = None
+        if code in (429, 503):
+            retry_after = pool_guard.parse_retry_after(response.headers.get("Retry-After"))
+        _POOL_GUARD.record_failure(f"HTTP {code}", retry_after)
+        if retry_after is not None:
+            logger("Warning", f"Pool API asked to retry after {retry_after:.0f}s (HTTP {code}).")
+    else:
+        _POOL_GUARD.record_success()
+
+def _pool_retry_delay(cap):
+    """Seconds to wait before the next pool call: exponential backoff with jitter up to cap, or until the breaker half-opens."""
+    return _POOL_GUARD.retry_delay(cap)
+
+def fetch_block_data(lease=False, loop=None):
     """
     Fetch the work block from API and notify via Telegram on failure.
+    With lease=True (the lease-ahead worker) "all blocks are solved" only stops leasing; the
+    main loop still runs the queued blocks and ends on its own fetch. loop names the
+    independent block loop asking, so the block length follows that loop's speed.
     """
     headers = {"pool-token": POOL_TOKEN, "ngrok-skip-browser-warning": "true", "User-Agent": "unitead-gpu-script/1.0"}
+    if not _pool_allowed("block fetch"):
+        return None
     
     try:
         logger("Info", f"Fetching data from {API_URL}")
-        params = {"length": BLOCK_LENGTH} if BLOCK_LENGTH else None
-        response = requests.get(API_URL, headers=headers, params=params, timeout=15)
+        length = _block_length_param(loop)
+        params = {"length": length} if length else None
+        try:
+            response = http_client.get(API_URL, headers=headers, params=params, timeout=15)
+        except requests.RequestException as e:
+            _pool_record(error=e)
+            raise
+        _pool_record(response)
         if response.status_code == 200:
             return response.json()
         if response.status_code == 409:
@@ -919,6 +1645,10 @@ def fetch_block_data():
                 data = {"error": (response.text or "").strip()}
             msg = str(data.get("error", "")).strip()
             if msg.lower() == "all blocks are solved":
+                if lease:
+                    _LEASE["exhausted"] = True
+                    logger("Info", "Pool has no more blocks to lease; working off the queued ones.")
+                    return None
                 global ALL_BLOCKS_SOLVED
                 ALL_BLOCKS_SOLVED = True
                 update_status({"all_blocks_solved": True, "next_fetch_in": 0})
@@ -927,7 +1657,7 @@ def fetch_block_data():
             update_status_rl({"last_error": f"No range available: `{msg or 'No available random range'}`"}, "no_range", 300)
             logger("Error", f"Error fetching block: 409 - {response.text}")
             return None
-        if 500 <= response.status_code <= 599:
+        if 500 <= response.status_code <= 599 or response.status_code == 429:
             notify_error("api_offline", f"API offline `{response.status_code}`", api_offline=True, sleep_seconds=0, rate_limit=300)
             return None
         notify_error("api_fetch_error", f"API error `{response.status_code}`", api_offline=False, sleep_seconds=0, rate_limit=300)
@@ -936,50 +1666,281 @@ def fetch_block_data():
         notify_error("api_offline", f"API connection error `{type(e).__name__}`", api_offline=True, sleep_seconds=0, rate_limit=300)
         return None
 
+def _block_id_of(data):
+    """Return the pool's identifier for a leased block, or None when the API does not send one."""
+    try:
+        for k in ("blockId", "block_id", "id"):
+            v = (data or {}).get(k)
+            if v is not None and str(v).strip():
+                return str(v).strip()
+    except Exception:
+        pass
+    return None
+
+# ----------------------------------------------------------------------------------------------
+#  Block prefetch: lease the next block in the background while the GPUs finish the current one.
 # ----------------------------------------------------------------------------------------------
 
-def post_private_keys(private_keys):
-    headers = {
-        "pool-token": POOL_TOKEN,
-        "Content-Type": "application/json",
-        "ngrok-skip-browser-warning": "true",
-        "User-Agent": "unitead-gpu-script/1.0"
-    }
-    data = {"privateKeys": private_keys}
-    logger("Info", f"Posting batch of {len(private_keys)} private keys to API.")
-    
+_PREFETCH = {"thread": None, "data": None, "fetch_seconds": 0.0}
+_PREFETCH_NO_ID_WARNED = False
+PREFETCH_SAVED_TOTAL = 0.0
+
+def _prefetch_worker():
+    t0 = time.time()
+    data = None
     try:
-        url = API_URL+"/submit"
-        response = requests.post(url, headers=headers, json=data, timeout=10)
-        if response.status_code == 200:
-            logger("Success", "Private keys posted successfully.")
-            update_status({"last_batch": f"Sent {len(private_keys)} keys"})
-            try:
-                _clean_gpu_out_files()
-            except Exception:
-                pass
-            try:
-                globals()["POST_ERROR_CONSECUTIVE"] = 0
-            except Exception:
-                pass
-            return (True, False)
-        else:
-            txt = ""
-            try:
-                txt = (response.text or "").strip()
-            except Exception:
-                txt = ""
-            msg = txt.lower()
-            is_incompatible = (
-                ("incompatible privatekeys" in msg) or
-                ("incompatible private keys" in msg) or
-                ("not all private keys are correct" in msg)
-            )
-            is_no_target_block = (
-                ("no target block found" in msg) or
-                ("provide blockid or have an active block" in msg)
-            )
-            if not is_incompatible:
+        data = fetch_block_data()
+    except Exception:
+        data = None
+    _PREFETCH["fetch_seconds"] = time.time() - t0
+    _PREFETCH["data"] = data
+    if data:
+        logger("Info", f"Next block leased in background ({_PREFETCH['fetch_seconds']:.1f}s round trip).")
+
+def _start_prefetch():
+    if _PREFETCH["thread"] is not None or _PREFETCH["data"] is not None:
+        return False
+    t = threading.Thread(target=_prefetch_worker, daemon=True)
+    _PREFETCH["thread"] = t
+    t.start()
+    return True
+
+def _prefetch_watch(block_size, started_ts, done_event):
+    """Start the background lease once the estimated completion reaches PREFETCH_AT_PERCENT."""
+    target = PREFETCH_AT_PERCENT / 100.0
+    if target <= 0:
+        _start_prefetch()
+        return
+    while not done_event.wait(1.0):
+        try:
+            speed = float(STATUS.get("speed") or 0)
+        except Exception:
+            speed = 0.0
+        if speed <= 0 or block_size <= 0:
+            continue
+        done = (time.time() - started_ts) * speed * 1e6 / block_size
+        if done >= target:
+            _start_prefetch()
+            return
+
+def _prefetch_applies():
+    # The lease-ahead queue already keeps the next blocks ready.
+    return PREFETCH_ENABLED and not ONE_SHOT and LEASE_AHEAD <= 0
+
+def _prefetch_pending():
+    """True while a prefetched block is being leased or waits to be taken."""
+    return _PREFETCH.get("thread") is not None or _PREFETCH.get("data") is not None
+
+def _arm_prefetch(block_size):
+    """
+    Arm the prefetcher for the block about to run. Returns an Event the caller sets
+    when the run ends, or None when prefetch does not apply to this block.
+    """
+    global _PREFETCH_NO_ID_WARNED
+    if not _prefetch_applies():
+        return None
+    if not CURRENT_BLOCK_ID:
+        if not _PREFETCH_NO_ID_WARNED:
+            _PREFETCH_NO_ID_WARNED = True
+            logger("Warning", "Pool did not return a block id; prefetch disabled so submissions stay tied to the active block.")
+        return None
+    done = threading.Event()
+    t = threading.Thread(target=_prefetch_watch, args=(block_size, time.time(), done), daemon=True)
+    t.start()
+    return done
+
+def _take_prefetched_block():
+    """
+    Return (block_data, saved_seconds) for a block leased in the background, or None.
+    saved_seconds is the part of the API round trip that overlapped with GPU work.
+    """
+    t = _PREFETCH.get("thread")
+    if t is None and _PREFETCH.get("data") is None:
+        return None
+    waited = 0.0
+    if t is not None:
+        w0 = time.time()
+        t.join(timeout=20)
+        waited = time.time() - w0
+    data = _PREFETCH.get("data")
+    fetch_seconds = float(_PREFETCH.get("fetch_seconds") or 0.0)
+    _PREFETCH["thread"] = None
+    _PREFETCH["data"] = None
+    _PREFETCH["fetch_seconds"] = 0.0
+    if not data:
+        return None
+    return data, max(0.0, fetch_seconds - waited)
+
+# ----------------------------------------------------------------------------------------------
+#  Lease-ahead queue: blocks leased before they are needed, kept on disk across restarts.
+# ----------------------------------------------------------------------------------------------
+
+_LEASE = {"thread": None, "blocks": [], "wake": threading.Event(), "no_id": False, "exhausted": False}
+_LEASE_LOCK = threading.Lock()
+
+def _lease_save_locked():
+    try:
+        tmp = BLOCK_QUEUE_FILE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"blocks": _LEASE["blocks"]}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, BLOCK_QUEUE_FILE)
+    except Exception:
+        pass
+
+def _lease_status():
+    with _LEASE_LOCK:
+        depth = len(_LEASE["blocks"])
+        oldest = min([b.get("leased_at", 0) for b in _LEASE["blocks"]] or [0])
+    STATUS["lease_queue_depth"] = depth
+    STATUS["lease_queue_oldest"] = round(time.time() - oldest, 1) if oldest else 0
+    _write_status_file()
+
+def _lease_expired_locked():
+    """Drop leases older than lease_max_age_minutes; the pool has likely handed those ranges out again."""
+    if LEASE_MAX_AGE_SECONDS <= 0:
+        return 0
+    cutoff = time.time() - LEASE_MAX_AGE_SECONDS
+    fresh = [b for b in _LEASE["blocks"] if float(b.get("leased_at") or 0) >= cutoff]
+    dropped = len(_LEASE["blocks"]) - len(fresh)
+    if dropped:
+        _LEASE["blocks"] = fresh
+        _lease_save_locked()
+    return dropped
+
+def _lease_load():
+    """Pick up blocks leased by a previous run; they are worked off before anything new is fetched."""
+    try:
+        if not os.path.exists(BLOCK_QUEUE_FILE):
+            return
+        with open(BLOCK_QUEUE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        blocks = [b for b in (data.get("blocks") or []) if isinstance(b, dict) and isinstance(b.get("block"), dict)]
+        with _LEASE_LOCK:
+            _LEASE["blocks"] = blocks
+            dropped = _lease_expired_locked()
+            blocks = _LEASE["blocks"]
+        if dropped:
+            logger("Warning", f"Dropped {dropped} leased block(s) older than {LEASE_MAX_AGE_SECONDS // 60} minutes from '{BLOCK_QUEUE_FILE}'.")
+        if blocks:
+            logger("Info", f"Loaded {len(blocks)} leased block(s) from '{BLOCK_QUEUE_FILE}'.")
+    except Exception:
+        pass
+    _lease_status()
+
+def _lease_worker():
+    while not ALL_BLOCKS_SOLVED and not ONE_SHOT and not _LEASE["exhausted"]:
+        with _LEASE_LOCK:
+            depth = len(_LEASE["blocks"])
+        if LEASE_AHEAD <= 0 or depth >= LEASE_AHEAD or _LEASE["no_id"]:
+            _LEASE["wake"].wait(5)
+            _LEASE["wake"].clear()
+            continue
+        try:
+            data = fetch_block_data(lease=True)
+        except Exception:
+            data = None
+        if _LEASE["exhausted"]:
+            break
+        if not data:
+            # Pool unreachable or out of ranges: GPUs keep working from the queue, retry later.
+            _LEASE["wake"].wait(_pool_retry_delay(30))
+            _LEASE["wake"].clear()
+            continue
+        if not _block_id_of(data):
+            # Without ids the pool only tracks one active block; this lease is kept but no more are taken.
+            _LEASE["no_id"] = True
+            logger("Warning", "Pool did not return a block id; leasing ahead disabled so submissions stay tied to the active block.")
+        with _LEASE_LOCK:
+            _LEASE["blocks"].append({"block": data, "leased_at": time.time()})
+            _lease_save_locked()
+            depth = len(_LEASE["blocks"])
+        logger("Info", f"Leased block ahead ({depth}/{LEASE_AHEAD} queued).")
+        _lease_status()
+
+def _start_lease_keeper():
+    if LEASE_AHEAD <= 0 or ONE_SHOT or _LEASE["thread"] is not None:
+        return
+    t = threading.Thread(target=_lease_worker, daemon=True)
+    _LEASE["thread"] = t
+    t.start()
+
+def _take_leased_block():
+    """Pop the oldest leased block, or None when the queue is empty."""
+    with _LEASE_LOCK:
+        dropped = _lease_expired_locked()
+        item = _LEASE["blocks"].pop(0) if _LEASE["blocks"] else None
+        if item is not None:
+            _lease_save_locked()
+    if dropped:
+        logger("Warning", f"Dropped {dropped} leased block(s) older than {LEASE_MAX_AGE_SECONDS // 60} minutes.")
+    if item is None and not dropped:
+        return None
+    _LEASE["wake"].set()
+    _lease_status()
+    return item.get("block") if item is not None else None
+
+# ----------------------------------------------------------------------------------------------
+
+def post_private_keys(private_keys, block_id=None):
+    """
+    Post one batch. Returns (posted, incompatible), or None when the circuit breaker held the
+    request back; nothing was sent then, so it is not a failed attempt.
+    """
+    headers = {
+        "pool-token": POOL_TOKEN,
+        "Content-Type": "application/json",
+        "ngrok-skip-browser-warning": "true",
+        "User-Agent": "unitead-gpu-script/1.0"
+    }
+    data = {"privateKeys": private_keys}
+    # Tie the batch to the block it came from; needed once another block is already leased.
+    bid = block_id if block_id is not None else CURRENT_BLOCK_ID
+    if bid:
+        data["blockId"] = bid
+    if not _pool_allowed("key submission"):
+        return None
+    logger("Info", f"Posting batch of {len(private_keys)} private keys to API.")
+    
+    try:
+        url = API_URL+"/submit"
+        try:
+            response = http_client.post(url, headers=headers, json=data, timeout=10)
+        except requests.RequestException as e:
+            _pool_record(error=e)
+            raise
+        _pool_record(response)
+        if response.status_code == 200:
+            logger("Success", "Private keys posted successfully.")
+            update_status({"last_batch": f"Sent {len(private_keys)} keys"})
+            if _on_main_thread():
+                try:
+                    _clean_gpu_out_files()
+                except Exception:
+                    pass
+            try:
+                globals()["POST_ERROR_CONSECUTIVE"] = 0
+            except Exception:
+                pass
+            return (True, False)
+        else:
+            txt = ""
+            try:
+                txt = (response.text or "").strip()
+            except Exception:
+                txt = ""
+            msg = txt.lower()
+            is_incompatible = (
+                ("incompatible privatekeys" in msg) or
+                ("incompatible private keys" in msg) or
+                ("not all private keys are correct" in msg)
+            )
+            is_no_target_block = (
+                ("no target block found" in msg) or
+                ("provide blockid or have an active block" in msg)
+            )
+            if not is_incompatible:
                 try:
                     js = response.json()
                     em = str(js.get("error", "")).lower()
@@ -996,13 +1957,13 @@ def post_private_keys(private_keys):
                             )
                 except Exception:
                     pass
-            if 500 <= response.status_code <= 599:
+            if 500 <= response.status_code <= 599 or response.status_code == 429:
                 snippet = ""
                 try:
                     snippet = (response.text or "")[:120].replace("\n", " ")
                 except Exception:
                     snippet = ""
-                logger("Error", f"Failed to send batch: Status {response.status_code}. Retrying in 30s.")
+                logger("Error", f"Failed to send batch: Status {response.status_code}. Retrying with backoff.")
                 if snippet:
                     logger("Info", f"Detail: {snippet}...")
                 update_status_rl({"last_batch": f"Server error {response.status_code}", "last_error": f"Post server error `{response.status_code}`"}, "post_server_error", 300)
@@ -1011,14 +1972,21 @@ def post_private_keys(private_keys):
             if is_incompatible:
                 attempts = 1
                 while attempts < 3:
+                    # Spread the re-posts out instead of sending them back to back.
+                    time.sleep(_pool_retry_delay(2 ** attempts))
+                    if not _POOL_GUARD.allow():
+                        # Not an answer from the pool: keep the batch and let the caller retry it.
+                        logger("Warning", "Pool API circuit open; incompatible re-post deferred.")
+                        return None
                     try:
-                        r2 = requests.post(url, headers=headers, json=data, timeout=10)
+                        r2 = http_client.post(url, headers=headers, json=data, timeout=10)
+                        _pool_record(r2)
                         if r2.status_code == 200:
                             logger("Success", "Private keys posted successfully.")
                             update_status({"last_batch": f"Sent {len(private_keys)} keys"})
                             return (True, False)
-                    except requests.RequestException:
-                        pass
+                    except requests.RequestException as e:
+                        _pool_record(error=e)
                     attempts += 1
                 update_status_rl({"last_batch": "Incompatible privatekeys"}, "post_incompatible", 300)
                 logger("Error", "API reports incompatible privatekeys after 3 attempts.")
@@ -1028,7 +1996,7 @@ def post_private_keys(private_keys):
                 snippet = (response.text or "")[:120].replace("\n", " ")
             except Exception:
                 snippet = ""
-            logger("Error", f"Failed to send batch: Status {response.status_code}. Retrying in 30s.")
+            logger("Error", f"Failed to send batch: Status {response.status_code}. Retrying with backoff.")
             if snippet:
                 logger("Info", f"Detail: {snippet}...")
             update_status_rl({"last_batch": f"Failed status {response.status_code}", "last_error": f"Post error `{response.status_code}`"}, "post_error", 300)
@@ -1042,24 +2010,7 @@ def post_private_keys(private_keys):
                     cnt = int(globals().get("POST_ERROR_CONSECUTIVE", 0))
                     if cnt >= 3:
                         globals()["POST_ERROR_CONSECUTIVE"] = 0
-                        try:
-                            globals()["PENDING_KEYS"] = []
-                            _save_pending_keys()
-                        except Exception:
-                            pass
-                        try:
-                            if os.path.exists(PENDING_KEYS_FILE):
-                                os.remove(PENDING_KEYS_FILE)
-                        except Exception:
-                            pass
-                        try:
-                            clean_io_files()
-                        except Exception:
-                            pass
-                        try:
-                            globals()["NEED_NEW_BLOCK_FETCH"] = True
-                        except Exception:
-                            pass
+                        _request_state_reset()
                         try:
                             send_telegram_notification("Post errors: no active block. Resetting state.")
                         except Exception:
@@ -1068,7 +2019,7 @@ def post_private_keys(private_keys):
                     pass
             return (False, False)
     except requests.RequestException as e:
-        logger("Error", f"Connection error while sending batch: {type(e).__name__}. Retrying in 30s.")
+        logger("Error", f"Connection error while sending batch: {type(e).__name__}. Retrying with backoff.")
         update_status_rl({"last_batch": f"Connection error {type(e).__name__}", "last_error": f"Post connection error `{type(e).__name__}`"}, "post_network_error", 300)
         notify_error("api_offline", f"Post connection error `{type(e).__name__}`", api_offline=True, sleep_seconds=0, rate_limit=300)
         return (False, False)
@@ -1081,7 +2032,8 @@ def post_private_keys(private_keys):
 
 # ----------------------------------------------------------------------------------------------
 
-def save_addresses_to_in_file(addresses, additional_addresses):
+def save_addresses_to_in_file(addresses, additional_addresses, path=None):
+    in_file = path or IN_FILE
     all_addresses = list(addresses)
     extras = [a for a in (additional_addresses or []) if isinstance(a, str) and a.strip()]
     for a in extras:
@@ -1089,11 +2041,11 @@ def save_addresses_to_in_file(addresses, additional_addresses):
             all_addresses.append(a)
 
     try:
-        with open(IN_FILE, "w") as file:
+        with open(in_file, "w") as file:
             file.write("\n".join(all_addresses) + "\n")
-        logger("Info", f"Addresses saved to '{IN_FILE}'. Total: {len(all_addresses)}")
+        logger("Info", f"Addresses saved to '{in_file}'. Total: {len(all_addresses)}")
     except Exception as e:
-        logger("Error", f"Failed to save addresses to '{IN_FILE}': {e}")
+        logger("Error", f"Failed to save addresses to '{in_file}': {e}")
         return False
 
 def clean_io_files():
@@ -1127,6 +2079,46 @@ def _ensure_executable(path):
 def _gpu_out_path(i):
     return f"out_gpu_{i}.txt"
 
+# Output file -> GPU id and binary that write it, so found keys can be attributed per GPU
+# and the output parsed in the format detected for that binary.
+_OUT_PATH_GPU = {}
+_OUT_PATH_BIN = {}
+# Output file -> [(start, end)] sub-ranges handed to its binary this block; None when unknown (resumed block).
+_OUT_PATH_SEGMENTS = {}
+
+def _note_out_path(path, gid, binary=None, keyspace=None):
+    _OUT_PATH_GPU[os.path.abspath(path)] = gid
+    if binary:
+        _OUT_PATH_BIN[os.path.abspath(path)] = os.path.abspath(binary)
+    segs = _OUT_PATH_SEGMENTS.get(os.path.abspath(path))
+    if keyspace and isinstance(segs, list):
+        try:
+            start, end = keyspace.split(":", 1)
+            segs.append((int(start, 16), int(end, 16)))
+        except Exception:
+            _OUT_PATH_SEGMENTS[os.path.abspath(path)] = None
+
+def _reset_out_segments(paths, known=True):
+    """Start a block's segment record for paths; known=False skips the segment check for them."""
+    for p in paths:
+        _OUT_PATH_SEGMENTS[os.path.abspath(p)] = [] if known else None
+
+def _out_path_label(path):
+    gid = _OUT_PATH_GPU.get(os.path.abspath(path))
+    return f"GPU {gid}" if gid is not None else os.path.basename(path)
+
+def _block_out_paths():
+    """Every output file of the rig-wide block: out.txt (single GPU) and the per-GPU files."""
+    return [OUT_FILE] + _existing_gpu_out_paths()
+
+def _existing_gpu_out_paths():
+    try:
+        here = os.path.dirname(os.path.abspath(__file__))
+        names = [n for n in os.listdir(here) if re.fullmatch(r"out_gpu_\d+\.txt", n)]
+        return [os.path.join(here, n) for n in sorted(names, key=lambda n: int(re.findall(r"\d+", n)[0]))]
+    except Exception:
+        return []
+
 def _clean_gpu_out_files():
     try:
         here = os.path.dirname(os.path.abspath(__file__))
@@ -1165,33 +2157,129 @@ def _split_keyspace(start_hex, end_hex, parts):
     except Exception:
         return [(str(start_hex), str(end_hex))]
 
-def _split_keyspace_weighted(start_hex, end_hex, gpu_ids):
+def _speed_profile_key(gid, gpu_details):
+    name = ""
+    try:
+        name = str(((gpu_details or {}).get(int(gid)) or {}).get("name") or "").strip()
+    except Exception:
+        name = ""
+    binary = os.path.basename(str(_get_program_path_for_gpu(gid, gpu_details) or ""))
+    return f"{gid}|{name or '-'}|{binary or '-'}"
+
+def _load_speed_profile():
+    try:
+        if os.path.exists(SPEED_PROFILE_FILE):
+            with open(SPEED_PROFILE_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+                if isinstance(data, dict):
+                    return data
+    except Exception:
+        pass
+    return {}
+
+def _save_speed_profile(profile):
+    try:
+        tmp = SPEED_PROFILE_FILE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(profile, f, indent=2)
+        os.replace(tmp, SPEED_PROFILE_FILE)
+    except Exception:
+        pass
+
+_SPEED_PROFILE_LOCK = threading.Lock()
+
+def _record_speed_profile(gpu_ids, gpu_details):
+    """Fold this run's average per-GPU speed into the smoothed on-disk profile."""
+    try:
+        if not GPU_SPEED_SAMPLES:
+            return
+        with _SPEED_PROFILE_LOCK:
+            _record_speed_profile_locked(gpu_ids, gpu_details)
+    except Exception:
+        pass
+
+def _record_speed_profile_locked(gpu_ids, gpu_details):
+    try:
+        profile = _load_speed_profile()
+        for gid in gpu_ids:
+            acc = GPU_SPEED_SAMPLES.get(gid)
+            if not acc or acc[1] <= 0:
+                continue
+            avg = acc[0] / acc[1]
+            if avg <= 0:
+                continue
+            key = _speed_profile_key(gid, gpu_details)
+            entry = profile.get(key) if isinstance(profile.get(key), dict) else {}
+            prev = entry.get("mkeys")
+            try:
+                prev = float(prev) if prev is not None else None
+            except Exception:
+                prev = None
+            smoothed = avg if not prev or prev <= 0 else prev + SPEED_PROFILE_ALPHA * (avg - prev)
+            profile[key] = {
+                "mkeys": round(smoothed, 2),
+                "last_mkeys": round(avg, 2),
+                "runs": int(entry.get("runs", 0) or 0) + 1,
+                "updated_at": datetime.now().isoformat(timespec="seconds"),
+            }
+        _save_speed_profile(profile)
+    except Exception:
+        pass
+
+def _auto_share_weights(gpu_ids, gpu_details):
+    """
+    Weights from the measured speed profile, or None when any GPU has not been
+    measured yet (that block then runs on the manual shares and calibrates them).
+    """
+    try:
+        profile = _load_speed_profile()
+        weights = []
+        for gid in gpu_ids:
+            entry = profile.get(_speed_profile_key(gid, gpu_details))
+            mk = float((entry or {}).get("mkeys") or 0)
+            if mk <= 0:
+                return None
+            weights.append(mk)
+        return weights
+    except Exception:
+        return None
+
+def _manual_share_weights(gpu_ids):
+    weights = []
+    for gid in gpu_ids:
+        w = None
+        try:
+            if GPU_INDEX_MAP:
+                key = str(int(gid))
+                cfg = GPU_INDEX_MAP.get(key)
+                if isinstance(cfg, dict):
+                    w = cfg.get("share")
+        except Exception:
+            w = None
+        if w is None:
+            w = 1
+        try:
+            w = float(w)
+        except Exception:
+            w = 1.0
+        if w < 0:
+            w = 0.0
+        weights.append(w)
+    return weights
+
+def _split_keyspace_weighted(start_hex, end_hex, gpu_ids, gpu_details=None):
     try:
         s = int(str(start_hex), 16)
         e = int(str(end_hex), 16)
         if e <= s or not gpu_ids:
             return [(str(start_hex), str(end_hex))]
         length = e - s
-        weights = []
-        for gid in gpu_ids:
-            w = None
-            try:
-                if GPU_INDEX_MAP:
-                    key = str(int(gid))
-                    cfg = GPU_INDEX_MAP.get(key)
-                    if isinstance(cfg, dict):
-                        w = cfg.get("share")
-            except Exception:
-                w = None
-            if w is None:
-                w = 1
-            try:
-                w = float(w)
-            except Exception:
-                w = 1.0
-            if w < 0:
-                w = 0.0
-            weights.append(w)
+        weights = _auto_share_weights(gpu_ids, gpu_details) if AUTO_SHARE else None
+        if weights:
+            total = sum(weights)
+            logger("Info", "Auto shares: " + ", ".join(f"GPU{gid} {100.0 * w / total:.1f}%" for gid, w in zip(gpu_ids, weights)))
+        else:
+            weights = _manual_share_weights(gpu_ids)
         total = sum(weights)
         if total <= 0:
             return _split_keyspace(start_hex, end_hex, len(gpu_ids))
@@ -1213,29 +2301,98 @@ def _split_keyspace_weighted(start_hex, end_hex, gpu_ids):
     except Exception:
         return _split_keyspace(start_hex, end_hex, len(gpu_ids))
 
-def _combine_gpu_out_files(count):
-    try:
-        with open(OUT_FILE, "w") as out:
-            for i in range(count):
-                p = _gpu_out_path(i)
-                if os.path.exists(p):
-                    try:
-                        with open(p, "r") as f:
-                            out.write(f.read())
-                    except Exception:
-                        pass
-    except Exception:
-        pass
-
-def _stream_gpu_output(proc, gid):
+def _stream_gpu_output(proc, gid, seg=None):
     try:
         for raw in proc.stdout:
             txt = (raw or "").rstrip("\n").strip()
+            m_prog = _PROGRESS_RE.match(txt)
+            if m_prog:
+                try:
+                    mk = _ingest_speed(float(m_prog.group(1)), m_prog.group(2), gid)
+                    _journal_progress(seg, mk)
+                except Exception:
+                    pass
             if txt:
                 print(f"{Fore.CYAN}[GPU {gid}] {txt}{Style.RESET_ALL}", flush=True)
     except Exception:
         pass
 
+def _format_length(count):
+    """Inverse of _parse_length_to_count, rounded to three significant digits (e.g. 1370B)."""
+    try:
+        n = int(count)
+        if n <= 0:
+            return ""
+        mag = 10 ** max(0, len(str(n)) - 3)
+        n = max(mag, int(round(n / mag)) * mag)
+        for suf, mult in (("T", 10**12), ("B", 10**9), ("M", 10**6), ("K", 10**3)):
+            if n >= mult and n % mult == 0:
+                return f"{n // mult}{suf}"
+        return str(n)
+    except Exception:
+        return ""
+
+RIG_KEYS_PER_SEC = None
+LAST_REQUESTED_LENGTH = None
+# Independent block loops (gpu_loop_mode "independent") each size their blocks from their own speed.
+LOOP_KEYS_PER_SEC = {}
+_LOOP_REQUESTED_LENGTH = {}
+
+def _record_block_throughput(block_size, seconds, loop=None):
+    """Smooth the measured end-to-end keys/s over completed blocks, for the rig or one block loop."""
+    global RIG_KEYS_PER_SEC
+    try:
+        if block_size <= 0 or seconds <= 0:
+            return
+        rate = block_size / seconds
+        prev = RIG_KEYS_PER_SEC if loop is None else LOOP_KEYS_PER_SEC.get(loop)
+        smoothed = rate if prev is None else prev + SPEED_PROFILE_ALPHA * (rate - prev)
+        if loop is None:
+            RIG_KEYS_PER_SEC = smoothed
+        else:
+            LOOP_KEYS_PER_SEC[loop] = smoothed
+        if BLOCK_TARGET_SECONDS > 0:
+            tag = f"[{loop}] " if loop is not None else ""
+            logger("Info", f"{tag}Block took {seconds / 60:.1f} min (target {BLOCK_TARGET_SECONDS / 60:.1f} min, length {_format_length(block_size)}).")
+            if loop is None:
+                STATUS["block_duration_s"] = int(seconds)
+                STATUS["block_target_s"] = BLOCK_TARGET_SECONDS
+            else:
+                _loop_status(loop, {"block_duration_s": int(seconds)})
+    except Exception:
+        pass
+
+def _block_length_param(loop=None):
+    """
+    The `length` sent to the pool: block_length as configured, or, with
+    block_target_minutes set and a measured rig (or block loop) speed, the length
+    that should take that long, clamped to block_length_min/block_length_max.
+    """
+    global LAST_REQUESTED_LENGTH
+    rate = RIG_KEYS_PER_SEC if loop is None else LOOP_KEYS_PER_SEC.get(loop)
+    if BLOCK_TARGET_SECONDS <= 0 or not rate:
+        return BLOCK_LENGTH
+    try:
+        count = int(rate * BLOCK_TARGET_SECONDS)
+        lo = _parse_length_to_count(BLOCK_LENGTH_MIN)
+        hi = _parse_length_to_count(BLOCK_LENGTH_MAX)
+        if lo:
+            count = max(count, lo)
+        if hi:
+            count = min(count, hi)
+        length = _format_length(count) or BLOCK_LENGTH
+        last = LAST_REQUESTED_LENGTH if loop is None else _LOOP_REQUESTED_LENGTH.get(loop)
+        if length != last:
+            if loop is None:
+                LAST_REQUESTED_LENGTH = length
+            else:
+                _LOOP_REQUESTED_LENGTH[loop] = length
+            tag = f"[{loop}] " if loop is not None else ""
+            logger("Info", f"{tag}Adaptive block length: {length} for a {BLOCK_TARGET_SECONDS / 60:.1f} min target at {rate / 1e6:.0f} Mkeys/s.")
+        return length
+    except Exception:
+        return BLOCK_LENGTH
+
 def _parse_length_to_count(s):
     try:
         if not s:
@@ -1256,99 +2413,576 @@ def _parse_length_to_count(s):
     except Exception:
         return None
 
-def run_external_program(start_hex, end_hex):
-    """Run external program with given keyspace and stream live feedback."""
-    keyspace = f"{start_hex}:{end_hex}"
-    clean_out_file()
-    _clean_gpu_out_files()
-    logger("Info", f"Running with keyspace: {Fore.GREEN}{keyspace}{Style.RESET_ALL}")
-    gpu_ids = _detect_gpu_list()
-    gpu_details = _detect_gpu_details()
+# ----------------------------------------------------------------------------------------------
+#  Additional-address hits seen while the binaries run.
+# ----------------------------------------------------------------------------------------------
+
+_KEYFOUND = {"event": threading.Event(), "pairs": []}
+_KEYFOUND_LOCK = threading.Lock()
+_RUNNING_PROCS = set()
+_RUNNING_PROCS_LOCK = threading.Lock()
+
+def _track_proc(p):
+    """Remember a GPU subprocess so a live hit can stop it; started after an abort it is killed at once."""
+    with _RUNNING_PROCS_LOCK:
+        for q in [q for q in _RUNNING_PROCS if q.poll() is not None]:
+            _RUNNING_PROCS.discard(q)
+        _RUNNING_PROCS.add(p)
+    if _KEYFOUND["event"].is_set():
+        try:
+            p.kill()
+        except Exception:
+            pass
+
+def _kill_running_procs():
+    with _RUNNING_PROCS_LOCK:
+        procs = list(_RUNNING_PROCS)
+    for p in procs:
+        try:
+            if p.poll() is None:
+                p.kill()
+        except Exception:
+            pass
+
+def _keyfound_aborted():
+    return _KEYFOUND["event"].is_set()
+
+def _save_keyfound(pairs):
+    """Write every hit seen so far to KEYFOUND_FILE and fsync it before returning."""
+    with _KEYFOUND_LOCK:
+        for pair in pairs:
+            if pair not in _KEYFOUND["pairs"]:
+                _KEYFOUND["pairs"].append(pair)
+        all_pairs = list(_KEYFOUND["pairs"])
+        with open(KEYFOUND_FILE, "w") as file:
+            file.write("\n".join([f"{addr}:{key}" for (addr, key) in all_pairs]) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+    return all_pairs
+
+def _on_live_keyfound(pairs, path):
+    logger("KEYFOUND", f"{len(pairs)} key(s) for additional addresses appeared in '{path}' ({_out_path_label(path)}).")
+    try:
+        all_pairs = _save_keyfound(pairs)
+        logger("KEYFOUND", f"Private key saved in '{KEYFOUND_FILE}'.")
+    except Exception as e:
+        all_pairs = pairs
+        logger("KEYFOUND Error", f"Failed to save private key to file: {e}")
+    if EARLY_ABORT:
+        _KEYFOUND["event"].set()
+        _kill_running_procs()
+        logger("KEYFOUND", "Stopped all GPU processes.")
+    try:
+        update_status({"keyfound": f"{len(all_pairs)} saved to {KEYFOUND_FILE}"})
+    except Exception:
+        pass
+    try:
+        addrs = ", ".join(sorted(set(str(a) for a, _k in pairs)))
+        send_telegram_notification_rl(f"🔑 Key found for additional address {addrs} ({_out_path_label(path)}), saved to {KEYFOUND_FILE}.", "keyfound_live", 60)
+    except Exception:
+        pass
+
+# ----------------------------------------------------------------------------------------------
+#  Live output tailing: parse each output file while the binary is still writing it.
+# ----------------------------------------------------------------------------------------------
+
+OUT_TAIL_INTERVAL = 1.0
+
+# Binary path -> output format detected from its first output lines (see output_parsers.FORMATS).
+_DETECTED_FORMATS = {}
+
+def _configured_kind():
+    # Prefer explicit PROGRAM_KIND from settings; fall back to app basename
     kind = (PROGRAM_KIND or "").strip().lower()
-    if len(gpu_ids) > 1:
-        segments = _split_keyspace_weighted(start_hex, end_hex, gpu_ids)
-        procs = []
-        threads = []
-        first_fail = None
-        for idx, gid in enumerate(gpu_ids):
-            outp = _gpu_out_path(idx)
-            
-            this_app_path = _get_program_path_for_gpu(gid, gpu_details)
-            base = [this_app_path]
-            
-            if isinstance(APP_ARGS, str) and APP_ARGS.strip():
-                parsed = shlex.split(APP_ARGS)
-                filtered = []
-                i = 0
-                while i < len(parsed):
-                    if parsed[i] == "-gpuId" and i + 1 < len(parsed):
-                        i += 2
-                        continue
-                    filtered.append(parsed[i])
-                    i += 1
-                base += filtered
-            args = list(base)
-            args += ["-i", IN_FILE, "-o", outp, "--keyspace", f"{segments[idx][0]}:{segments[idx][1]}"]
-            if "vanity" in kind:
-                args += ["-gpuId", str(gid)]
-            _ensure_executable(this_app_path)
-            try:
-                p = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
-                procs.append(p)
-                prog_name = os.path.basename(this_app_path) if this_app_path else "unknown"
-                print(f"{Fore.CYAN}[GPU {gid}] started {segments[idx][0]}:{segments[idx][1]} using {prog_name}{Style.RESET_ALL}")
-                t = threading.Thread(target=_stream_gpu_output, args=(p, gid), daemon=True)
-                t.start()
-                threads.append(t)
-            except FileNotFoundError:
-                logger("Error", "External program not found. Check path and permissions.")
-                for _p in procs:
-                    try:
-                        _p.kill()
-                    except Exception:
-                        pass
-                update_status_rl({"last_error": "Program not found"}, "program_not_found", 120)
-                notify_error("program_not_found", "Program not found", api_offline=False, sleep_seconds=0, rate_limit=120)
-                return False
-            except Exception as e:
-                logger("Error", f"Exception while starting GPU {gid}: {e}")
-                for _p in procs:
+    if not kind:
+        bname = os.path.basename((APP_PATH or "").lower())
+        if "bitcrack" in bname:
+            kind = "bitcrack"
+        elif "vanitysearch-v2" in bname or "vanitysearch-v3" in bname:
+            kind = "vanitysearch-v3"
+        else:
+            kind = "vanity"
+    return kind
+
+def _out_path_binary(path):
+    return _OUT_PATH_BIN.get(os.path.abspath(path)) or os.path.abspath(APP_PATH or "")
+
+def _output_kind(path=None):
+    """
+    Parser kind for an output file: the configured one, unless the format detected for
+    the binary writing path is one the configured parser cannot read.
+    """
+    kind = _configured_kind()
+    if path is not None and DETECT_OUTPUT_FORMAT:
+        detected = _DETECTED_FORMATS.get(_out_path_binary(path))
+        if detected and not format_reads(kind, detected):
+            return detected
+    return kind
+
+def _sniff_output(path, text=None, final=False):
+    """
+    Detect the format of path's output (or of text, its beginning) once per binary.
+    Returns True when the binary's format is known. A mismatch with program_name is
+    logged once and kept in status.json under output_formats.
+    """
+    if not DETECT_OUTPUT_FORMAT:
+        return True
+    binary = _out_path_binary(path)
+    if binary in _DETECTED_FORMATS:
+        return True
+    try:
+        detected = detect_format(text, final) if text is not None else detect_format_file(path)
+    except Exception:
+        return False
+    if not detected:
+        return False
+    _DETECTED_FORMATS[binary] = detected
+    kind = _configured_kind()
+    formats = dict(STATUS.get("output_formats") or {})
+    formats[os.path.basename(binary)] = detected
+    STATUS["output_formats"] = formats
+    if format_reads(kind, detected):
+        logger("Info", f"Output format of '{os.path.basename(binary)}': {detected}.")
+    else:
+        logger("Warning", f"Output of '{os.path.basename(binary)}' looks like {detected}, but program_name '{kind}' selects another parser. Parsing it as {detected}; fix program_name to silence this warning.")
+        update_status_rl({"last_error": f"Output format mismatch: {detected} output, program_name {kind}"}, "output_format_mismatch", 600)
+    return True
+
+def _new_out_tail(on_keys=None, block=None):
+    """
+    Tail state for one block (the rig-wide block unless given). on_keys(list) receives new keys as they appear;
+    after _stop_out_tail, "found" holds the additional-address hits of the block.
+    With only early_abort on, the files are watched for hits and keys are parsed after the block.
+    """
+    if not LIVE_PARSE and not EARLY_ABORT:
+        return None
+    return {"stop": threading.Event(), "threads": [], "lock": threading.Lock(), "seen": set(), "found": [], "on_keys": on_keys if LIVE_PARSE else None, "live": LIVE_PARSE, "keys": 0, "by_path": {}, "done": False, "block": block}
+
+def _tail_emit(tail, parsed, path):
+    keys, found = parsed
+    with tail["lock"]:
+        new = [k for k in keys if k not in tail["seen"]]
+        tail["seen"].update(new)
+    new = _screen_output_keys(new, path)
+    with tail["lock"]:
+        tail["keys"] += len(new)
+        tail["found"].extend(found)
+        if new or found:
+            counts = tail["by_path"].setdefault(path, [0, 0])
+            counts[0] += len(new)
+            counts[1] += len(found)
+    if found:
+        _on_live_keyfound(found, path)
+    if new and tail["on_keys"] is not None:
+        _spool_add(new, tail["block"], path)
+        try:
+            tail["on_keys"](new)
+        except Exception:
+            pass
+
+def _tail_out_file(tail, path):
+    # The parser is created once the binary's format is known (or SNIFF_BYTES arrived without a match).
+    parser = None
+    head = ""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pos = 0
+    while True:
+        stopping = tail["stop"].is_set()
+        try:
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    f.seek(pos)
+                    while True:
+                        data = f.read(PARSE_WINDOW)
+                        if not data:
+                            break
+                        pos += len(data)
+                        text = decoder.decode(data)
+                        if parser is None:
+                            head += text
+                            if not _sniff_output(path, head) and len(head) < SNIFF_BYTES:
+                                continue
+                            parser = StreamParser(_output_kind(path), ADDITIONAL_ADDRESSES)
+                            text, head = head, ""
+                        _tail_emit(tail, parser.feed(text), path)
+        except Exception:
+            pass
+        if stopping:
+            break
+        tail["stop"].wait(OUT_TAIL_INTERVAL)
+    text = decoder.decode(b"", final=True)
+    if parser is None:
+        head += text
+        _sniff_output(path, head, final=True)
+        parser = StreamParser(_output_kind(path), ADDITIONAL_ADDRESSES)
+        text = head
+    _tail_emit(tail, parser.feed(text), path)
+    _tail_emit(tail, parser.close(), path)
+
+def _start_out_tail(tail, path):
+    if tail is None:
+        return
+    t = threading.Thread(target=_tail_out_file, args=(tail, path), daemon=True)
+    tail["threads"].append(t)
+    t.start()
+
+def _stop_out_tail(tail):
+    """Do a last read of every tailed file and wait for the parsers to finish."""
+    if tail is None or tail["done"]:
+        return
+    tail["stop"].set()
+    for t in tail["threads"]:
+        t.join()
+    tail["done"] = True
+
+_LIVE_KEYS_LOCK = threading.Lock()
+
+def _add_live_keys(target, new_keys, persist=False):
+    with _LIVE_KEYS_LOCK:
+        target.extend(new_keys)
+        if persist:
+            _save_pending_keys()
+        STATUS["pending_keys"] = len(target)
+    _write_status_file()
+
+# ----------------------------------------------------------------------------------------------
+#  Block journal: lets a restarted worker resume the unfinished part of its block.
+# ----------------------------------------------------------------------------------------------
+
+_JOURNAL = {"active": False, "block": None, "phase": "", "segments": [], "saved_ts": 0.0}
+_JOURNAL_LOCK = threading.Lock()
+# Progress is integrated from reported speeds; resume a little early so no keys are skipped.
+JOURNAL_RESUME_FACTOR = 0.95
+JOURNAL_SAVE_INTERVAL = 15.0
+
+def _journal_save(force=False):
+    if not _JOURNAL["active"]:
+        return
+    now = time.time()
+    if not force and now - _JOURNAL["saved_ts"] < JOURNAL_SAVE_INTERVAL:
+        return
+    with _JOURNAL_LOCK:
+        _JOURNAL["saved_ts"] = now
+        data = {
+            "block": _JOURNAL["block"],
+            "phase": _JOURNAL["phase"],
+            "segments": [{"start": sg["start"], "end": sg["end"], "done": int(sg.get("done", 0))} for sg in _JOURNAL["segments"]],
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        try:
+            tmp = BLOCK_JOURNAL_FILE + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, BLOCK_JOURNAL_FILE)
+        except Exception:
+            pass
+
+def _journal_begin(block_data):
+    # "starting" until the first segments are registered: a crash before that reruns the whole block.
+    _JOURNAL.update(active=BLOCK_JOURNAL_ENABLED, block=block_data, phase="starting", segments=[])
+    _journal_save(force=True)
+
+def _journal_segments(ranges):
+    """Register the sub-ranges about to run; returns the segment dicts that carry their progress."""
+    segs = [{"start": str(a), "end": str(b), "done": 0} for (a, b) in ranges]
+    with _JOURNAL_LOCK:
+        _JOURNAL["segments"].extend(segs)
+        if _JOURNAL["phase"] == "starting":
+            _JOURNAL["phase"] = "running"
+    _journal_save(force=True)
+    return segs
+
+def _journal_progress(seg, mkeys):
+    """Advance a segment by the keys covered since its previous speed reading."""
+    if seg is None:
+        return
+    now = time.time()
+    last = seg.get("_ts")
+    seg["_ts"] = now
+    if last is None or mkeys <= 0:
+        return
+    try:
+        length = int(seg["end"], 16) - int(seg["start"], 16)
+        seg["done"] = min(length, int(seg.get("done", 0) + mkeys * 1e6 * (now - last)))
+    except Exception:
+        return
+    _journal_save()
+
+def _journal_segment_done(seg):
+    try:
+        seg["done"] = int(seg["end"], 16) - int(seg["start"], 16)
+    except Exception:
+        pass
+    _journal_save(force=True)
+
+def _journal_finish():
+    _JOURNAL["phase"] = "finished"
+    _journal_save(force=True)
+
+def _journal_clear():
+    _JOURNAL.update(active=False, block=None, phase="", segments=[])
+    try:
+        if os.path.exists(BLOCK_JOURNAL_FILE):
+            os.remove(BLOCK_JOURNAL_FILE)
+    except Exception:
+        pass
+
+def _journal_load():
+    """Return the journal left by a previous run, or None."""
+    try:
+        if not os.path.exists(BLOCK_JOURNAL_FILE):
+            return None
+        with open(BLOCK_JOURNAL_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict) and isinstance(data.get("block"), dict) and isinstance(data.get("segments"), list):
+            return data
+    except Exception:
+        pass
+    return None
+
+def _journal_remaining(journal):
+    """
+    Unfinished (start_hex, end_hex) pieces of a loaded journal, or None when the block never
+    got as far as registering its segments and has to run in full.
+    """
+    if journal.get("phase") == "finished":
+        return []
+    if journal.get("phase") == "starting" or not journal.get("segments"):
+        return None
+    remaining = []
+    for sg in journal.get("segments", []):
+        try:
+            s = int(sg["start"], 16)
+            e = int(sg["end"], 16)
+            done = int(sg.get("done", 0))
+            if done >= e - s:
+                continue
+            s += int(done * JOURNAL_RESUME_FACTOR)
+            if s < e:
+                remaining.append((f"{s:x}", f"{e:x}"))
+        except Exception:
+            continue
+    return remaining
+
+def _gpu_command(gid, gpu_details, kind, outp, keyspace, in_file=None):
+    """Build the command line for one GPU subprocess. Returns (args, program_path)."""
+    this_app_path = _get_program_path_for_gpu(gid, gpu_details)
+    _note_out_path(outp, gid, this_app_path, keyspace)
+    base = [this_app_path]
+    if isinstance(APP_ARGS, str) and APP_ARGS.strip():
+        parsed = shlex.split(APP_ARGS)
+        filtered = []
+        i = 0
+        while i < len(parsed):
+            if parsed[i] == "-gpuId" and i + 1 < len(parsed):
+                i += 2
+                continue
+            filtered.append(parsed[i])
+            i += 1
+        base += filtered
+    args = list(base)
+    args += ["-i", in_file or IN_FILE, "-o", outp, "--keyspace", keyspace]
+    if "vanity" in kind:
+        args += ["-gpuId", str(gid)]
+    _ensure_executable(this_app_path)
+    return args, this_app_path
+
+def _finish_multi_gpu_run(ok_all, first_fail):
+    # The per-GPU output files stay on disk; process_out_file parses and clears them.
+    if not ok_all and _keyfound_aborted():
+        globals()["LAST_RUN_OK"] = False
+        logger("KEYFOUND", "GPU processes stopped early: additional-address key found.")
+        return False
+    if ok_all:
+        try:
+            globals()["LAST_RUN_OK"] = True
+        except Exception:
+            pass
+        logger("Success", "External program finished successfully")
+        return True
+    try:
+        globals()["LAST_RUN_OK"] = False
+    except Exception:
+        pass
+    logger("Error", f"External program failed with return code: {first_fail if first_fail is not None else -1}")
+    update_status_rl({"last_error": f"Program failed code `{first_fail if first_fail is not None else -1}`"}, "program_failed", 120)
+    notify_error("program_failed", f"Program failed code `{first_fail if first_fail is not None else -1}`", api_offline=False, sleep_seconds=0, rate_limit=120)
+    return False
+
+def _chunk_count(start_hex, end_hex, gpu_count):
+    try:
+        length = int(str(end_hex), 16) - int(str(start_hex), 16)
+    except Exception:
+        return gpu_count
+    size = _parse_length_to_count(CHUNK_LENGTH)
+    if size:
+        count = -(-length // size)
+    else:
+        count = gpu_count * CHUNKS_PER_GPU
+    return int(max(gpu_count, min(count, 10000)))
+
+def _chunk_runner(idx, gid, gpu_details, kind, work, state):
+    """Pull sub-ranges off the shared queue and run them one after another on a single GPU."""
+    # VanitySearch and BitCrack append to their -o file, so every chunk lands in the same per-GPU output.
+    outp = _gpu_out_path(idx)
+    stats = state["gpus"][idx]
+    while not state["abort"].is_set() and not _keyfound_aborted():
+        try:
+            seg = work.get_nowait()
+        except queue.Empty:
+            break
+        args, this_app_path = _gpu_command(gid, gpu_details, kind, outp, f"{seg['start']}:{seg['end']}")
+        t0 = time.time()
+        try:
+            p = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+        except Exception as e:
+            state["start_error"] = e
+            state["abort"].set()
+            break
+        _track_proc(p)
+        stats["proc"] = p
+        if stats["chunks"] == 0:
+            prog_name = os.path.basename(this_app_path) if this_app_path else "unknown"
+            print(f"{Fore.CYAN}[GPU {gid}] pulling chunks using {prog_name}{Style.RESET_ALL}")
+        _stream_gpu_output(p, gid, seg)
+        rc = p.wait()
+        stats["proc"] = None
+        stats["busy"] += time.time() - t0
+        if rc != 0:
+            if state["first_fail"] is None:
+                state["first_fail"] = rc
+            state["abort"].set()
+            break
+        _journal_segment_done(seg)
+        stats["chunks"] += 1
+    stats["done_ts"] = time.time()
+
+def _run_chunked(start_hex, end_hex, gpu_ids, gpu_details, kind, ranges=None, tail=None):
+    """
+    Work-queue mode: cut the block into many sub-ranges and let each GPU pull the next
+    one as soon as its subprocess exits, so fast cards are not held back by slow ones.
+    With ranges (a resumed block) only those pieces run. Each GPU's chunks land in its own
+    out_gpu_N.txt, which process_out_file parses in the format of that GPU's binary.
+    """
+    chunks = ranges or _split_keyspace(start_hex, end_hex, _chunk_count(start_hex, end_hex, len(gpu_ids)))
+    work = queue.Queue()
+    for seg in _journal_segments(chunks):
+        work.put(seg)
+    logger("Info", f"Chunk scheduling: {len(chunks)} chunks across {len(gpu_ids)} GPUs")
+    state = {
+        "abort": threading.Event(),
+        "first_fail": None,
+        "start_error": None,
+        "gpus": [{"chunks": 0, "busy": 0.0, "done_ts": None, "proc": None} for _ in gpu_ids],
+    }
+    started = time.time()
+    runners = []
+    for idx, gid in enumerate(gpu_ids):
+        t = threading.Thread(target=_chunk_runner, args=(idx, gid, gpu_details, kind, work, state), daemon=True)
+        t.start()
+        runners.append(t)
+    while any(t.is_alive() for t in runners):
+        if state["start_error"] is not None:
+            for st in state["gpus"]:
+                p = st.get("proc")
+                if p is not None:
                     try:
-                        _p.kill()
+                        p.kill()
                     except Exception:
                         pass
-                update_status_rl({"last_error": f"Program start exception `{type(e).__name__}`"}, "program_exception", 120)
-                notify_error("program_exception", f"Program start exception `{type(e).__name__}`", api_offline=False, sleep_seconds=0, rate_limit=120)
-                return False
-        ok_all = True
-        for p in procs:
-            rc = p.wait()
-            if rc != 0:
-                ok_all = False
-                if first_fail is None:
-                    first_fail = rc
-        for t in threads:
-            try:
-                t.join(timeout=1.0)
-            except Exception:
-                pass
-        _combine_gpu_out_files(len(gpu_ids))
-        if ok_all:
-            try:
-                globals()["LAST_RUN_OK"] = True
-            except Exception:
-                pass
-            logger("Success", "External program finished successfully")
-            _clean_gpu_out_files()
-            return True
+        for t in runners:
+            t.join(timeout=0.5)
+    ended = time.time()
+    # Every binary has exited; stop tailing so process_out_file can read the per-GPU files in full.
+    _stop_out_tail(tail)
+    err = state["start_error"]
+    if err is not None:
+        if isinstance(err, FileNotFoundError):
+            logger("Error", "External program not found. Check path and permissions.")
+            update_status_rl({"last_error": "Program not found"}, "program_not_found", 120)
+            notify_error("program_not_found", "Program not found", api_offline=False, sleep_seconds=0, rate_limit=120)
+        else:
+            logger("Error", f"Exception while starting chunk: {err}")
+            update_status_rl({"last_error": f"Program start exception `{type(err).__name__}`"}, "program_exception", 120)
+            notify_error("program_exception", f"Program start exception `{type(err).__name__}`", api_offline=False, sleep_seconds=0, rate_limit=120)
+        return False
+    chunk_counts = {}
+    idle = {}
+    for idx, gid in enumerate(gpu_ids):
+        st = state["gpus"][idx]
+        chunk_counts[str(gid)] = st["chunks"]
+        idle[str(gid)] = round(max(0.0, ended - (st["done_ts"] or ended)), 1)
+        logger("Info", f"GPU {gid}: {st['chunks']} chunks, busy {st['busy']:.1f}s, idle {idle[str(gid)]:.1f}s of {ended - started:.1f}s")
+    STATUS["gpu_chunks"] = chunk_counts
+    STATUS["gpu_idle_seconds"] = idle
+    ok_all = state["first_fail"] is None and work.empty()
+    if ok_all:
+        _record_speed_profile(gpu_ids, gpu_details)
+    return _finish_multi_gpu_run(ok_all, state["first_fail"])
+
+def _run_gpu_group(start_hex, end_hex, gpu_ids, gpu_details, kind, in_file, out_paths, journal=False):
+    """
+    Run one weighted segment per GPU and wait for all of them.
+    Returns (started, ok_all, first_fail); started is False when a launch failed
+    (already reported, siblings killed). With journal the segments are tracked in the block journal.
+    """
+    segments = _split_keyspace_weighted(start_hex, end_hex, gpu_ids, gpu_details)
+    segs = _journal_segments(segments) if journal else [None] * len(segments)
+    procs = []
+    threads = []
+    first_fail = None
+    for idx, gid in enumerate(gpu_ids):
+        args, this_app_path = _gpu_command(gid, gpu_details, kind, out_paths[idx], f"{segments[idx][0]}:{segments[idx][1]}", in_file)
         try:
-            globals()["LAST_RUN_OK"] = False
+            p = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+            procs.append(p)
+            _track_proc(p)
+            prog_name = os.path.basename(this_app_path) if this_app_path else "unknown"
+            print(f"{Fore.CYAN}[GPU {gid}] started {segments[idx][0]}:{segments[idx][1]} using {prog_name}{Style.RESET_ALL}")
+            t = threading.Thread(target=_stream_gpu_output, args=(p, gid, segs[idx]), daemon=True)
+            t.start()
+            threads.append(t)
+        except FileNotFoundError:
+            logger("Error", "External program not found. Check path and permissions.")
+            for _p in procs:
+                try:
+                    _p.kill()
+                except Exception:
+                    pass
+            update_status_rl({"last_error": "Program not found"}, "program_not_found", 120)
+            notify_error("program_not_found", "Program not found", api_offline=False, sleep_seconds=0, rate_limit=120)
+            return False, False, None
+        except Exception as e:
+            logger("Error", f"Exception while starting GPU {gid}: {e}")
+            for _p in procs:
+                try:
+                    _p.kill()
+                except Exception:
+                    pass
+            update_status_rl({"last_error": f"Program start exception `{type(e).__name__}`"}, "program_exception", 120)
+            notify_error("program_exception", f"Program start exception `{type(e).__name__}`", api_offline=False, sleep_seconds=0, rate_limit=120)
+            return False, False, None
+    ok_all = True
+    for idx, p in enumerate(procs):
+        rc = p.wait()
+        if rc != 0:
+            ok_all = False
+            if first_fail is None:
+                first_fail = rc
+        elif segs[idx] is not None:
+            _journal_segment_done(segs[idx])
+    for t in threads:
+        try:
+            t.join(timeout=1.0)
         except Exception:
             pass
-        logger("Error", f"External program failed with return code: {first_fail if first_fail is not None else -1}")
-        update_status_rl({"last_error": f"Program failed code `{first_fail if first_fail is not None else -1}`"}, "program_failed", 120)
-        notify_error("program_failed", f"Program failed code `{first_fail if first_fail is not None else -1}`", api_offline=False, sleep_seconds=0, rate_limit=120)
-        return False
+    if ok_all:
+        _record_speed_profile(gpu_ids, gpu_details)
+    return True, ok_all, first_fail
+
+def _single_gpu_id(gpu_ids):
     selected_gpu = 0
     try:
         env_hint = os.environ.get("CUDA_VISIBLE_DEVICES")
@@ -1363,8 +2997,62 @@ def run_external_program(start_hex, end_hex):
             selected_gpu = int(m.group(1))
     except Exception:
         selected_gpu = 0
-    
+    return selected_gpu
+
+def run_external_program(start_hex, end_hex, resume=None, tail=None):
+    """
+    Run external program with given keyspace and stream live feedback.
+    resume is the list of unfinished (start, end) pieces of a journaled block; output
+    already on disk from the interrupted run is kept and parsed with the new output. Output files are tailed into
+    tail (see _new_out_tail) while the binaries run.
+    """
+    keyspace = f"{start_hex}:{end_hex}"
+    if resume is None:
+        clean_out_file()
+        _clean_gpu_out_files()
+    logger("Info", f"Running with keyspace: {Fore.GREEN}{keyspace}{Style.RESET_ALL}")
+    gpu_ids = _detect_gpu_list()
+    gpu_details = _detect_gpu_details()
+    kind = (PROGRAM_KIND or "").strip().lower()
+    GPU_SPEEDS.clear()
+    GPU_SPEED_SAMPLES.clear()
+    if resume is None:
+        _reset_out_segments([OUT_FILE] + [_gpu_out_path(idx) for idx in range(len(gpu_ids))])
+    else:
+        # The interrupted run's output files are tailed from the start; resumed chunks append to the per-GPU files.
+        # Which segments wrote the older lines is not known, so those files only get the block range check.
+        run_ids = gpu_ids if len(gpu_ids) > 1 else [_single_gpu_id(gpu_ids)]
+        paths = _block_out_paths() + [_gpu_out_path(idx) for idx in range(len(run_ids))]
+        _reset_out_segments(paths, known=False)
+        tailed = set()
+        for p in paths:
+            if os.path.abspath(p) not in tailed:
+                tailed.add(os.path.abspath(p))
+                _start_out_tail(tail, p)
+        if not resume:
+            _stop_out_tail(tail)
+            logger("Success", "Resumed block had already finished; processing its output.")
+            globals()["LAST_RUN_OK"] = True
+            return True
+        logger("Info", f"Resuming block: {len(resume)} unfinished segment(s)")
+        return _run_chunked(start_hex, end_hex, run_ids, gpu_details, kind, ranges=resume, tail=tail)
+    if len(gpu_ids) > 1:
+        out_paths = [_gpu_out_path(idx) for idx in range(len(gpu_ids))]
+        for p in out_paths:
+            _start_out_tail(tail, p)
+        if CHUNK_SCHEDULING:
+            return _run_chunked(start_hex, end_hex, gpu_ids, gpu_details, kind, tail=tail)
+        started, ok_all, first_fail = _run_gpu_group(start_hex, end_hex, gpu_ids, gpu_details, kind, IN_FILE, out_paths, journal=True)
+        _stop_out_tail(tail)
+        if not started:
+            return False
+        return _finish_multi_gpu_run(ok_all, first_fail)
+    selected_gpu = _single_gpu_id(gpu_ids)
+    seg = _journal_segments([(start_hex, end_hex)])[0]
+    _start_out_tail(tail, OUT_FILE)
+
     this_app_path = _get_program_path_for_gpu(selected_gpu, gpu_details)
+    _note_out_path(OUT_FILE, selected_gpu, this_app_path, keyspace)
     _ensure_executable(this_app_path)
     base = [this_app_path]
 
@@ -1391,16 +3079,15 @@ def run_external_program(start_hex, end_hex):
             bufsize=1,
             env=env,
         ) as process:
+            _track_proc(process)
             last_dyn_len = 0
-            # Matches: "2957.17 MK/s (...)" — number followed by G/M/K then K/s
-            progress_re = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([GMK])K/s", re.IGNORECASE)
             for raw in process.stdout:
                 msg = raw.rstrip("\n")
                 txt = msg.strip()
-                m_prog = progress_re.match(txt)
+                m_prog = _PROGRESS_RE.match(txt)
                 if m_prog:
                     try:
-                        _ingest_speed(float(m_prog.group(1)), m_prog.group(2))
+                        _journal_progress(seg, _ingest_speed(float(m_prog.group(1)), m_prog.group(2), selected_gpu))
                     except Exception:
                         pass
                 if m_prog:
@@ -1419,7 +3106,10 @@ def run_external_program(start_hex, end_hex):
                 sys.stdout.write("\n")
                 sys.stdout.flush()
             return_code = process.wait()
+            _stop_out_tail(tail)
             if return_code == 0:
+                _journal_segment_done(seg)
+                _record_speed_profile([selected_gpu], gpu_details)
                 try:
                     globals()["LAST_RUN_OK"] = True
                 except Exception:
@@ -1427,6 +3117,10 @@ def run_external_program(start_hex, end_hex):
                 logger("Success", "External program finished successfully")
                 _clean_gpu_out_files()
                 return True
+            elif _keyfound_aborted():
+                globals()["LAST_RUN_OK"] = False
+                logger("KEYFOUND", "GPU process stopped early: additional-address key found.")
+                return False
             else:
                 try:
                     globals()["LAST_RUN_OK"] = False
@@ -1437,6 +3131,7 @@ def run_external_program(start_hex, end_hex):
                 notify_error("program_failed", f"Program failed code `{return_code}`", api_offline=False, sleep_seconds=0, rate_limit=120)
                 return False
     except FileNotFoundError:
+        _stop_out_tail(tail)
         try:
             globals()["LAST_RUN_OK"] = False
         except Exception:
@@ -1446,6 +3141,7 @@ def run_external_program(start_hex, end_hex):
         notify_error("program_not_found", "Program not found", api_offline=False, sleep_seconds=0, rate_limit=120)
         return False
     except Exception as e:
+        _stop_out_tail(tail)
         try:
             globals()["LAST_RUN_OK"] = False
         except Exception:
@@ -1457,40 +3153,90 @@ def run_external_program(start_hex, end_hex):
 
 # ----------------------------------------------------------------------------------------------
 
-def process_out_file():
+# Output files are parsed in worker processes when there are several and enough data to pay for it.
+PARSE_PARALLEL_MIN_FILES = 2
+PARSE_PARALLEL_MIN_BYTES = 32 << 20
+
+def _parse_out_paths(paths):
     """
-    Process out.txt, check additional address hit, notify via Telegram,
-    and enqueue other keys for API posting.
+    Parse each output file on its own, in parallel worker processes when there are several
+    large ones. Returns [(path, keys, found_pairs)] in the order given.
     """
-    global PENDING_KEYS
-    if not os.path.exists(OUT_FILE):
-        logger("Warning", f"File '{OUT_FILE}' not found for processing.")
-        update_status_rl({"last_error": f"Output file missing"}, "output_missing", 120)
-        notify_error("output_missing", "Output file missing", api_offline=False, sleep_seconds=0, rate_limit=120)
-        return False
+    for p in paths:
+        _sniff_output(p)
+    kinds = [_output_kind(p) for p in paths]
+    extras = list(ADDITIONAL_ADDRESSES or [])
+    workers = min(len(paths), os.cpu_count() or 1)
+    if workers > 1 and len(paths) >= PARSE_PARALLEL_MIN_FILES and sum(os.path.getsize(p) for p in paths) >= PARSE_PARALLEL_MIN_BYTES:
+        try:
+            # Spawned, not forked: the tail, lease and submission threads may hold locks at fork time.
+            ctx = multiprocessing.get_context("spawn")
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as ex:
+                results = list(ex.map(parse_out_file, paths, kinds, [extras] * len(paths)))
+            return [(p, k, f) for p, (k, f) in zip(paths, results)]
+        except Exception as e:
+            logger("Warning", f"Parallel output parsing failed ({type(e).__name__}); parsing files one by one.")
+    return [(p,) + tuple(parse_out_file(p, k, extras)) for p, k in zip(paths, kinds)]
 
-    keys_to_post = []
-    found_pairs = []
-    
-    try:
-        with open(OUT_FILE, "r") as file:
-            content = file.read()
-        # Prefer explicit PROGRAM_KIND from settings; fall back to app basename
-        kind = (PROGRAM_KIND or "").strip().lower()
-        if not kind:
-            bname = os.path.basename((APP_PATH or "").lower())
-            if "bitcrack" in bname:
-                kind = "bitcrack"
-            elif "vanitysearch-v2" in bname or "vanitysearch-v3" in bname:
-                kind = "vanitysearch-v3"
-            else:
-                kind = "vanity"
-        keys_to_post, found_pairs = parse_out(content, kind, ADDITIONAL_ADDRESSES)
-    except Exception as e:
-        logger("Error", f"Error processing file '{OUT_FILE}': {e}")
-        update_status_rl({"last_error": f"Output parse error `{type(e).__name__}`"}, "output_parse_error", 120)
-        notify_error("output_parse_error", f"Output parse error `{type(e).__name__}`", api_offline=False, sleep_seconds=0, rate_limit=120)
-        return False
+def _record_key_attribution(per_path):
+    """per_path maps an output file to [keys, additional-address hits]; logged and kept in status.json as gpu_keys."""
+    if not per_path:
+        return
+    counts = {}
+    parts = []
+    for path, (n_keys, n_found) in per_path.items():
+        gid = _OUT_PATH_GPU.get(os.path.abspath(path))
+        counts[str(gid) if gid is not None else os.path.basename(path)] = n_keys
+        parts.append(f"{_out_path_label(path)}: {n_keys}" + (f" (+{n_found} additional)" if n_found else ""))
+    gpu_keys = dict(STATUS.get("gpu_keys") or {})
+    gpu_keys.update(counts)
+    STATUS["gpu_keys"] = gpu_keys
+    logger("Info", "Keys by GPU: " + ", ".join(parts))
+
+def process_out_file(keys=None, out_paths=None, tail=None, block=None):
+    """
+    Process the block's output files, check additional address hit, notify via Telegram,
+    and enqueue other keys for API posting.
+    out_paths defaults to out.txt plus every out_gpu_N.txt; each file is parsed on its own,
+    so nothing is merged first and keys stay attributed to the GPU that found them.
+    Keys go to PENDING_KEYS unless a block's own key list is passed in; block (the rig-wide
+    block by default) is what they are recorded under in the key spool.
+    With a finished live tail the output was already parsed while the binary ran.
+    """
+    target = PENDING_KEYS if keys is None else keys
+    paths = list(out_paths) if out_paths is not None else _block_out_paths()
+    if tail is not None and tail["done"] and tail["live"]:
+        keys_to_post = []
+        found_pairs = list(tail["found"])
+        per_path = dict(tail["by_path"])
+        logger("Info", f"Parsed output live: {tail['keys']} keys queued while the block ran.")
+    else:
+        present = [p for p in paths if os.path.exists(p)]
+        if not present:
+            logger("Warning", f"File '{paths[0] if len(paths) == 1 else ', '.join(paths)}' not found for processing.")
+            update_status_rl({"last_error": f"Output file missing"}, "output_missing", 120)
+            notify_error("output_missing", "Output file missing", api_offline=False, sleep_seconds=0, rate_limit=120)
+            return False
+        try:
+            results = _parse_out_paths(present)
+        except Exception as e:
+            logger("Error", f"Error processing output files: {e}")
+            update_status_rl({"last_error": f"Output parse error `{type(e).__name__}`"}, "output_parse_error", 120)
+            notify_error("output_parse_error", f"Output parse error `{type(e).__name__}`", api_offline=False, sleep_seconds=0, rate_limit=120)
+            return False
+        keys_to_post = []
+        found_pairs = []
+        per_path = {}
+        for p, k, f in results:
+            k = _screen_output_keys(k, p)
+            _spool_add(k, block, p)
+            keys_to_post += k
+            found_pairs += f
+            if k or f:
+                per_path[p] = [len(k), len(f)]
+            if f:
+                logger("KEYFOUND", f"{len(f)} key(s) for additional addresses found by {_out_path_label(p)} in '{p}'.")
+    _record_key_attribution(per_path)
 
     # 1. Check and Save Additional Address hit (and Notify)
     if found_pairs:
@@ -1498,8 +3244,7 @@ def process_out_file():
         
         # Save found private key to file
         try:
-            with open(KEYFOUND_FILE, "w") as file:
-                file.write("\n".join([f"{addr}:{key}" for (addr, key) in found_pairs]) + "\n")
+            _save_keyfound(found_pairs)
             logger("KEYFOUND", f"Private key saved in '{KEYFOUND_FILE}'.")
         except Exception as e:
             logger("KEYFOUND Error", f"Failed to save private key to file: {e}")
@@ -1511,31 +3256,35 @@ def process_out_file():
             except Exception:
                 pass
         if keys_to_post:
-            _existing = set(PENDING_KEYS)
-            _new = [k for k in keys_to_post if k not in _existing]
-            PENDING_KEYS.extend(_new)
-            _save_pending_keys()
-        update_status({"keyfound": f"{len(found_pairs)} saved to {KEYFOUND_FILE}", "pending_keys": len(PENDING_KEYS)})
+            target.extend(keys_to_post)
+            if keys is None:
+                _save_pending_keys()
+        update_status({"keyfound": f"{len(found_pairs)} saved to {KEYFOUND_FILE}", "pending_keys": len(target)})
         return True
 
     if keys_to_post:
-        _existing = set(PENDING_KEYS)
-        _new = [k for k in keys_to_post if k not in _existing]
-        if len(_new) < len(keys_to_post):
-            logger("Warning", f"Dropped {len(keys_to_post) - len(_new)} duplicate keys from output.")
-        PENDING_KEYS.extend(_new)
-        logger("Info", f"Accumulated {len(PENDING_KEYS)} keys for posting.")
-        _save_pending_keys()
-        update_status({"pending_keys": len(PENDING_KEYS)})
+        added = target.extend(keys_to_post)
+        if added < len(keys_to_post):
+            logger("Warning", f"Dropped {len(keys_to_post) - added} duplicate keys from output.")
+        logger("Info", f"Accumulated {len(target)} keys for posting.")
+        if keys is None:
+            _save_pending_keys()
+        update_status({"pending_keys": len(target)})
 
-    # 3. Clear out.txt for the next cycle
+    # 3. Clear the output files for the next cycle
     try:
-        with open(OUT_FILE, "w"):
-            pass
-        logger("Info", f"File '{OUT_FILE}' cleared for next cycle.")
-        _clean_gpu_out_files()
+        cleared = []
+        for p in paths:
+            if os.path.exists(p):
+                with open(p, "w"):
+                    pass
+                cleared.append(os.path.basename(p))
+        if out_paths is None:
+            _clean_gpu_out_files()
+        if cleared:
+            logger("Info", f"File '{', '.join(cleared)}' cleared for next cycle.")
     except Exception as e:
-        logger("Error", f"Failed to clear file '{OUT_FILE}': {e}")
+        logger("Error", f"Failed to clear output files: {e}")
         update_status_rl({"last_error": f"Clear out error `{type(e).__name__}`"}, "clear_out_error", 120)
         notify_error("clear_out_error", f"Clear out error `{type(e).__name__}`", api_offline=False, sleep_seconds=0, rate_limit=120)
 
@@ -1551,57 +3300,238 @@ def _pad64_hex(n):
         return None
 
 def _generate_filler_keys(count, start_hex, end_hex, exclude=None):
+    """Random distinct keys in [start, end) that are not in exclude; see filler_keys."""
     try:
-        exclude_set = set([str(e).lower().replace("0x", "") for e in (exclude or [])])
-        start = int(start_hex, 16)
-        end = int(end_hex, 16)
-        span = end - start
-        if span <= 0 or count <= 0:
-            return []
-        out = []
-        attempts = 0
-        import secrets
-        while len(out) < count and attempts < count * 100:
-            rnd = secrets.token_bytes(32)
-            rnd_int = int.from_bytes(rnd, "big")
-            offset = rnd_int % span
-            val = start + offset
-            h = hex(val)[2:].zfill(64)
-            if h not in exclude_set and h.lower() not in exclude_set and h.upper() not in out:
-                out.append(h.upper())
-            attempts += 1
-        return out
+        return filler_keys.generate_fillers(count, start_hex, end_hex, exclude)
     except Exception:
         return []
 
+# ----------------------------------------------------------------------------------------------
+#  Independent block loops: each GPU group fetches, runs, parses and submits its own blocks.
+# ----------------------------------------------------------------------------------------------
+
+_LOOPS_LOCK = threading.Lock()
+
+def _gpu_loop_groups(gpu_ids):
+    """GPU groups from gpu_groups (lists of indices), else one group per detected GPU."""
+    groups = []
+    seen = set()
+    for g in (GPU_GROUPS or []):
+        try:
+            ids = [int(x) for x in (g if isinstance(g, list) else [g])]
+        except Exception:
+            continue
+        ids = [i for i in ids if i in gpu_ids and i not in seen]
+        if ids:
+            seen.update(ids)
+            groups.append(ids)
+    for gid in gpu_ids:
+        if gid not in seen:
+            groups.append([gid])
+    return groups
+
+def _loop_status(name, fields):
+    with _LOOPS_LOCK:
+        loops = STATUS.setdefault("loops", {})
+        loops.setdefault(name, {}).update(fields)
+    _write_status_file()
+
+def _count_loop_block(name, block_size):
+    with _LOOPS_LOCK:
+        STATUS["session_blocks"] = int(STATUS.get("session_blocks", 0)) + 1
+        STATUS["session_consecutive"] = int(STATUS.get("session_consecutive", 0)) + 1
+        try:
+            STATUS["session_keyspace_total"] = int(STATUS.get("session_keyspace_total", 0)) + int(block_size)
+        except Exception:
+            pass
+        loop = STATUS.setdefault("loops", {}).setdefault(name, {})
+        loop["blocks"] = int(loop.get("blocks", 0)) + 1
+
+def _gpu_block_loop(name, gpu_ids, gpu_details, shared):
+    in_file = f"in_{name}.txt"
+    out_paths = [f"out_{name}_gpu_{gid}.txt" for gid in gpu_ids]
+    kind = (PROGRAM_KIND or "").strip().lower()
+    stop = shared["stop"]
+    _loop_status(name, {"gpus": list(gpu_ids), "state": "starting", "range": "", "pending_keys": 0})
+    while not stop.is_set() and not shared["drain"].is_set():
+        try:
+            _loop_status(name, {"state": "fetching"})
+            data = _take_leased_block() or fetch_block_data(loop=name)
+            if ALL_BLOCKS_SOLVED and not data:
+                stop.set()
+                break
+            if not data:
+                delay = _pool_retry_delay(30)
+                logger("Error", f"[{name}] Could not fetch block data. Retrying in {delay:.0f} seconds.")
+                stop.wait(delay)
+                continue
+            block_id = _block_id_of(data)
+            if not block_id:
+                # Without ids the pool only tracks one active block per token; loops would collide.
+                shared["no_block_id"] = True
+                stop.set()
+                break
+            addresses = data.get("checkwork_addresses", [])
+            range_data = data.get("range", {})
+            start_hex = range_data.get("start", "").replace("0x", "")
+            end_hex = range_data.get("end", "").replace("0x", "")
+            if not addresses or not (start_hex and end_hex):
+                logger("Error", f"[{name}] Block without addresses or key range. Retrying in 30 seconds.")
+                stop.wait(30)
+                continue
+            try:
+                block_size = int(end_hex, 16) - int(start_hex, 16)
+            except Exception:
+                block_size = 0
+            block = {
+                "id": block_id,
+                "start": start_hex,
+                "end": end_hex,
+                "addr_count": int(len(addresses) or 10),
+                "addresses": list(addresses),
+                "run_ok": False,
+                "keys": KeyQueue(),
+            }
+            save_addresses_to_in_file(addresses, ADDITIONAL_ADDRESSES, in_file)
+            for p in out_paths:
+                try:
+                    if os.path.exists(p):
+                        os.remove(p)
+                except Exception:
+                    pass
+            _reset_out_segments(out_paths)
+            for gid in gpu_ids:
+                GPU_SPEEDS.pop(gid, None)
+                GPU_SPEED_SAMPLES.pop(gid, None)
+            _loop_status(name, {"state": "running", "range": f"{start_hex}:{end_hex}"})
+            logger("Info", f"[{name}] Running GPUs {gpu_ids} on {Fore.GREEN}{start_hex}:{end_hex}{Style.RESET_ALL}")
+            _SPOOL_ACTIVE.add((start_hex, end_hex))
+            tail = _new_out_tail(lambda new, keys=block["keys"]: _add_live_keys(keys, new), block)
+            for p in out_paths:
+                _start_out_tail(tail, p)
+            run_started = time.time()
+            started, ok_all, first_fail = _run_gpu_group(start_hex, end_hex, gpu_ids, gpu_details, kind, in_file, out_paths)
+            _stop_out_tail(tail)
+            block["run_ok"] = bool(started and ok_all)
+            if block["run_ok"]:
+                _count_loop_block(name, block_size)
+                _record_block_throughput(block_size, time.time() - run_started, name)
+            elif started and not _keyfound_aborted():
+                logger("Error", f"[{name}] External program failed with return code: {first_fail if first_fail is not None else -1}")
+                with _LOOPS_LOCK:
+                    STATUS["session_consecutive"] = 0
+            if process_out_file(block["keys"], out_paths, tail, block):
+                _SPOOL_ACTIVE.discard((start_hex, end_hex))
+                shared["solution_found"] = True
+                stop.set()
+                break
+            if _keyfound_aborted():
+                # Another loop hit an additional address and stopped every GPU; do not start a new block.
+                _SPOOL_ACTIVE.discard((start_hex, end_hex))
+                stop.set()
+                break
+            _loop_status(name, {"state": "submitting", "pending_keys": len(block["keys"])})
+            _flush_block_keys(block, SUBMIT_RETRY_SECONDS, SUBMIT_MAX_ATTEMPTS)
+            _SPOOL_ACTIVE.discard((start_hex, end_hex))
+            if block["keys"]:
+                logger("Warning", f"[{name}] Discarding {len(block['keys'])} unposted keys from block {start_hex}:{end_hex}.{_spool_discard_note()}")
+            _loop_status(name, {"pending_keys": 0})
+            _retry_spooled_blocks()
+            for p in out_paths:
+                try:
+                    if os.path.exists(p):
+                        os.remove(p)
+                except Exception:
+                    pass
+            if ONE_SHOT:
+                break
+            if POST_BLOCK_DELAY_SECONDS > 0:
+                _loop_status(name, {"state": "waiting"})
+                stop.wait(POST_BLOCK_DELAY_SECONDS)
+        except Exception as e:
+            logger("Error", f"[{name}] Unhandled error in block loop: {e}")
+            stop.wait(5)
+    _loop_status(name, {"state": "stopped"})
+
+def _run_independent_loops():
+    """
+    Run one block loop per GPU group until they all stop. Returns False when the
+    pool does not hand out block ids, so the caller can fall back to the rig loop.
+    """
+    gpu_ids = _detect_gpu_list()
+    gpu_details = _detect_gpu_details()
+    groups = _gpu_loop_groups(gpu_ids)
+    shared = {"stop": threading.Event(), "drain": threading.Event(), "no_block_id": False, "solution_found": False}
+    GPU_SPEEDS.clear()
+    GPU_SPEED_SAMPLES.clear()
+    logger("Info", f"Independent block loops: {len(groups)} loop(s) for GPU groups {groups}")
+    threads = []
+    for ids in groups:
+        name = "g" + "-".join(str(i) for i in ids)
+        t = threading.Thread(target=_gpu_block_loop, args=(name, ids, gpu_details, shared), daemon=True)
+        t.start()
+        threads.append(t)
+    while any(t.is_alive() for t in threads):
+        if not shared["drain"].is_set() and os.path.exists(".stop_after_block"):
+            logger("Info", "Graceful stop requested. Loops will exit after their current block.")
+            shared["drain"].set()
+        for t in threads:
+            t.join(timeout=1.0)
+    if shared["drain"].is_set():
+        try:
+            os.remove(".stop_after_block")
+        except Exception:
+            pass
+    if shared["no_block_id"] and not shared["solution_found"] and not ALL_BLOCKS_SOLVED:
+        logger("Warning", "Pool did not return a block id; independent loops need one. Falling back to the rig-wide loop.")
+        return False
+    if shared["solution_found"]:
+        logger("Success", "ADDITIONAL ADDRESS KEY FOUND. Exiting script.")
+    return True
+
 # ==============================================================================================
 #                                    MAIN LOOP
 # ==============================================================================================
 
 if __name__ == "__main__":
-    clean_io_files()
+    resume_journal = _journal_load() if (BLOCK_JOURNAL_ENABLED and GPU_LOOP_MODE != "independent") else None
+    if resume_journal is None:
+        _journal_clear()
+        clean_io_files()
+    else:
+        logger("Info", "Found an interrupted block in the journal; resuming it.")
     refresh_settings()
+    _lease_load()
+    _start_lease_keeper()
     _load_pending_keys()
+    _submit_queue_load()
     STATUS["session_id"] = uuid.uuid4().hex[:8]
     STATUS["session_started_ts"] = time.time()
     STATUS["session_blocks"] = 0
     STATUS["session_consecutive"] = 0
     STATUS["session_keyspace_total"] = 0
-    while True:
+    tail = None
+    run_rig_loop = not (GPU_LOOP_MODE == "independent" and _run_independent_loops())
+    while run_rig_loop:
         try:
             refresh_settings()
-            flush_pending_keys_blocking()
-            if 'NEED_NEW_BLOCK_FETCH' in globals() and NEED_NEW_BLOCK_FETCH:
-                NEED_NEW_BLOCK_FETCH = False
-                update_status({"pending_keys": len(PENDING_KEYS), "next_fetch_in": 0})
-                logger("Info", "Incompatible keys detected and cleared. Fetching a new block immediately.")
-                continue
-            # Keys still here after flush belong to the previous block and could not be posted.
-            # Mixing them with the next block's keys causes incompatible errors — discard them.
-            if PENDING_KEYS:
-                logger("Warning", f"Discarding {len(PENDING_KEYS)} unposted keys from previous block to prevent cross-block contamination.")
-                globals()["PENDING_KEYS"] = []
-                _save_pending_keys()
+            _start_lease_keeper()
+            # Queued blocks carry their own keys, so PENDING_KEYS only ever holds the active block's.
+            # Keys restored alongside a resumed block belong to it and are posted with it.
+            if resume_journal is None:
+                flush_pending_keys_blocking()
+                if 'NEED_NEW_BLOCK_FETCH' in globals() and NEED_NEW_BLOCK_FETCH:
+                    NEED_NEW_BLOCK_FETCH = False
+                    update_status({"pending_keys": len(PENDING_KEYS), "next_fetch_in": 0})
+                    logger("Info", "Incompatible keys detected and cleared. Fetching a new block immediately.")
+                    continue
+                # Keys still here after flush belong to the previous block and could not be posted.
+                # Mixing them with the next block's keys causes incompatible errors — discard them.
+                if PENDING_KEYS:
+                    logger("Warning", f"Discarding {len(PENDING_KEYS)} unposted keys from previous block to prevent cross-block contamination.{_spool_discard_note()}")
+                    globals()["PENDING_KEYS"] = KeyQueue()
+                    _save_pending_keys()
+                _retry_spooled_blocks()
             if ONE_SHOT and PROCESSED_ONE_BLOCK:
                 logger("Info", "One-shot mode enabled. Exiting after first block.")
                 break
@@ -1612,12 +3542,27 @@ if __name__ == "__main__":
                     pass
                 logger("Info", "Graceful stop requested. Exiting cleanly after block.")
                 break
-            block_data = fetch_block_data()
-            if ALL_BLOCKS_SOLVED:
+            prefetched = None if resume_journal is not None else _take_prefetched_block()
+            resume_ranges = None
+            if resume_journal is not None:
+                block_data = resume_journal.get("block")
+                resume_ranges = _journal_remaining(resume_journal)
+                resume_journal = None
+            elif prefetched:
+                block_data, saved = prefetched
+                PREFETCH_SAVED_TOTAL += saved
+                logger("Info", f"Using prefetched block. GPU idle time saved: {saved:.1f}s (session total {PREFETCH_SAVED_TOTAL:.1f}s).")
+                STATUS["prefetch_saved_last"] = round(saved, 1)
+                STATUS["prefetch_saved_total"] = round(PREFETCH_SAVED_TOTAL, 1)
+            else:
+                block_data = _take_leased_block() or fetch_block_data()
+            # Only a fetch that found nothing ends the run; a block already taken is worked first.
+            if ALL_BLOCKS_SOLVED and not block_data:
                 break
             if not block_data:
-                logger("Error", "Could not fetch block data. Retrying in 30 seconds.")
-                time.sleep(30)
+                delay = _pool_retry_delay(30)
+                logger("Error", f"Could not fetch block data. Retrying in {delay:.0f} seconds.")
+                time.sleep(delay)
                 continue
             addresses = block_data.get("checkwork_addresses", [])
             range_data = block_data.get("range", {})
@@ -1663,13 +3608,40 @@ if __name__ == "__main__":
                 logger("Info", f"New block notification sent: {current_keyspace}")
             try:
                 CURRENT_ADDR_COUNT = int(len(addresses) or 10)
+                CURRENT_ADDRESSES = list(addresses)
                 CURRENT_RANGE_START = start_hex
                 CURRENT_RANGE_END = end_hex
+                CURRENT_BLOCK_ID = _block_id_of(block_data)
             except Exception:
                 pass
             save_addresses_to_in_file(addresses, ADDITIONAL_ADDRESSES)
-            ran_ok = run_external_program(start_hex, end_hex)
-            solution_found = process_out_file()
+            _journal_begin(block_data)
+            # With a prefetched block the keys are posted in the background too, so the next
+            # block starts as soon as this one's output is read instead of after the flush.
+            submit_async = (ASYNC_SUBMIT or _prefetch_applies()) and bool(CURRENT_BLOCK_ID) and resume_ranges is None
+            if ASYNC_SUBMIT and not submit_async and not ASYNC_SUBMIT_NO_ID_WARNED and not CURRENT_BLOCK_ID:
+                ASYNC_SUBMIT_NO_ID_WARNED = True
+                logger("Warning", "Pool did not return a block id; submitting synchronously so keys stay tied to the active block.")
+            block_keys = KeyQueue() if submit_async else None
+            # Keys found while the binaries run are queued straight away (and persisted when submitting synchronously).
+            live_target = PENDING_KEYS if block_keys is None else block_keys
+            tail = _new_out_tail(lambda new: _add_live_keys(live_target, new, persist=block_keys is None))
+            prefetch_done = _arm_prefetch(block_size)
+            run_started = time.time()
+            ran_ok = run_external_program(start_hex, end_hex, resume_ranges, tail)
+            _stop_out_tail(tail)
+            if ran_ok:
+                _journal_finish()
+                if resume_ranges is None:
+                    _record_block_throughput(block_size, time.time() - run_started)
+            if prefetch_done is not None:
+                prefetch_done.set()
+            solution_found = process_out_file(block_keys, tail=tail)
+            if submit_async and not solution_found:
+                _enqueue_submission(dict(_current_block(), keys=block_keys))
+            # Keys are now in the pending file, or queued for submission and mirrored to
+            # SUBMIT_QUEUE_FILE; the block no longer needs resuming.
+            _journal_clear()
             if ran_ok:
                 STATUS["session_blocks"] = int(STATUS.get("session_blocks", 0)) + 1
                 STATUS["session_consecutive"] = int(STATUS.get("session_consecutive", 0)) + 1
@@ -1683,15 +3655,20 @@ if __name__ == "__main__":
             if solution_found:
                 logger("Success", "ADDITIONAL ADDRESS KEY FOUND. Exiting script.")
                 break
-            flush_pending_keys_blocking()
-            if 'NEED_NEW_BLOCK_FETCH' in globals() and NEED_NEW_BLOCK_FETCH:
-                NEED_NEW_BLOCK_FETCH = False
-                update_status({"pending_keys": len(PENDING_KEYS), "next_fetch_in": 0})
-                logger("Info", "Incompatible keys detected and cleared. Fetching a new block immediately.")
-                continue
+            if not submit_async:
+                flush_pending_keys_blocking()
+                if 'NEED_NEW_BLOCK_FETCH' in globals() and NEED_NEW_BLOCK_FETCH:
+                    NEED_NEW_BLOCK_FETCH = False
+                    update_status({"pending_keys": len(PENDING_KEYS), "next_fetch_in": 0})
+                    logger("Info", "Incompatible keys detected and cleared. Fetching a new block immediately.")
+                    continue
             if ONE_SHOT:
                 logger("Info", "One-shot mode enabled. Exiting after first block.")
                 break
+            if _prefetch_pending():
+                # The next block is already leased; waiting would only idle the GPUs on it.
+                update_status({"pending_keys": len(PENDING_KEYS), "next_fetch_in": 0})
+                continue
             update_status({"pending_keys": len(PENDING_KEYS), "next_fetch_in": POST_BLOCK_DELAY_SECONDS})
             logger("Info", f"No critical solution this round. Waiting {POST_BLOCK_DELAY_SECONDS} seconds for next fetch.")
             time.sleep(POST_BLOCK_DELAY_SECONDS)
@@ -1705,7 +3682,7 @@ if __name__ == "__main__":
             except Exception:
                 pass
             try:
-                globals()["PENDING_KEYS"] = []
+                globals()["PENDING_KEYS"] = KeyQueue()
                 _save_pending_keys()
             except Exception:
                 pass
@@ -1715,6 +3692,9 @@ if __name__ == "__main__":
             except Exception:
                 pass
             try:
+                _stop_out_tail(tail)
+                resume_journal = None
+                _journal_clear()
                 clean_io_files()
             except Exception:
                 pass
@@ -1727,3 +3707,4 @@ if __name__ == "__main__":
             except Exception:
                 pass
             continue
+    _drain_submissions()
@@ -5,6 +5,7 @@ import re
 import hashlib
 from datetime import datetime
 import requests
+import http_client
 
 _TOKEN = ""
 _CHAT = ""
@@ -73,7 +74,7 @@ def _ensure_status_message(initial_text):
                 "disable_web_page_preview": True,
             }
             try:
-                r = requests.post(url, data=payload, timeout=10)
+                r = http_client.post(url, data=payload, timeout=10)
                 if r.status_code == 200:
                     js = {}
                     try:
@@ -99,7 +100,7 @@ def _ensure_status_message(initial_text):
                     _log("Error", f"Error creating Telegram status message: {r.status_code} {snip}")
                     try:
                         plain = re.sub(r"<[^>]+>", "", initial_text)
-                        r2 = requests.post(url, data={
+                        r2 = http_client.post(url, data={
                             "chat_id": str(_CHAT),
                             "text": plain,
                             "disable_web_page_preview": True,
@@ -238,7 +239,7 @@ def edit_status(message):
         "disable_web_page_preview": True,
     }
     try:
-        r = requests.post(url, data=payload, timeout=10)
+        r = http_client.post(url, data=payload, timeout=10)
         if r.status_code == 200:
             st[f"{key}::last_hash"] = new_hash
             _save_state(st)